@@ -1,56 +1,259 @@
 
-from fastapi import FastAPI, HTTPException, Query, Response, Depends, status
+from fastapi import FastAPI, HTTPException, Query, Request, Response, Depends, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
+from fastapi.routing import APIRoute
 from auth_handler import create_access_token, verify_password, USERS_DB, SECRET_KEY, ALGORITHM
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 import os
 from pathlib import Path
 from fastapi.openapi.docs import get_swagger_ui_html
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 # from json_storage import JSONStorage # - FOR OLD VERSION
 from main import initialisiere_standard_konten, filtere_konten
 from sparkonto import Sparkonto
 from girokonto import Girokonto
 import time
-from logger_config import logger
+from logger_config import logger, access_logger, LOG_DIR
 import inspect
+import asyncio
+import math
+import threading
+from contextlib import asynccontextmanager
 from storage_factory import get_storage
+from token_cache import token_cache
+from login_guard import PasswortPruefer, LoginUeberlastet
+from rate_limit import TokenBucketLimiter
+from lastschutz import Lastschutz, Gruppe
+from metrics import registry, HTTP_ANFRAGEN, HTTP_DAUER, HTTP_LAUFEND, LOGIN_VERSUCHE
+from server_timing import span, messung_starten, messung_beenden, header_wert, zusammenfassen
+from request_profiler import RequestProfiler
+from speicher_diagnose import speicher_diagnose
+from export import export_strom, FORMATE
+from konten_import import ZeilenLeser, KontenImport
+from migration import Migration
+from zins_planer import ZinsPlaner
+from lazy_zins_storage import LazyZinsStorage
+from write_behind_storage import WriteBehindStorage
+from ereignisse import EreignisBus, EreignisStorage, EREIGNIS_TYPEN, sse_format
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from single_flight import SingleFlight
 
 
 # Globaler Storage-Provider (später einfach durch SQLiteStorage ersetzbar)
 # storage = JSONStorage("konten.json") # - FOR OLD VERSION
-# NEW:
-storage = get_storage()
-current_mode = "SQLite (Relational)" if os.getenv("STORAGE_TYPE") == "sql" else "JSON (Dateibasiert)"
+# NEW: wird erst beim Start der App (lifespan) bzw. beim ersten Zugriff erzeugt
+_storage = None
+_storage_lock = threading.Lock()
+_migration = None
+_migration_lock = threading.Lock()
+current_mode = {
+    "sql": "SQLite (Relational)",
+    "sharded": "SQLite (Sharded)",
+}.get(os.getenv("STORAGE_TYPE"), "JSON (Dateibasiert)")
 
 # Definiert, wo die API nach dem TOken sucht (im Endpunkt /Login)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# bcrypt-Prüfungen laufen in einem begrenzten Thread-Pool statt im Event-Loop
+passwort_pruefer = PasswortPruefer(
+    verify_password,
+    max_parallel=int(os.getenv("LOGIN_MAX_PARALLEL", "2")),
+    max_warteschlange=int(os.getenv("LOGIN_MAX_QUEUE", "32")),
+    timeout=float(os.getenv("LOGIN_TIMEOUT", "5")),
+)
+# Token-Bucket je Benutzername und je IP gegen Login-Fluten
+login_limiter = TokenBucketLimiter(
+    rate=float(os.getenv("LOGIN_RATE_PER_SEC", "1")),
+    kapazitaet=float(os.getenv("LOGIN_BURST", "20")),
+)
+
+# Rate-Limit je Client und Routen-Gruppe sowie Lastabwurf (LASTSCHUTZ=1, siehe lastschutz.py)
+# Regeln: (Methode, Pfad, Gruppe, Kosten), die erste passende gilt; Gruppe None = nicht begrenzt
+LASTSCHUTZ_REGELN = [
+    ("*", "/login", None, 0),        # eigener Limiter (login_limiter)
+    ("*", "/metrics", None, 0),
+    ("*", "/events", None, 0),       # langlebige SSE-Verbindungen
+    ("*", "/docs", None, 0),
+    ("*", "/openapi.json", None, 0),
+    ("*", "/static", None, 0),
+    ("*", "/favicon.ico", None, 0),
+    ("GET", "/konten/export", "scan", 10),
+    ("GET", "/konten", "scan", 2),
+    ("GET", "/suche", "scan", 2),
+    ("POST", "/konten/batch-lesen", "scan", 2),
+    ("POST", "/konten/import", "scan", 5),
+    ("POST", "/konten/erstellen/batch", "scan", 5),
+]
+lastschutz = Lastschutz(
+    [
+        Gruppe("standard", float(os.getenv("LIMIT_RATE", "20")), float(os.getenv("LIMIT_BURST", "40"))),
+        Gruppe("scan", float(os.getenv("LIMIT_SCAN_RATE", "2")), float(os.getenv("LIMIT_SCAN_BURST", "10")),
+               anteil=float(os.getenv("MAX_IN_FLIGHT_SCAN_ANTEIL", "0.5"))),
+    ],
+    LASTSCHUTZ_REGELN,
+    max_laufend=int(os.getenv("MAX_IN_FLIGHT", "0")),
+) if os.getenv("LASTSCHUTZ", "0") == "1" else None
+
+def _token_cache_metriken():
+    """Liefert die Zähler des Token-Caches für den /metrics-Endpunkt."""
+    statistik = token_cache.statistik()
+    return [
+        ("bank_token_cache_hits_total", "counter", "Treffer im Token-Cache.", statistik["treffer"]),
+        ("bank_token_cache_misses_total", "counter", "Fehlschläge im Token-Cache.", statistik["fehlschlaege"]),
+        ("bank_token_cache_evictions_total", "counter", "Aus Platzgründen verdrängte Tokens.", statistik["verdraengt"]),
+        ("bank_token_cache_entries", "gauge", "Aktuell gecachte Tokens.", statistik["groesse"]),
+    ]
+
+registry.sammler_hinzufuegen(_token_cache_metriken)
+
+# On-Demand-Profiling (Admin: Header 'X-Profile: 1' oder '?profile=1') und 1-aus-N-Sampling
+request_profiler = RequestProfiler(
+    os.getenv("PROFILE_DIR", os.path.join(LOG_DIR, "profiles")),
+    sample_rate=int(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    max_dateien=int(os.getenv("PROFILE_MAX_FILES", "50")),
+)
+
+# Pub/Sub für Kontoänderungen (SSE-Endpunkt /events)
+ereignis_bus = EreignisBus(
+    max_queue=int(os.getenv("EVENTS_QUEUE", "100")),
+    max_abonnenten=int(os.getenv("EVENTS_MAX_ABOS", "1000")),
+)
+EVENTS_KEEPALIVE_S = float(os.getenv("EVENTS_KEEPALIVE_S", "15"))
+
+# Gleichzeitige identische Leseanfragen teilen sich eine Berechnung (siehe single_flight.py).
+# Schreib-Generation = Anzahl veröffentlichter Ereignisse: Lesen nach Schreiben bündelt nie mit älteren Läufen
+single_flight = SingleFlight(
+    [r.strip() for r in os.getenv("SINGLE_FLIGHT_ROUTEN", "konten,suche").split(",") if r.strip()],
+    generation=lambda: ereignis_bus.version,
+)
+
+# Zinsgutschrift: ZINS_INTERVALL_S=0 deaktiviert, ZINS_MODUS 'planer' (periodische Buchung)
+# oder 'lazy' (Berechnung beim Lesen, siehe lazy_zins_storage.py)
+ZINS_INTERVALL_S = float(os.getenv("ZINS_INTERVALL_S", "0"))
+ZINS_MODUS = os.getenv("ZINS_MODUS", "planer")
+ZINS_PLANER_AKTIV = ZINS_INTERVALL_S > 0 and ZINS_MODUS == "planer"
+ZINS_LAZY_AKTIV = ZINS_INTERVALL_S > 0 and ZINS_MODUS == "lazy"
+
+def hole_storage():
+    """
+    Liefert den Storage-Provider und erzeugt ihn beim ersten Aufruf (thread-sicher).
+    Schreibvorgänge über diesen Provider veröffentlichen Ereignisse auf `ereignis_bus`;
+    im Lazy-Zinsmodus werden Sparkonten beim Zugriff verzinst.
+
+    Returns:
+        StorageInterface: Der über die `StorageFactory` gewählte Provider.
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                backend = get_storage()
+                if ZINS_LAZY_AKTIV:
+                    backend = LazyZinsStorage(backend, ZINS_INTERVALL_S)
+                _storage = EreignisStorage(backend, ereignis_bus)
+    return _storage
+
+# Zeitgesteuerte Zinsgutschrift (nur im Modus 'planer')
+zins_planer = ZinsPlaner(
+    hole_storage,
+    checkpoint_pfad=os.getenv("ZINS_CHECKPOINT", "zins_checkpoint.json"),
+    intervall=ZINS_INTERVALL_S or 86400,
+    chunk_groesse=int(os.getenv("ZINS_CHUNK", "200")),
+    pause=float(os.getenv("ZINS_PAUSE_MS", "50")) / 1000,
+)
+
 def stelle_datenbank_sicher():
     """Prüft, ob Daten vorhanden sind, sonst Initialisierung mit Standard-Konten."""
     try:
-        aktuelle_konten = storage.laden()
-        if not aktuelle_konten:
+        storage = hole_storage()
+        # Existenz-Check statt storage.laden(): kein Aufbau aller Konto-Objekte beim Start
+        if storage.ist_leer():
             logger.info("Speicher ist leer. Initialisiere Standard-Konten...")
             standard = initialisiere_standard_konten()
             # Hier greift jetzt deine neue SQL-Speichermethode!
             storage.speichern(standard)
-            logger.info(f"Erfolgreich {len(standard)} Konten initialisiert.")
+            logger.info("Erfolgreich %s Konten initialisiert.", len(standard))
     except Exception as e:
-        logger.error(f"Fehler bei der Datenbank-Sicherstellung: {e}")
+        logger.error("Fehler bei der Datenbank-Sicherstellung: %s", e)
 
-# Beim Start der API aufrufen
-stelle_datenbank_sicher()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialisiert den Speicher beim Start der API (nicht schon beim Import des Moduls)."""
+    start = time.perf_counter()
+    stelle_datenbank_sicher()
+    logger.info("API bereit nach %.1f ms Initialisierung.", (time.perf_counter() - start) * 1000)
+    if ZINS_PLANER_AKTIV:
+        zins_planer.starten()
+    nachtragen = None
+    if ZINS_LAZY_AKTIV:
+        # Bestand vor dem Lazy-Modus einmalig mit Zeitstempel versehen (im Hintergrund)
+        nachtragen = asyncio.create_task(_zeitstempel_nachtragen())
+    yield
+    await zins_planer.stoppen()
+    if nachtragen is not None:
+        await nachtragen
+
+async def _zeitstempel_nachtragen():
+    try:
+        anzahl = await run_in_threadpool(hole_storage().zeitstempel_nachtragen)
+        if anzahl:
+            logger.info("Lazy-Zinsen: Zeitstempel für %s Sparkonten nachgetragen.", anzahl)
+    except Exception as e:
+        logger.error("Lazy-Zinsen: Nachtragen der Zeitstempel fehlgeschlagen: %s", e)
 
 # Hilfsfunktion zur Token-Validierung und Rollen-Prüfung
+def benutzer_aus_token(token: str) -> dict:
+    """
+    Validiert einen JWT-Token und liefert die Benutzerdaten (auch außerhalb von Dependencies nutzbar,
+    z. B. in der Middleware).
+
+    Args:
+        token (str): Der JWT-Token (ohne 'Bearer '-Präfix).
+
+    Raises:
+        HTTPException (401): Wenn der Token ungültig, abgelaufen oder unvollständig ist.
+
+    Returns:
+        dict: Ein Dictionary mit den Benutzerdaten (z. B. {"username": "admin", "role": "admin"}).
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token konnte nicht validiert werden oder ist abgelaufen.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    with span("auth"):
+        # Bereits validierte Tokens werden bis zu ihrem Ablauf aus dem Cache bedient
+        payload = token_cache.holen(token)
+        if payload is None:
+            from jose import JWTError, jwt
+
+            try:
+                # Dekodieren des Tokens mit dem Secret Key
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            except JWTError:
+                # Tritt auf bei falscher Signatur oder abgelaufenem Token
+                raise credentials_exception
+            token_cache.speichern(token, payload)
+
+    username: str = payload.get("sub")
+    role: str = payload.get("role")
+
+    if username is None or role is None:
+        raise credentials_exception
+
+    return {"username": username, "role": role}
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """
     Validiert den bereitgestellten JWT-Token und extrahiert die Benutzerinformationen.
 
     Diese Funktion dient als zentrale Dependency für geschützte Endpunkte. Sie prüft 
     die Signatur des Tokens, das Ablaufdatum sowie das Vorhandensein der Benutzerrolle.
+    Erfolgreich validierte Tokens werden bis zu ihrem Ablauf im `token_cache` gehalten,
+    sodass wiederholte Anfragen mit demselben Token ohne erneute HMAC-Prüfung auskommen.
 
     Args:
         token (str): Der im Authorization-Header übermittelte JWT-Token. 
@@ -63,25 +266,42 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     Returns:
         dict: Ein Dictionary mit den Benutzerdaten (z. B. {"username": "admin", "role": "admin"}).
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Token konnte nicht validiert werden oder ist abgelaufen.",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    return benutzer_aus_token(token)
+
+
+def nur_admin(current_user: dict = Depends(get_current_user)) -> dict:
+    """
+    Dependency für administrative System-Endpunkte.
+
+    Raises:
+        HTTPException (403): Wenn der Benutzer kein Administrator ist.
+
+    Returns:
+        dict: Die Benutzerdaten des Administrators.
+    """
+    if current_user["role"] != "admin":
+        logger.warning("Zugriff verweigert: User %s hat keine Admin-Rechte.", current_user['username'])
+        raise HTTPException(status_code=403, detail="Nur Administratoren dürfen diese Funktion nutzen.")
+    return current_user
+
+
+def benutzer_aus_request(request: Request):
+    """
+    Liest den Bearer-Token aus dem Authorization-Header und validiert ihn.
+
+    Args:
+        request (Request): Die eingehende Anfrage.
+
+    Returns:
+        dict | None: Die Benutzerdaten oder None, wenn kein gültiger Token vorliegt.
+    """
+    auth = request.headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return None
     try:
-        # Dekodieren des Tokens mit dem Secret Key
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        role: str = payload.get("role")
-        
-        if username is None or role is None:
-            raise credentials_exception
-            
-        return {"username": username, "role": role}
-        
-    except JWTError:
-        # Tritt auf bei falscher Signatur oder abgelaufenem Token
-        raise credentials_exception
+        return benutzer_aus_token(auth[7:].strip())
+    except HTTPException:
+        return None
 
 
 description_text = f"""
@@ -112,11 +332,29 @@ Nutzen Sie den **Authorize**-Button oben rechts (Schloss-Symbol), um sich anzume
 *Hinweis: Die Zins-Simulation verändert den dauerhaften Kontostand nicht und ist daher öffentlich zugänglich.*
 """
 
+class TimingJSONResponse(JSONResponse):
+    """JSONResponse, deren Serialisierung als Abschnitt 'serialisierung' im Server-Timing erscheint."""
+
+    def render(self, content) -> bytes:
+        with span("serialisierung"):
+            return super().render(content)
+
+
+class ProfilierteRoute(APIRoute):
+    """APIRoute, deren synchrone Endpunkte (im Thread-Pool) vom Request-Profiler erfasst werden."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, request_profiler.umschliessen(endpoint), **kwargs)
+
+
 app = FastAPI(
     title="🏦 Softmaster Bank-Management API",
     description=inspect.cleandoc(description_text), # Entfernt Einrückungs-Fehler
-    version="1.4.0"
+    version="1.4.0",
+    default_response_class=TimingJSONResponse,
+    lifespan=lifespan
 )
+app.router.route_class = ProfilierteRoute
 
 # --- SCHEMATA ---
 class KontoErstellenSchema(BaseModel):
@@ -126,6 +364,10 @@ class KontoErstellenSchema(BaseModel):
     start_saldo: float
     extra: float
 
+class BatchLesenSchema(BaseModel):
+    """Schema für das Lesen mehrerer Konten in einem Aufruf."""
+    namen: list[str] = Field(min_length=1, max_length=5000)
+
 class TransaktionErgebnis(BaseModel):
     """Rückgabe-Schema für erfolgreiche Transaktionen."""
     nachricht: str
@@ -224,39 +466,231 @@ def home():
 def get_system_info(current_user: dict = Depends(get_current_user)):
     """Gibt Informationen über die aktuelle Speicher-Architektur zurück."""
     return {
-        "storage_type": type(storage).__name__,
+        "storage_type": type(hole_storage()).__name__,
         "database_connected": True,
         "environment": os.getenv("AZURE_FUNCTIONS_ENVIRONMENT", "Development"),
-        "version": "1.6.0"
+        "version": "1.6.0",
+        "token_cache": token_cache.statistik()
     }
 
 
+@app.get("/system/profile", tags=["System"])
+def profile_auflisten(current_user: dict = Depends(nur_admin)):
+    """
+    **Gespeicherte Request-Profile auflisten** (nur Admin)  
+    Ein Profil entsteht, wenn ein Admin eine Anfrage mit dem Header `X-Profile: 1`
+    (oder `?profile=1`) sendet; die ID steht im Antwort-Header `X-Profile-Id`.
+    """
+    return {"profile": request_profiler.auflisten()}
+
+
+@app.get("/system/profile/{profil_id}", tags=["System"])
+def profil_abrufen(
+    profil_id: str,
+    anzahl: int = Query(25, ge=1, le=200),
+    sortierung: str = Query("cumulative", description="'cumulative' oder 'tottime'"),
+    current_user: dict = Depends(nur_admin)
+):
+    """
+    **Top-Funktionen eines Request-Profils** (nur Admin)  
+    Liefert die teuersten Funktionen eines mit cProfile aufgezeichneten Requests.
+    """
+    try:
+        return request_profiler.top_funktionen(profil_id, anzahl, sortierung)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=f"⚠️ {str(e)}")
+
+
+@app.post("/system/migration", tags=["System"])
+def migration_starten(
+    nach: str = Query(..., pattern="^(json|sql|sharded)$", description="Ziel-Backend: 'json', 'sql' oder 'sharded'"),
+    chunk: int = Query(1000, ge=1, le=50000, description="Konten je Block"),
+    pause_ms: float = Query(0, ge=0, le=10000, description="Pause nach jedem Block"),
+    current_user: dict = Depends(nur_admin),
+):
+    """
+    **Migration starten** (nur Admin)  
+    Kopiert alle Konten des laufenden Speichers blockweise in das Ziel-Backend
+    (Hintergrund-Thread, die API bleibt erreichbar). Ein erneuter Aufruf kopiert nur Abweichungen.
+    """
+    global _migration
+    with _migration_lock:
+        if _migration is not None and _migration.status_abfragen()["zustand"] in ("bereit", "laeuft"):
+            raise HTTPException(status_code=409, detail="⚠️ Es läuft bereits eine Migration.")
+        quelle = hole_storage()
+        ziel = get_storage(nach, write_behind=False)
+        # Unter Ereignis- und Lazy-Zins-Schicht lesen: Lazy-Zinsen werden mit ihrem Zeitstempel
+        # kopiert, nicht verbucht. Ein Write-Behind-Cache bleibt Quelle, da nur er die noch
+        # nicht ins Backend geschriebenen Änderungen kennt.
+        basis = quelle
+        while isinstance(basis, (EreignisStorage, LazyZinsStorage)):
+            basis = basis.backend
+        dauerhaft = basis.backend if isinstance(basis, WriteBehindStorage) else basis
+        if type(ziel) is type(dauerhaft):
+            raise HTTPException(status_code=400, detail="⚠️ Ziel-Backend entspricht dem aktuellen Speicher.")
+        _migration = Migration(basis, ziel, chunk, pause_ms / 1000)
+        threading.Thread(target=_migration.ausfuehren, name="migration", daemon=True).start()
+    logger.info("Migration nach %s gestartet von %s", nach, current_user['username'])
+    return _migration.status_abfragen()
+
+
+@app.get("/system/migration", tags=["System"])
+def migration_status(current_user: dict = Depends(nur_admin)):
+    """
+    **Status der Migration** (nur Admin)  
+    Fortschritt (Blöcke, gelesen, kopiert), Prüfsumme und abweichende Blöcke des letzten Laufs.
+    """
+    if _migration is None:
+        raise HTTPException(status_code=404, detail="⚠️ Es wurde noch keine Migration gestartet.")
+    return _migration.status_abfragen()
+
+
+@app.get("/system/zinslauf", tags=["System"])
+def zinslauf_status(current_user: dict = Depends(nur_admin)):
+    """
+    **Status der zeitgesteuerten Zinsgutschrift** (nur Admin)  
+    Zustand, Periode, Fortschritt (Position im Bestand, verzinste Sparkonten), nächster Lauf
+    und ggf. nach einem Absturz manuell zu prüfende Konten.
+    """
+    return {"aktiv": ZINS_PLANER_AKTIV, "modus": ZINS_MODUS, **zins_planer.status()}
+
+
+@app.get("/system/speicher", tags=["System"])
+def speicher_status(current_user: dict = Depends(nur_admin)):
+    """
+    **Status der Speicher-Diagnose** (nur Admin)  
+    Zeigt, ob `tracemalloc` aktiv ist, den aktuellen/maximalen Verbrauch und vorhandene Snapshots.
+    """
+    return speicher_diagnose.status()
+
+
+@app.post("/system/speicher/start", tags=["System"])
+def speicher_start(frames: int = Query(1, ge=1, le=25), current_user: dict = Depends(nur_admin)):
+    """
+    **tracemalloc starten** (nur Admin)  
+    Zeichnet ab jetzt alle Allokationen auf (kostet zusätzliche CPU und Speicher).
+    """
+    logger.info("Speicher-Diagnose gestartet von %s (frames=%s)", current_user['username'], frames)
+    return speicher_diagnose.starten(frames)
+
+
+@app.post("/system/speicher/stop", tags=["System"])
+def speicher_stop(current_user: dict = Depends(nur_admin)):
+    """
+    **tracemalloc stoppen** (nur Admin)  
+    Beendet die Aufzeichnung; vorhandene Snapshots bleiben abrufbar.
+    """
+    logger.info("Speicher-Diagnose gestoppt von %s", current_user['username'])
+    return speicher_diagnose.stoppen()
+
+
+@app.post("/system/speicher/snapshot", tags=["System"])
+def speicher_snapshot(anzahl: int = Query(20, ge=1, le=200), current_user: dict = Depends(nur_admin)):
+    """
+    **Snapshot erstellen** (nur Admin)  
+    Erstellt einen Snapshot und gibt dessen ID sowie die größten Allokationsstellen zurück.
+    """
+    try:
+        snapshot_id = speicher_diagnose.snapshot_erstellen()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=f"⚠️ {str(e)}")
+    return {"id": snapshot_id, "top": speicher_diagnose.top_allokationen(snapshot_id, anzahl)}
+
+
+@app.get("/system/speicher/snapshot/{snapshot_id}", tags=["System"])
+def speicher_snapshot_abrufen(
+    snapshot_id: int,
+    anzahl: int = Query(20, ge=1, le=200),
+    gruppierung: str = Query(
+        "lineno", pattern="^(lineno|filename|traceback)$", description="'lineno', 'filename' oder 'traceback'"
+    ),
+    current_user: dict = Depends(nur_admin)
+):
+    """
+    **Top-Allokationen eines Snapshots** (nur Admin)
+    """
+    try:
+        return {"id": snapshot_id, "top": speicher_diagnose.top_allokationen(snapshot_id, anzahl, gruppierung)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=f"⚠️ {str(e)}")
+
+
+@app.get("/system/speicher/diff", tags=["System"])
+def speicher_diff(
+    von: int,
+    bis: int,
+    anzahl: int = Query(20, ge=1, le=200),
+    gruppierung: str = Query(
+        "lineno", pattern="^(lineno|filename|traceback)$", description="'lineno', 'filename' oder 'traceback'"
+    ),
+    current_user: dict = Depends(nur_admin)
+):
+    """
+    **Differenz zweier Snapshots** (nur Admin)  
+    Zeigt die Allokationsstellen mit dem größten Zuwachs zwischen Snapshot `von` und `bis`
+    (z. B. vor und nach `storage.laden()`).
+    """
+    try:
+        return {"von": von, "bis": bis, "differenz": speicher_diagnose.differenz(von, bis, anzahl, gruppierung)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=f"⚠️ {str(e)}")
+
+
 # --- SECURITY CONFIG ---
 
 @app.post("/login", tags=["Security"])
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """
     **Login für API-Zugang**  
     Authentifiziert einen Benutzer und gibt einen JWT-Token zurück, der für den Zugriff 
     auf geschützte (schreibende) Operationen benötigt wird.
 
     Args:
+        request (Request): Die eingehende Anfrage (für die Client-IP des Rate-Limits).
         form_data (OAuth2PasswordRequestForm): Enthält die vom Benutzer gesendeten 
             Anmeldedaten (Username und Passwort) aus dem HTTP-Form-Body.
 
     Raises:
         HTTPException: Wird geworfen (401 Unauthorized), wenn der Username falsch ist 
             oder das Passwort nicht mit dem gespeicherten Hash übereinstimmt.
+            429 bei zu vielen Versuchen je Benutzer/IP, 503 wenn die Passwortprüfung
+            ausgelastet ist (jeweils mit 'Retry-After').
 
     Returns:
         dict: Ein Dictionary, das den 'access_token' und den 'token_type' (Bearer) enthält.
     """
+    # 0. Rate-Limit je IP und je Benutzername
+    client_ip = request.client.host if request.client else "unbekannt"
+    wartezeit = login_limiter.pruefen(f"ip:{client_ip}")
+    if wartezeit == 0:
+        wartezeit = login_limiter.pruefen(f"user:{form_data.username}")
+    if wartezeit > 0:
+        LOGIN_VERSUCHE.inc(result="gedrosselt")
+        logger.warning("Login gedrosselt: %s (%s)", form_data.username, client_ip)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Zu viele Login-Versuche. Bitte später erneut versuchen.",
+            headers={"Retry-After": str(math.ceil(wartezeit))},
+        )
+
     # 1. Prüfen, ob der User in unserer kleinen Datenbank existiert
     user_data = USERS_DB.get(form_data.username)
 
-    # 2. Passwort validieren
-    if not user_data or not verify_password(form_data.password, user_data["hash"]):
-        logger.warning(f"Login-Fehlversuch: {form_data.username}")
+    # 2. Passwort validieren (bcrypt läuft im Thread-Pool, nicht im Event-Loop)
+    try:
+        passwort_ok = bool(user_data) and await passwort_pruefer.pruefen(form_data.password, user_data["hash"])
+    except LoginUeberlastet as e:
+        LOGIN_VERSUCHE.inc(result="ueberlastet")
+        logger.warning("Login abgelehnt (%s): %s", e, form_data.username)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login-Dienst ist ausgelastet. Bitte später erneut versuchen.",
+            headers={"Retry-After": "1"},
+        )
+
+    if not passwort_ok:
+        LOGIN_VERSUCHE.inc(result="fehlgeschlagen")
+        logger.warning("Login-Fehlversuch: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Ungültige Anmeldedaten",
@@ -267,10 +701,21 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     access_token = create_access_token(
         data={"sub": form_data.username, "role": user_data["role"]}
     )
-    logger.info(f"Erfolgreicher Login: {form_data.username} (Rolle: {user_data['role']})")
+    LOGIN_VERSUCHE.inc(result="erfolg")
+    logger.info("Erfolgreicher Login: %s (Rolle: %s)", form_data.username, user_data['role'])
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+@app.get("/metrics", tags=["System"], response_class=PlainTextResponse)
+def metrics():
+    """
+    **Metriken im Prometheus-Textformat**  
+    Request-Zähler und Latenz-Histogramme je Route und Status, laufende Requests,
+    Dauer der Storage-Operationen sowie Login- und Token-Cache-Zähler.
+    """
+    return PlainTextResponse(registry.exposition(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui_html():
     return get_swagger_ui_html(
@@ -279,18 +724,133 @@ async def custom_swagger_ui_html():
         swagger_favicon_url="/favicon.ico" # Hier verweisen wir auf deinen Endpunkt
     )
 
+def _json_bytes(daten) -> bytes:
+    """Serialisiert wie die Standard-Antwortklasse (einmal je geteilter Berechnung)."""
+    return TimingJSONResponse(jsonable_encoder(daten)).body
+
+async def _gebuendelt(route: str, schluessel, berechnen) -> Response:
+    """
+    Führt `berechnen` (liefert Bytes und Header) im Threadpool aus; gleichzeitige identische
+    Anfragen teilen sich Berechnung und Bytes (SINGLE_FLIGHT_ROUTEN).
+    """
+    body, headers = await single_flight.ausfuehren(
+        route, schluessel, lambda: run_in_threadpool(request_profiler.ausfuehren, berechnen)
+    )
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/konten", tags=["1. Übersicht"])
-def alle_konten():
+async def alle_konten(
+    offset: int = Query(0, ge=0, description="Anzahl der zu überspringenden Konten"),
+    limit: int = Query(None, ge=1, le=10000, description="Seitengröße (ohne Angabe: alle Konten)"),
+):
     """
     **Alle Konten auflisten**  
     Gibt alle Konten dynamisch über den Storage-Provider zurück.
+    Mit `limit` wird seitenweise geliefert; die Gesamtanzahl steht im Header `X-Total-Count`
+    (bei SQLite aus demselben Snapshot wie die Seite).
+    Gleichzeitige identische Anfragen teilen sich einen Ladevorgang.
     """
+    def berechnen():
+        headers = {}
+        if limit is not None:
+            gesamt, konten = hole_storage().konten_seite(offset, limit)
+            headers["X-Total-Count"] = str(gesamt)
+        else:
+            konten = hole_storage().laden()
+        with span("domain"):
+            daten = [k.to_dict() for k in konten]
+        return _json_bytes(daten), headers
+
     try:
-        konten = storage.laden()
-        return [k.to_dict() for k in konten] 
+        return await _gebuendelt("konten", (offset, limit), berechnen)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/konten/batch-lesen", tags=["1. Übersicht"])
+def konten_batch_lesen(anfrage: BatchLesenSchema):
+    """
+    **Mehrere Konten auf einmal lesen**  
+    Löst eine Liste von Namen mit einer Abfrage je Block auf (SQLite: `IN`-Abfrage über den
+    Index auf `LOWER(inhaber)`, JSON: ein Ladevorgang mit Dictionary-Lookups).
+    Liefert gefundene Konten in Reihenfolge der Anfrage und die nicht gefundenen Namen.
+    """
+    gefunden = hole_storage().konten_holen(anfrage.namen)
+    with span("domain"):
+        konten, fehlend, gesehen = [], [], set()
+        for name in anfrage.namen:
+            schluessel = name.strip().lower()
+            if schluessel in gesehen:
+                continue
+            gesehen.add(schluessel)
+            konto = gefunden.get(schluessel)
+            if konto is None:
+                fehlend.append(name)
+            else:
+                konten.append(konto.to_dict())
+    return {"konten": konten, "fehlend": fehlend}
+
+@app.get("/events", tags=["1. Übersicht"])
+async def ereignisse(
+    request: Request,
+    konto: str = Query(None, description="Nur Ereignisse dieses Kontos"),
+    typ: str = Query(None, pattern="^(" + "|".join(EREIGNIS_TYPEN) + ")$", description="Nur diesen Ereignistyp"),
+    kontotyp: str = Query(None, pattern="^(giro|spar)$", description="Nur Giro- oder Sparkonten"),
+):
+    """
+    **Live-Änderungen als Server-Sent Events**  
+    Pusht Kontostandsänderungen und neue Konten, statt `/konten` regelmäßig neu zu laden.
+    Filter: `konto`, `typ` (kontostand, konto_angelegt), `kontotyp` (giro, spar).
+    Clients, die nicht hinterherkommen, werden getrennt (Ereignis `getrennt`) und sollten
+    sich neu verbinden und einmalig `/konten` laden.
+    """
+    try:
+        abo = ereignis_bus.abonnieren(konto, typ, {"giro": "Girokonto", "spar": "Sparkonto"}.get(kontotyp))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=f"⚠️ {str(e)}", headers={"Retry-After": "5"})
+
+    async def strom():
+        try:
+            yield ": verbunden\n\n"
+            while not await request.is_disconnected():
+                if abo.getrennt and abo.queue.empty():
+                    yield "event: getrennt\ndata: {}\n\n"
+                    break
+                ereignis = await abo.naechstes(EVENTS_KEEPALIVE_S)
+                # Kommentarzeile als Keep-Alive, damit Proxys die Verbindung offen halten
+                yield ": keep-alive\n\n" if ereignis is None else sse_format(ereignis)
+        finally:
+            ereignis_bus.abmelden(abo)
+
+    return StreamingResponse(
+        strom(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/konten/export", tags=["1. Übersicht"])
+def konten_exportieren(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Exportformat: 'ndjson' oder 'csv'"),
+    gzip: bool = Query(False, description="Export gzip-komprimiert ausliefern"),
+    batch: int = Query(1000, ge=1, le=50000, description="Zeilen je Lesevorgang"),
+    current_user: dict = Depends(nur_admin),
+):
+    """
+    **Gesamtbestand exportieren (nur Admin)**  
+    Streamt alle Konten als NDJSON oder CSV, optional gzip-komprimiert.
+    Der Speicher wird blockweise gelesen (SQLite `fetchmany`, JSON inkrementell),
+    der Speicherbedarf bleibt daher unabhängig von der Anzahl der Konten konstant.
+    """
+    media_type, endung = FORMATE[format]
+    dateiname = f"konten.{endung}"
+    if gzip:
+        media_type, dateiname = "application/gzip", dateiname + ".gz"
+    logger.info("Export gestartet: %s (%s, gzip=%s)", current_user["username"], format, gzip)
+    return StreamingResponse(
+        export_strom(hole_storage().konten_iterieren(batch), format, komprimieren=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{dateiname}"'},
+    )
+
 @app.post("/transaktion/einzahlen/{name}", response_model=TransaktionErgebnis, tags=["2. Transaktionen"])
 def einzahlen_api(
     name: str, 
@@ -313,15 +873,18 @@ def einzahlen_api(
         # konten = storage.laden() - nicht mehr notwendig
 
         # 2. Konto suchen (DIESE Zeile wirft den ValueError, wenn nichts gefunden wird)
-        k = storage.konto_holen(name)
+        # Transaktion: Lesen -> Ändern -> Schreiben ohne verlorene Updates (auch zwischen Prozessen)
+        with hole_storage().transaktion(name) as konten:
+            k = konten[name]
 
-        # 3. Logik ausführen
-        nachricht = k.einzahlen(betrag)
-        
-        # 4. Speichern
-        storage.update_kontostand(k) # storage.speichern(konten) - alte version
+            # 3. Logik ausführen
+            with span("domain"):
+                nachricht = k.einzahlen(betrag)
+
+            # 4. Speichern erfolgt beim Verlassen des Blocks
+            # storage.update_kontostand(k) - alte version
         
-        logger.info(f"Transaktion: {current_user['username']} hat {betrag} EUR auf {name} eingezahlt.")
+        logger.info("Transaktion: %s hat %s EUR auf %s eingezahlt.", current_user['username'], betrag, name)
         return {
             "nachricht": nachricht, 
             "inhaber": k.inhaber,
@@ -330,6 +893,9 @@ def einzahlen_api(
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"⚠️ {str(e)}")
+
+    except TimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"⚠️ {str(e)}", headers={"Retry-After": "1"})
         
     except Exception as e:
         # Nur echte Systemfehler landen hier (z.B. Festplatte voll beim Speichern)
@@ -351,12 +917,14 @@ def abheben_api(
     
     try:
         # konten = storage.laden()  - nicht mehr notwendig
-        k = storage.konto_holen(name)
-        # Hier greift eine Logik aus girokonto.py / sparkonto.py
-        nachricht = k.abheben(betrag) 
-        storage.update_kontostand(k) # storage.speichern(konten) - alte version
+        with hole_storage().transaktion(name) as konten:
+            k = konten[name]
+            # Hier greift eine Logik aus girokonto.py / sparkonto.py
+            # (Limit-Prüfung und Schreiben erfolgen in derselben Transaktion)
+            with span("domain"):
+                nachricht = k.abheben(betrag)
         
-        logger.info(f"Transaktion: {current_user['username']} hat {betrag} EUR von {name} abgehoben.")
+        logger.info("Transaktion: %s hat %s EUR von %s abgehoben.", current_user['username'], betrag, name)
         return {
             "nachricht": nachricht,
             "inhaber": k.inhaber,
@@ -365,15 +933,18 @@ def abheben_api(
     except ValueError as e:
         # Hier fangen wir z.B. "Dispo überschritten" ab
         raise HTTPException(status_code=400, detail=f"⚠️ {str(e)}")
+    except TimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"⚠️ {str(e)}", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail="❌ Interner Serverfehler")
     
 
 @app.get("/suche", tags=["3. Verwaltung"])
-def api_suchen(name: str):
+async def api_suchen(name: str):
     """
     Sucht alle Konten, die den Suchbegriff im Namen enthalten.
-    Gibt eine Liste der Treffer zurück.
+    Gibt eine Liste der Treffer zurück. Gleichzeitige Suchen nach demselben
+    Begriff (ohne Groß-/Kleinschreibung) teilen sich einen Suchlauf.
 
     Args:
         name (str): Der Name des gesuchten Kontoinhabers.
@@ -381,11 +952,15 @@ def api_suchen(name: str):
     Returns:
         treffer: Gibt die Liste der Treffer zurück.
     """
-    konten = storage.laden()
-    treffer = filtere_konten(konten, name)
-    if not treffer:
-        return {"nachricht": "Keine Treffer", "ergebnisse": []}
-    return treffer
+    def berechnen():
+        konten = hole_storage().laden()
+        with span("domain"):
+            treffer = filtere_konten(konten, name)
+        if not treffer:
+            return _json_bytes({"nachricht": "Keine Treffer", "ergebnisse": []}), {}
+        return _json_bytes(treffer), {}
+
+    return await _gebuendelt("suche", name.strip().lower(), berechnen)
 
 # --- GESCHÜTZTER ENDPUNKT ---
 @app.post("/konten/erstellen", tags=["3. Verwaltung"])
@@ -397,7 +972,7 @@ def konto_erstellen(daten: KontoErstellenSchema, current_user: dict = Depends(ge
     """
     # --- ROLLEN-CHECK ---
     if current_user["role"] != "admin":
-        logger.warning(f"Zugriff verweigert: User {current_user['username']} hat keine Admin-Rechte.")
+        logger.warning("Zugriff verweigert: User %s hat keine Admin-Rechte.", current_user['username'])
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="⚠️ Zugriff verweigert: Nur Administratoren dürfen Konten erstellen."
@@ -414,7 +989,7 @@ def konto_erstellen(daten: KontoErstellenSchema, current_user: dict = Depends(ge
             raise ValueError("⚠️ Ungültiger Kontotyp! Erlaubt sind 'giro' oder 'spar'.")
         
         # Hier wird automatisch auf Duplikate geprüf
-        storage.konto_hinzufuegen(neues_k)
+        hole_storage().konto_hinzufuegen(neues_k)
         
         return {"status": "✅ Erfolg", "admin": current_user["username"], "details": f"Konto für {daten.name} ({typ}) erstellt."}
 
@@ -425,6 +1000,50 @@ def konto_erstellen(daten: KontoErstellenSchema, current_user: dict = Depends(ge
         raise HTTPException(status_code=500, detail=f"❌ Systemfehler: {str(e)}")
 
 
+@app.post("/konten/import", tags=["3. Verwaltung"])
+async def konten_importieren(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Importformat: 'ndjson' oder 'csv'"),
+    chunk: int = Query(1000, ge=1, le=10000, description="Zeilen je Transaktion"),
+    current_user: dict = Depends(nur_admin),
+):
+    """
+    **Konten-Massenimport (nur Admin)**  
+    Liest den Request-Body als Strom (NDJSON oder CSV mit Kopfzeile, z. B. aus `/konten/export`)
+    und legt die Konten blockweise an: eine Duplikat-Abfrage und eine Transaktion je Block.
+    Abgelehnte Zeilen werden mit Grund und Namensvorschlägen gemeldet.
+    """
+    leser = ZeilenLeser(format)
+    importer = KontenImport(hole_storage(), chunk)
+    try:
+        async for teil in request.stream():
+            if importer.hinzufuegen(leser.fuettern(teil)):
+                await run_in_threadpool(request_profiler.ausfuehren, importer.block_anlegen)
+        importer.hinzufuegen(leser.abschliessen())
+        await run_in_threadpool(request_profiler.ausfuehren, importer.block_anlegen, True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"⚠️ {str(e)}")
+    except IOError as e:
+        raise HTTPException(status_code=500, detail=f"❌ Import abgebrochen nach {importer.angelegt} Konten: {str(e)}")
+    logger.info("Import durch %s: %s angelegt.", current_user["username"], importer.angelegt)
+    return importer.ergebnis()
+
+@app.post("/konten/erstellen/batch", tags=["3. Verwaltung"])
+def konten_erstellen_batch(daten: list[KontoErstellenSchema], current_user: dict = Depends(nur_admin)):
+    """
+    **Mehrere Konten erstellen (nur Admin)**  
+    Wie `/konten/erstellen`, aber für eine Liste: Duplikate werden je Block mit einer
+    Abfrage erkannt und nicht angelegt, sondern mit Namensvorschlägen gemeldet.
+    """
+    importer = KontenImport(hole_storage())
+    importer.hinzufuegen((i, eintrag.model_dump(), None) for i, eintrag in enumerate(daten, start=1))
+    try:
+        importer.block_anlegen(alles=True)
+    except IOError as e:
+        raise HTTPException(status_code=500, detail=f"❌ Systemfehler: {str(e)}")
+    return importer.ergebnis()
+
+
 @app.post("/zinsen/gutschreiben/{name}", tags=["4. Zinsen"])
 def zinsen_gutschreiben(name: str, current_user: dict = Depends(get_current_user)):
     """
@@ -433,25 +1052,31 @@ def zinsen_gutschreiben(name: str, current_user: dict = Depends(get_current_user
     """
     # Security Check
     if current_user["role"] != "admin":
-        logger.warning(f"Sicherheitswarnung: User {current_user['username']} (Rolle: {current_user['role']}) versuchte Zinsgutschrift für {name}.")
+        logger.warning("Sicherheitswarnung: User %s (Rolle: %s) versuchte Zinsgutschrift für %s.", current_user['username'], current_user['role'], name)
         raise HTTPException(status_code=403, detail="Nur Administratoren dürfen Zinsen gutschreiben.")
     
     try:
-        k = storage.konto_holen(name)
-        
-        # Wir prüfen, ob das Objekt die Methode 'zinsen_berechnen' besitzt
-        if not hasattr(k, 'zinsen_berechnen'):
-            raise ValueError(f"⚠️ Konto '{name}' ist kein Sparkonto und erhält keine Zinsen.")
-            
-        nachricht = k.zinsen_berechnen()
-        storage.update_kontostand(k) # storage.speichern(konten) - alte version
+        with hole_storage().transaktion(name) as konten:
+            k = konten[name]
+
+            # Wir prüfen, ob das Objekt die Methode 'zinsen_berechnen' besitzt
+            if not hasattr(k, 'zinsen_berechnen'):
+                raise ValueError(f"⚠️ Konto '{name}' ist kein Sparkonto und erhält keine Zinsen.")
 
-        logger.info(f"Zinsgutschrift erfolgreich: Admin '{current_user['username']}' hat Zinsen für Konto '{name}' verbucht. {nachricht}")
+            with span("domain"):
+                nachricht = k.zinsen_berechnen()
+
+        logger.info("Zinsgutschrift erfolgreich: Admin '%s' hat Zinsen für Konto '%s' verbucht. %s", current_user['username'], name, nachricht)
         return {"status": "✅ Erfolg", "details": nachricht, "neuer_stand": k.kontostand}
 
     except ValueError as e:
-        logger.error(f"Fehler bei Zinsgutschrift für {name}: {e}")
+        logger.error("Fehler bei Zinsgutschrift für %s: %s", name, e)
         raise HTTPException(status_code=400, detail=f"⚠️ {str(e)}")
+    except TimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"⚠️ {str(e)}", headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error("Fehler bei Zinsgutschrift für %s: %s", name, e)
+        raise HTTPException(status_code=500, detail="❌ Interner Serverfehler")
 
 
 
@@ -462,12 +1087,13 @@ def zinsen_simulieren(name: str, sonderzins: float = Query(..., gt=0)):
     Berechnet temporär Zinsen mit einem abweichenden Zinssatz (keine dauerhafte Änderung).
     """
     try:
-        k = storage.konto_holen(name)
+        k = hole_storage().konto_holen(name)
         
         if not hasattr(k, 'zinsen_berechnen_mit'):
             raise ValueError(f"⚠️ Simulation für '{name}' nicht verfügbar (kein Sparkonto).")
             
-        ergebnis = k.zinsen_berechnen_mit(sonderzins)
+        with span("domain"):
+            ergebnis = k.zinsen_berechnen_mit(sonderzins)
         return {"status": "✅ Simulation", "ergebnis": ergebnis}
 
     except ValueError as e:
@@ -480,6 +1106,9 @@ async def chrome_devtools_json():
     """Unterdrückt 404-Fehler durch Chrome DevTools Anfragen."""
     return Response(content="", media_type="application/json")
 
+# Requests, deren Gesamtdauer diese Schwelle überschreitet, werden mit Aufschlüsselung geloggt
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
 # Pfad zum Icon
 BASE_DIR = Path(__file__).resolve().parent
 FAVICON_PATH = BASE_DIR / "static" / "favicon.ico"
@@ -495,20 +1124,139 @@ async def favicon():
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+class _FreigabeNachBody:
+    """
+    Umschließt den Body-Iterator einer Antwort und ruft `freigeben` genau einmal auf,
+    sobald der Body vollständig gesendet, abgebrochen oder verworfen wurde.
+    """
+
+    def __init__(self, body, freigeben):
+        self._body = body
+        self._freigeben = freigeben
+        self._offen = True
+
+    def _beenden(self):
+        if self._offen:
+            self._offen = False
+            self._freigeben()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._body.__anext__()
+        except BaseException:
+            # Auch StopAsyncIteration: Body vollständig gesendet
+            self._beenden()
+            raise
+
+    async def aclose(self):
+        self._beenden()
+        if hasattr(self._body, "aclose"):
+            await self._body.aclose()
+
+    def __del__(self):
+        # Body nie gelesen (z. B. Verbindung vor dem Senden getrennt)
+        self._beenden()
+
+
+@app.middleware("http")
+async def lastschutz_pruefen(request: Request, call_next):
+    """
+    Weist Anfragen mit 429 ab, wenn das Kontingent des Clients (Benutzer aus dem Token,
+    sonst IP) für die Routen-Gruppe erschöpft ist, und mit 503, wenn zu viele Anfragen
+    gleichzeitig laufen (jeweils mit 'Retry-After').
+    Liegt innerhalb von `log_requests`, damit abgewiesene Anfragen geloggt und gezählt werden.
+    Eine Anfrage zählt als laufend, bis ihr Body gesendet ist (z. B. ein gestreamter Export).
+    """
+    if lastschutz is None:
+        return await call_next(request)
+    gruppe, kosten = lastschutz.regel(request.method, request.url.path)
+    if gruppe is None:
+        return await call_next(request)
+
+    benutzer = benutzer_aus_request(request)
+    client = f"user:{benutzer['username']}" if benutzer else f"ip:{request.client.host if request.client else 'unbekannt'}"
+    status_code, wartezeit = lastschutz.zulassen(client, gruppe, kosten)
+    if status_code is not None:
+        detail = ("Zu viele Anfragen. Bitte später erneut versuchen." if status_code == 429
+                  else "Server ist ausgelastet. Bitte später erneut versuchen.")
+        return JSONResponse(
+            status_code=status_code,
+            content={"detail": f"⚠️ {detail}"},
+            headers={"Retry-After": str(max(1, math.ceil(min(wartezeit, 3600))))},
+        )
+    schutz = lastschutz
+    try:
+        response = await call_next(request)
+    except BaseException:
+        schutz.beenden()
+        raise
+    response.body_iterator = _FreigabeNachBody(response.body_iterator, schutz.beenden)
+    return response
+
+
 @app.middleware("http")
 async def log_requests(request, call_next):
-   start_time = time.time()
+   start_time = time.perf_counter()
+   HTTP_LAUFEND.inc(method=request.method)
+   status_code = 500
+   # Request-lokale Zeitmessung (Auth, Storage, Domain-Logik, Serialisierung)
+   timing_token = messung_starten()
+
+   # Profiling auf Anforderung eines Admins oder per 1-aus-N-Sampling
+   # (erfasst nur die Endpunkt-Ausführung im Thread-Pool, nicht den Event-Loop)
+   profil, profil_art, profile_liste = None, None, None
+   if request.headers.get("x-profile") == "1" or request.query_params.get("profile") == "1":
+       benutzer = benutzer_aus_request(request)
+       if benutzer and benutzer["role"] == "admin":
+           profil, profil_art = request_profiler.starten(), "manuell"
+   elif request_profiler.sampling_faellig():
+       profil, profil_art = request_profiler.starten(), "sample"
+
+   try:
+       # Die Anfrage wird verarbeitet
+       response = await call_next(request)
+       status_code = response.status_code
+   finally:
+       duration = time.perf_counter() - start_time
+       spans = messung_beenden(timing_token)
+       if profil is not None:
+           profile_liste = request_profiler.anhalten(profil)
+       HTTP_LAUFEND.dec(method=request.method)
+       # Routen-Template statt konkretem Pfad, damit die Label-Anzahl begrenzt bleibt
+       route = request.scope.get("route")
+       route_pfad = getattr(route, "path", "<unbekannt>")
+       HTTP_ANFRAGEN.inc(method=request.method, route=route_pfad, status=status_code)
+       HTTP_DAUER.observe(duration, method=request.method, route=route_pfad, status=status_code)
 
-   # Die Anfrage wird verarbeitet
-   response = await call_next(request)
+   response.headers["Server-Timing"] = header_wert(spans, duration)
+   # Speichern und Rotieren der Profile blockiert (Datei-I/O) und läuft daher im Thread-Pool
+   profil_id = None
+   if profile_liste is not None:
+       profil_id = await run_in_threadpool(request_profiler.speichern, profile_liste, profil_art)
+   if profil_id and profil_art == "manuell":
+       response.headers["X-Profile-Id"] = profil_id
 
-   duration = time.time() - start_time
+   if duration * 1000 > SLOW_REQUEST_MS:
+       aufschluesselung = zusammenfassen(spans)
+       logger.warning(
+           "Langsamer Request: %s %s | Status: %s | Duration: %.4fs | Abschnitte (ms): %s",
+           request.method, request.url.path, status_code, duration,
+           ", ".join(f"{name}={ms:.1f}" for name, ms in aufschluesselung.items()),
+       )
 
-   # Monitoring Log-Eintrag
-   logger.info(
-       f"Inbound: {request.method} {request.url.path} | "
-       f"Status: {response.status_code} | "
-       f"Duration: {duration:.4f}s"
-   ) 
+   # Monitoring Log-Eintrag (wird bei hoher Last gesampelt, Formatierung erst bei Ausgabe)
+   access_logger.info(
+       "Inbound: %s %s | Status: %s | Duration: %.4fs",
+       request.method, request.url.path, response.status_code, duration,
+       extra={"felder": {
+           "methode": request.method,
+           "pfad": request.url.path,
+           "status": response.status_code,
+           "dauer_s": round(duration, 6),
+       }},
+   )
 
    return response
@@ -1,7 +1,6 @@
 import os
-from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
+from functools import lru_cache
 from logger_config import logger
 from dotenv import load_dotenv
 
@@ -16,7 +15,11 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # Password Hashing Setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt werden erst beim ersten Login importiert (schnellerer Start der API)
+@lru_cache(maxsize=1)
+def _pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # In einem echten System käme dieser Hash aus der SQL-Datenbank
 USERS_DB = {
@@ -41,7 +44,7 @@ def verify_password(plain_password: str, hached_password: str) -> bool:
     Returns:
         bool: True, wenn die Passwörter übereinstimmen, andernfalls False.
     """
-    return pwd_context.verify(plain_password, hached_password)
+    return _pwd_context().verify(plain_password, hached_password)
 
 def create_access_token(data: dict) -> str:
     """
@@ -53,6 +56,8 @@ def create_access_token(data: dict) -> str:
     Returns:
         str: Der fertig kodierte und mit dem SECRET_KEY signierte JWT-String.
     """
+    from jose import jwt
+
     try:
         to_encode = data.copy()
         jetzt_utc = datetime.now(timezone.utc)
@@ -63,12 +68,12 @@ def create_access_token(data: dict) -> str:
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         
         # --- LOGGER INFO ---
-        logger.info(f"JWT-Token erstellt für User: {data.get('sub')} | Rolle: {data.get('role')}")
+        logger.info("JWT-Token erstellt für User: %s | Rolle: %s", data.get('sub'), data.get('role'))
         
         return encoded_jwt
     except Exception as e:
         # --- LOGGER ERROR ---
-        logger.error(f"Fehler bei der JWT-Erstellung: {e}")
+        logger.error("Fehler bei der JWT-Erstellung: %s", e)
         raise e
 
 
@@ -0,0 +1,6 @@
+"""
+Benchmarks für die Bank-Management-API.
+
+Jedes Modul ist direkt ausführbar (`python -m benchmarks.<modul>`) und gibt
+seine Ergebnisse als JSON aus.
+"""
@@ -0,0 +1,118 @@
+"""
+Gemeinsame Auswertung für die Benchmarks: Perzentile, Metadaten und
+maschinenlesbare Ergebnisdateien, die zwischen Commits verglichen werden können.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+
+def perzentil(werte, p: float) -> float:
+    """
+    Liefert das p-Perzentil (Nearest-Rank) einer Werteliste.
+
+    Args:
+        werte (list): Messwerte (unsortiert).
+        p (float): Perzentil zwischen 0 und 100.
+
+    Returns:
+        float: Der Wert am Rang ceil(p/100 * n), 0.0 bei leerer Liste.
+    """
+    if not werte:
+        return 0.0
+    sortiert = sorted(werte)
+    rang = max(1, math.ceil(p / 100 * len(sortiert)))
+    return sortiert[rang - 1]
+
+
+def latenz_zusammenfassung(latenzen, dauer: float) -> dict:
+    """
+    Fasst Latenzen (Sekunden) zu Durchsatz und Perzentilen (Millisekunden) zusammen.
+
+    Args:
+        latenzen (list): Einzel-Latenzen in Sekunden.
+        dauer (float): Gesamtdauer der Messung in Sekunden.
+
+    Returns:
+        dict: Anzahl, ops/s sowie p50, p90, p99 und Maximum in ms.
+    """
+    return {
+        "anzahl": len(latenzen),
+        "ops_pro_s": round(len(latenzen) / dauer, 2) if dauer > 0 else 0.0,
+        "p50_ms": round(perzentil(latenzen, 50) * 1000, 3),
+        "p90_ms": round(perzentil(latenzen, 90) * 1000, 3),
+        "p99_ms": round(perzentil(latenzen, 99) * 1000, 3),
+        "max_ms": round(max(latenzen, default=0.0) * 1000, 3),
+    }
+
+
+def metadaten() -> dict:
+    """dict: Commit, Python-Version, Plattform und Zeitpunkt des Laufs."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "plattform": platform.platform(),
+        "cpu_anzahl": os.cpu_count(),
+        "zeitpunkt": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def ergebnis_schreiben(pfad: str, benchmark: str, parameter: dict, ergebnisse: list):
+    """
+    Schreibt die Ergebnisse als JSON-Datei (stabile Schlüsselreihenfolge, diff-freundlich).
+
+    Args:
+        pfad (str): Zieldatei.
+        benchmark (str): Name des Benchmarks.
+        parameter (dict): Aufrufparameter des Laufs.
+        ergebnisse (list): Ergebniszeilen (dicts).
+    """
+    verzeichnis = os.path.dirname(pfad)
+    if verzeichnis:
+        os.makedirs(verzeichnis, exist_ok=True)
+    with open(pfad, "w", encoding="utf-8") as f:
+        json.dump(
+            {"benchmark": benchmark, "metadaten": metadaten(), "parameter": parameter, "ergebnisse": ergebnisse},
+            f, indent=2, ensure_ascii=False, sort_keys=True,
+        )
+        f.write("\n")
+
+
+def vergleichen(alt_pfad: str, neu_pfad: str, schluessel: tuple, metriken: tuple) -> list:
+    """
+    Vergleicht zwei Ergebnisdateien zeilenweise.
+
+    Args:
+        alt_pfad (str): Ergebnisdatei des Basis-Commits.
+        neu_pfad (str): Ergebnisdatei des neuen Commits.
+        schluessel (tuple): Felder, die eine Ergebniszeile identifizieren.
+        metriken (tuple): Zu vergleichende numerische Felder.
+
+    Returns:
+        list: Zeilen mit Schlüssel, altem/neuem Wert und relativer Änderung in Prozent.
+    """
+    def einlesen(pfad):
+        with open(pfad, "r", encoding="utf-8") as f:
+            return {tuple(z[s] for s in schluessel): z for z in json.load(f)["ergebnisse"]}
+
+    alt, neu = einlesen(alt_pfad), einlesen(neu_pfad)
+    zeilen = []
+    for kennung in sorted(set(alt) & set(neu), key=str):
+        for metrik in metriken:
+            a, n = alt[kennung].get(metrik), neu[kennung].get(metrik)
+            if a is None or n is None:
+                continue
+            aenderung = round((n - a) / a * 100, 1) if a else None
+            zeilen.append({"kennung": list(kennung), "metrik": metrik, "alt": a, "neu": n, "aenderung_prozent": aenderung})
+    return zeilen
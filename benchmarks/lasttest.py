@@ -0,0 +1,265 @@
+"""
+Lasttest für die gesamte API (asyncio + httpx).
+
+Läuft gegen einen laufenden Server (`--ziel http://localhost:8000`, z. B. uvicorn)
+oder in-process direkt gegen die ASGI-App (`--inprocess`, mit temporärem Speicher).
+Die Anfragen werden nach einem gewichteten Mix (Login, /konten, /suche,
+Einzahlen, Abheben) von `--parallel` Clients gesendet, die über `--rampe`
+Sekunden verteilt starten und bis zum Ende von `--dauer` laufen.
+
+Ausgabe je Endpunkt: Durchsatz, Fehlerquote (5xx/Verbindungsfehler), fachlich
+abgelehnte Anfragen (4xx) und Latenz-Perzentile. Anschließend wird geprüft, ob
+die Kontostände der Zielkonten exakt der Summe der bestätigten Transaktionen
+entsprechen (keine verlorenen Updates). Während des Laufs dürfen keine anderen
+Clients diese Konten verändern.
+
+Aufruf:
+    python -m benchmarks.lasttest --inprocess --dauer 20 --parallel 50
+    python -m benchmarks.lasttest --ziel http://localhost:8000 --mix konten=5,suche=3,einzahlen=2,abheben=2,login=1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+PROJEKT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJEKT_DIR not in sys.path:
+    sys.path.insert(0, PROJEKT_DIR)
+
+from benchmarks.auswertung import latenz_zusammenfassung, ergebnis_schreiben
+
+STANDARD_MIX = "login=1,konten=4,suche=4,einzahlen=3,abheben=3"
+ENDPUNKTE = ("login", "konten", "suche", "einzahlen", "abheben")
+
+
+def mix_parsen(text: str) -> dict:
+    """
+    Wandelt 'konten=4,einzahlen=2' in ein Gewichts-Dictionary um.
+
+    Raises:
+        ValueError: Bei unbekannten Endpunkten oder ohne positives Gewicht.
+    """
+    mix = {}
+    for teil in text.split(","):
+        if not teil.strip():
+            continue
+        name, _, gewicht = teil.partition("=")
+        name = name.strip()
+        if name not in ENDPUNKTE:
+            raise ValueError(f"Unbekannter Endpunkt im Mix: {name} (erlaubt: {', '.join(ENDPUNKTE)})")
+        mix[name] = float(gewicht or 1)
+    if not any(g > 0 for g in mix.values()):
+        raise ValueError("Der Mix braucht mindestens ein positives Gewicht.")
+    return mix
+
+
+class Lasttest:
+    """
+    Führt den Lasttest aus und sammelt die Messwerte.
+
+    Attributes:
+        client (httpx.AsyncClient): HTTP-Client (Netzwerk oder ASGI-Transport).
+        mix (dict): Endpunkt -> Gewicht.
+        konten (list): Zielkonten für Suche und Transaktionen.
+        betrag (float): Betrag je Transaktion.
+    """
+
+    def __init__(self, client, mix: dict, konten: list, benutzer: str, passwort: str, betrag: float = 1.0):
+        self.client = client
+        self.mix = mix
+        self.konten = konten
+        self.benutzer = benutzer
+        self.passwort = passwort
+        self.betrag = betrag
+        self.token = None
+        self.latenzen = {e: [] for e in ENDPUNKTE}
+        self.serverfehler = {e: 0 for e in ENDPUNKTE}
+        self.verbindungsfehler = {e: 0 for e in ENDPUNKTE}
+        self.abgelehnt = {e: 0 for e in ENDPUNKTE}
+        # Netto-Änderung je Konto aus bestätigten (200) Transaktionen
+        self.bestaetigt = {k: 0.0 for k in konten}
+        # Transaktionen ohne Antwort: Ergebnis auf dem Server unbekannt
+        self.unbekannt = 0
+
+    async def anmelden(self) -> str:
+        """Holt einen Token für die Transaktionen."""
+        antwort = await self.client.post("/login", data={"username": self.benutzer, "password": self.passwort})
+        antwort.raise_for_status()
+        return antwort.json()["access_token"]
+
+    async def kontostaende(self) -> dict:
+        """dict: Aktuelle Kontostände der Zielkonten (Name -> Saldo)."""
+        antwort = await self.client.get("/konten")
+        antwort.raise_for_status()
+        # to_dict() liefert die Instanz-Variablen, daher '_kontostand'
+        staende = {k["inhaber"].lower(): k.get("kontostand", k.get("_kontostand")) for k in antwort.json()}
+        return {name: staende[name.lower()] for name in self.konten}
+
+    async def _anfrage(self, endpunkt: str):
+        """Sendet eine Anfrage des gewählten Typs und erfasst Latenz und Status."""
+        konto = random.choice(self.konten)
+        if endpunkt == "login":
+            aufruf = self.client.post("/login", data={"username": self.benutzer, "password": self.passwort})
+        elif endpunkt == "konten":
+            aufruf = self.client.get("/konten")
+        elif endpunkt == "suche":
+            aufruf = self.client.get("/suche", params={"name": konto[:2]})
+        else:
+            aufruf = self.client.post(
+                f"/transaktion/{endpunkt}/{konto}",
+                params={"betrag": self.betrag},
+                headers={"Authorization": f"Bearer {self.token}"},
+            )
+
+        start = time.perf_counter()
+        try:
+            antwort = await aufruf
+        except httpx.HTTPError:
+            self.verbindungsfehler[endpunkt] += 1
+            if endpunkt in ("einzahlen", "abheben"):
+                self.unbekannt += 1
+            return
+        self.latenzen[endpunkt].append(time.perf_counter() - start)
+
+        if antwort.status_code >= 500:
+            self.serverfehler[endpunkt] += 1
+        elif antwort.status_code >= 400:
+            self.abgelehnt[endpunkt] += 1
+        elif endpunkt == "einzahlen":
+            self.bestaetigt[konto] += self.betrag
+        elif endpunkt == "abheben":
+            self.bestaetigt[konto] -= self.betrag
+
+    async def _client_schleife(self, startverzoegerung: float, ende: float):
+        """Ein virtueller Client: startet nach der Rampen-Verzögerung und sendet bis zum Ende."""
+        await asyncio.sleep(startverzoegerung)
+        namen = list(self.mix)
+        gewichte = list(self.mix.values())
+        while time.perf_counter() < ende:
+            await self._anfrage(random.choices(namen, gewichte)[0])
+
+    async def ausfuehren(self, parallel: int, rampe: float, dauer: float) -> dict:
+        """
+        Führt den Lasttest aus.
+
+        Args:
+            parallel (int): Anzahl gleichzeitiger Clients.
+            rampe (float): Zeitraum in Sekunden, über den die Clients gestartet werden.
+            dauer (float): Gesamtdauer in Sekunden (inkl. Rampe).
+
+        Returns:
+            dict: Ergebnis je Endpunkt und Konsistenzprüfung.
+        """
+        self.token = await self.anmelden()
+        vorher = await self.kontostaende()
+
+        start = time.perf_counter()
+        ende = start + dauer
+        await asyncio.gather(*(
+            self._client_schleife(rampe * i / parallel, ende) for i in range(parallel)
+        ))
+        gesamt = time.perf_counter() - start
+        nachher = await self.kontostaende()
+
+        endpunkte = []
+        for endpunkt in ENDPUNKTE:
+            gesendet = len(self.latenzen[endpunkt]) + self.verbindungsfehler[endpunkt]
+            if not gesendet:
+                continue
+            fehler = self.serverfehler[endpunkt] + self.verbindungsfehler[endpunkt]
+            endpunkte.append({
+                "endpunkt": endpunkt,
+                **latenz_zusammenfassung(self.latenzen[endpunkt], gesamt),
+                "gesendet": gesendet,
+                "fehler": fehler,
+                "abgelehnt_4xx": self.abgelehnt[endpunkt],
+                "fehlerquote": round(fehler / gesendet, 4),
+            })
+
+        konsistenz = []
+        for konto in self.konten:
+            erwartet = round(vorher[konto] + self.bestaetigt[konto], 2)
+            konsistenz.append({
+                "konto": konto,
+                "vorher": vorher[konto],
+                "erwartet": erwartet,
+                "nachher": nachher[konto],
+                "ok": abs(nachher[konto] - erwartet) < 0.005,
+            })
+        return {
+            "dauer_s": round(gesamt, 2),
+            "endpunkte": endpunkte,
+            "konsistenz": konsistenz,
+            "transaktionen_unbekannt": self.unbekannt,
+        }
+
+
+def _client_erstellen(args):
+    """Erzeugt den HTTP-Client: Netzwerk (uvicorn) oder ASGI-Transport (in-process)."""
+    limits = httpx.Limits(max_connections=args.parallel, max_keepalive_connections=args.parallel)
+    if not args.inprocess:
+        return httpx.AsyncClient(base_url=args.ziel, timeout=args.timeout, limits=limits)
+
+    # In-process: eigener temporärer Speicher, damit echte Daten unberührt bleiben
+    verzeichnis = tempfile.mkdtemp(prefix="lasttest-")
+    os.environ.setdefault("JSON_FILE", os.path.join(verzeichnis, "konten.json"))
+    os.environ.setdefault("DB_FILE", os.path.join(verzeichnis, "bank_data.db"))
+    os.chdir(PROJEKT_DIR)  # StaticFiles erwartet das Projektverzeichnis
+    import api
+    # ASGITransport löst keinen lifespan aus: Initialisierung wie beim Serverstart
+    api.stelle_datenbank_sicher()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://lasttest",
+                             timeout=args.timeout)
+
+
+async def _ausfuehren(args) -> dict:
+    async with _client_erstellen(args) as client:
+        test = Lasttest(client, mix_parsen(args.mix), [k.strip() for k in args.konten.split(",")],
+                        args.benutzer, args.passwort, args.betrag)
+        return await test.ausfuehren(args.parallel, args.rampe, args.dauer)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Lasttest für die Bank-API")
+    ziel = parser.add_mutually_exclusive_group()
+    ziel.add_argument("--ziel", default="http://localhost:8000", help="Basis-URL eines laufenden Servers")
+    ziel.add_argument("--inprocess", action="store_true", help="Direkt gegen die ASGI-App (ohne Netzwerk)")
+    parser.add_argument("--mix", default=STANDARD_MIX, help=f"Gewichteter Anfrage-Mix (Standard: {STANDARD_MIX})")
+    parser.add_argument("--parallel", type=int, default=20, help="Gleichzeitige Clients")
+    parser.add_argument("--rampe", type=float, default=5.0, help="Anlaufzeit in Sekunden")
+    parser.add_argument("--dauer", type=float, default=30.0, help="Gesamtdauer in Sekunden")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout je Anfrage in Sekunden")
+    parser.add_argument("--konten", default="Tom,Jim", help="Zielkonten (kommagetrennt)")
+    parser.add_argument("--betrag", type=float, default=1.0, help="Betrag je Transaktion")
+    parser.add_argument("--benutzer", default=os.getenv("LASTTEST_BENUTZER", "DEMO_USER"))
+    parser.add_argument("--passwort", default=os.getenv("LASTTEST_PASSWORT", "Demo_Softmaster_API_2026"))
+    parser.add_argument("--max-fehlerquote", type=float, default=0.01, help="Grenzwert je Endpunkt (0-1)")
+    parser.add_argument("--ausgabe", default=os.path.join("benchmarks", "ergebnisse", "lasttest.json"))
+    args = parser.parse_args(argv)
+
+    ergebnis = asyncio.run(_ausfuehren(args))
+    parameter = {k: v for k, v in vars(args).items() if k != "passwort"}
+    ergebnis_schreiben(args.ausgabe, "lasttest", parameter,
+                       [{"endpunkt": "konsistenz", "konten": ergebnis["konsistenz"]}] + ergebnis["endpunkte"])
+    print(json.dumps(ergebnis, indent=2, ensure_ascii=False))
+
+    probleme = [e["endpunkt"] for e in ergebnis["endpunkte"] if e["fehlerquote"] > args.max_fehlerquote]
+    inkonsistent = [k["konto"] for k in ergebnis["konsistenz"] if not k["ok"]]
+    if probleme:
+        print(f"Fehlerquote überschritten: {', '.join(probleme)}", file=sys.stderr)
+    if inkonsistent and not ergebnis["transaktionen_unbekannt"]:
+        print(f"Kontostände inkonsistent: {', '.join(inkonsistent)}", file=sys.stderr)
+    elif inkonsistent:
+        print(f"Kontostände weichen ab, {ergebnis['transaktionen_unbekannt']} Transaktionen ohne Antwort.",
+              file=sys.stderr)
+    return 1 if probleme or inkonsistent else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
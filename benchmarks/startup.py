@@ -0,0 +1,90 @@
+"""
+Startzeit-Benchmark: Misst den Import von `api` und die Speicher-Initialisierung
+(lifespan) in frischen Python-Prozessen mit einem großen Datenbestand.
+
+Schlägt fehl (Exit-Code 1), wenn der Median die Grenzwerte überschreitet oder
+schwere Abhängigkeiten (jose, passlib) bereits beim Import geladen werden.
+
+Aufruf:
+    python -m benchmarks.startup --konten 50000 --max-import-ms 3000 --max-init-ms 250
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJEKT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module, die erst bei Bedarf (Login/Token-Prüfung) importiert werden dürfen
+VERZOEGERTE_MODULE = ("jose", "passlib")
+
+_MESSUNG = """
+import json, sys, time
+start = time.perf_counter()
+import api
+import_ms = (time.perf_counter() - start) * 1000
+geladen = [m for m in %r if m in sys.modules]
+start = time.perf_counter()
+api.stelle_datenbank_sicher()
+init_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"import_ms": import_ms, "init_ms": init_ms, "zu_frueh_geladen": geladen}))
+""" % (VERZOEGERTE_MODULE,)
+
+
+def erzeuge_datenbestand(pfad: str, anzahl: int):
+    """Schreibt eine JSON-Datei mit `anzahl` Girokonten."""
+    with open(pfad, "w", encoding="utf-8") as f:
+        json.dump(
+            [{"inhaber": f"Kunde{i}", "kontostand": 100.0, "typ": "Girokonto", "extra": 50.0} for i in range(anzahl)],
+            f,
+        )
+
+
+def messen(json_pfad: str) -> dict:
+    """Startet einen frischen Interpreter und liefert dessen Messwerte."""
+    umgebung = dict(os.environ, STORAGE_TYPE="json", JSON_FILE=json_pfad, WRITE_BEHIND="0")
+    ausgabe = subprocess.run(
+        [sys.executable, "-c", _MESSUNG],
+        cwd=PROJEKT_DIR, env=umgebung, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(ausgabe.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Startzeit-Benchmark der API")
+    parser.add_argument("--konten", type=int, default=50000, help="Größe des Datenbestands")
+    parser.add_argument("--wiederholungen", type=int, default=5, help="Anzahl frischer Prozesse")
+    parser.add_argument("--max-import-ms", type=float, default=3000, help="Grenzwert Median Import (ms)")
+    parser.add_argument("--max-init-ms", type=float, default=250, help="Grenzwert Median Initialisierung (ms)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as verzeichnis:
+        json_pfad = os.path.join(verzeichnis, "konten.json")
+        erzeuge_datenbestand(json_pfad, args.konten)
+        messungen = [messen(json_pfad) for _ in range(args.wiederholungen)]
+
+    ergebnis = {
+        "konten": args.konten,
+        "wiederholungen": args.wiederholungen,
+        "import_ms_median": round(statistics.median(m["import_ms"] for m in messungen), 1),
+        "init_ms_median": round(statistics.median(m["init_ms"] for m in messungen), 1),
+        "zu_frueh_geladen": sorted({name for m in messungen for name in m["zu_frueh_geladen"]}),
+    }
+    fehler = []
+    if ergebnis["import_ms_median"] > args.max_import_ms:
+        fehler.append(f"Import {ergebnis['import_ms_median']} ms > {args.max_import_ms} ms")
+    if ergebnis["init_ms_median"] > args.max_init_ms:
+        fehler.append(f"Initialisierung {ergebnis['init_ms_median']} ms > {args.max_init_ms} ms")
+    if ergebnis["zu_frueh_geladen"]:
+        fehler.append(f"Beim Import geladen: {', '.join(ergebnis['zu_frueh_geladen'])}")
+    ergebnis["fehler"] = fehler
+
+    print(json.dumps(ergebnis, indent=2, ensure_ascii=False))
+    return 1 if fehler else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
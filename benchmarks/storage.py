@@ -0,0 +1,181 @@
+"""
+Storage-Benchmark: Misst die Operationen von JSONStorage und SQLiteStorage
+über verschiedene Datenbestandsgrößen.
+
+Je Backend, Größe und Operation werden Durchsatz (ops/s), p50/p90/p99 und der
+Spitzen-Speicherverbrauch (tracemalloc, ein separater Aufruf) ermittelt. Jede
+Operation läuft bis `--ops` Aufrufe oder `--budget` Sekunden erreicht sind
+(mindestens ein Aufruf), damit langsame Kombinationen (z. B. JSON mit 1 Mio.
+Konten) den Lauf nicht sprengen.
+
+Aufruf:
+    python -m benchmarks.storage --groessen 1000,100000,1000000 --ausgabe benchmarks/ergebnisse/storage.json
+    python -m benchmarks.storage --vergleich alt.json neu.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJEKT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJEKT_DIR not in sys.path:
+    sys.path.insert(0, PROJEKT_DIR)
+
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from json_storage import JSONStorage
+from sqlite_storage import SQLiteStorage
+from sharded_storage import ShardedStorage
+from logger_config import logger
+from benchmarks.auswertung import latenz_zusammenfassung, ergebnis_schreiben, vergleichen
+
+BACKENDS = {
+    "json": lambda verzeichnis: JSONStorage(os.path.join(verzeichnis, "konten.json")),
+    "sql": lambda verzeichnis: SQLiteStorage(os.path.join(verzeichnis, "bank_data.db")),
+    "sharded": lambda verzeichnis: ShardedStorage(os.path.join(verzeichnis, "shards"), 4),
+}
+
+OPERATIONEN = ("laden", "konto_holen", "name_existiert", "update_kontostand", "konto_hinzufuegen", "speichern")
+
+
+def erzeuge_konten(anzahl: int, seed: int = 42) -> list:
+    """
+    Synthetischer Datenbestand: reproduzierbare Mischung aus Giro- (80 %) und Sparkonten (20 %).
+
+    Args:
+        anzahl (int): Anzahl der Konten.
+        seed (int): Startwert des Zufallsgenerators.
+
+    Returns:
+        list: Die Konto-Objekte mit eindeutigen Namen 'Kunde<i>'.
+    """
+    rnd = random.Random(seed)
+    konten = []
+    for i in range(anzahl):
+        stand = round(rnd.uniform(0, 10000), 2)
+        if rnd.random() < 0.8:
+            konten.append(Girokonto(f"Kunde{i}", stand, rnd.choice((0, 200, 500, 1000))))
+        else:
+            konten.append(Sparkonto(f"Kunde{i}", stand, rnd.choice((0.01, 0.02, 0.035))))
+    return konten
+
+
+def _operation(storage, name: str, konten: list, rnd: random.Random, zaehler):
+    """Liefert eine parameterlose Funktion, die die Operation einmal ausführt."""
+    if name == "laden":
+        return storage.laden
+    if name == "konto_holen":
+        return lambda: storage.konto_holen(f"Kunde{rnd.randrange(len(konten))}")
+    if name == "name_existiert":
+        # Hälfte Treffer, Hälfte Fehlschläge
+        return lambda: storage.name_existiert(f"Kunde{rnd.randrange(len(konten) * 2)}")
+    if name == "update_kontostand":
+        def aktualisieren():
+            konto = konten[rnd.randrange(len(konten))]
+            konto.kontostand = round(konto.kontostand + 1, 2)
+            storage.update_kontostand(konto)
+        return aktualisieren
+    if name == "konto_hinzufuegen":
+        return lambda: storage.konto_hinzufuegen(Girokonto(f"Neukunde{next(zaehler)}", 0, 0))
+    if name == "speichern":
+        return lambda: storage.speichern(konten)
+    raise ValueError(f"Unbekannte Operation: {name}")
+
+
+def messen(funktion, max_ops: int, budget: float) -> dict:
+    """
+    Führt die Funktion wiederholt aus und misst Latenzen und Spitzen-Speicher.
+
+    Args:
+        funktion (callable): Die zu messende Operation.
+        max_ops (int): Maximale Anzahl Aufrufe.
+        budget (float): Maximale Messdauer in Sekunden.
+
+    Returns:
+        dict: Zusammenfassung inkl. 'spitze_speicher_bytes'.
+    """
+    latenzen = []
+    start = time.perf_counter()
+    while len(latenzen) < max_ops:
+        t0 = time.perf_counter()
+        funktion()
+        latenzen.append(time.perf_counter() - t0)
+        if time.perf_counter() - start >= budget:
+            break
+    ergebnis = latenz_zusammenfassung(latenzen, time.perf_counter() - start)
+
+    # Speicher separat messen: tracemalloc verfälscht sonst die Latenzen
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        funktion()
+        ergebnis["spitze_speicher_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return ergebnis
+
+
+def benchmark(backends, groessen, max_ops: int, budget: float, seed: int = 42) -> list:
+    """
+    Führt alle Operationen für jede Kombination aus Backend und Größe aus.
+
+    Returns:
+        list: Ergebniszeilen (backend, groesse, operation, Messwerte).
+    """
+    ergebnisse = []
+    for groesse in groessen:
+        konten = erzeuge_konten(groesse, seed)
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as verzeichnis:
+                storage = BACKENDS[backend](verzeichnis)
+                start = time.perf_counter()
+                storage.konten_schreiben(konten)
+                print(f"[{backend} | {groesse}] Datenbestand angelegt in {time.perf_counter() - start:.1f} s",
+                      file=sys.stderr)
+
+                rnd = random.Random(seed)
+                zaehler = iter(range(sys.maxsize))
+                for operation in OPERATIONEN:
+                    werte = messen(_operation(storage, operation, konten, rnd, zaehler), max_ops, budget)
+                    ergebnisse.append({"backend": backend, "groesse": groesse, "operation": operation, **werte})
+                    print(f"[{backend} | {groesse}] {operation}: {werte['ops_pro_s']} ops/s, "
+                          f"p50 {werte['p50_ms']} ms, p99 {werte['p99_ms']} ms", file=sys.stderr)
+    return ergebnisse
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Storage-Benchmark (JSON vs. SQLite)")
+    parser.add_argument("--backends", default="json,sql", help="Kommagetrennt: json, sql, sharded")
+    parser.add_argument("--groessen", default="1000,100000,1000000", help="Kommagetrennte Kontenanzahlen")
+    parser.add_argument("--ops", type=int, default=1000, help="Maximale Aufrufe je Operation")
+    parser.add_argument("--budget", type=float, default=10.0, help="Maximale Messdauer je Operation (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ausgabe", default=os.path.join("benchmarks", "ergebnisse", "storage.json"),
+                        help="Ergebnisdatei (JSON)")
+    parser.add_argument("--vergleich", nargs=2, metavar=("ALT", "NEU"),
+                        help="Zwei Ergebnisdateien vergleichen statt zu messen")
+    args = parser.parse_args(argv)
+
+    if args.vergleich:
+        zeilen = vergleichen(*args.vergleich, schluessel=("backend", "groesse", "operation"),
+                             metriken=("ops_pro_s", "p50_ms", "p99_ms", "spitze_speicher_bytes"))
+        print(json.dumps(zeilen, indent=2, ensure_ascii=False))
+        return 0
+
+    # Info-Logs je Speichervorgang würden sonst die Messung dominieren
+    logger.setLevel(logging.WARNING)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    groessen = [int(g) for g in args.groessen.split(",") if g.strip()]
+    ergebnisse = benchmark(backends, groessen, args.ops, args.budget, args.seed)
+    ergebnis_schreiben(args.ausgabe, "storage", vars(args), ergebnisse)
+    print(f"Ergebnisse geschrieben: {args.ausgabe}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
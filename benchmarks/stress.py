@@ -0,0 +1,224 @@
+"""
+Nebenläufigkeits-Stresstest für die Storage-Backends.
+
+Viele Threads (optional verteilt auf mehrere Prozesse) führen zufällige
+Einzahlungen, Abhebungen und Überweisungen über `StorageInterface.transaktion`
+aus. Am Ende wird geprüft:
+    - Geld-Erhaltung: Summe aller Kontostände = Startsumme + Einzahlungen - Abhebungen
+      (Überweisungen ändern die Summe nicht).
+    - Dispo-Invarianten: Girokonten nie unter -Dispo, Sparkonten nie unter 0.
+
+Mit `--unsicher` wird stattdessen das naive `konto_holen` -> `update_kontostand`
+verwendet, um zu zeigen, dass verlorene Updates erkannt werden.
+
+Aufruf:
+    python -m benchmarks.stress --backends json,sql --threads 8 --prozesse 4 --ops 200
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+PROJEKT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJEKT_DIR not in sys.path:
+    sys.path.insert(0, PROJEKT_DIR)
+
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from json_storage import JSONStorage
+from sqlite_storage import SQLiteStorage
+from sharded_storage import ShardedStorage
+from logger_config import logger
+from benchmarks.auswertung import ergebnis_schreiben
+
+BACKENDS = {
+    "json": lambda verzeichnis: JSONStorage(os.path.join(verzeichnis, "konten.json")),
+    "sql": lambda verzeichnis: SQLiteStorage(os.path.join(verzeichnis, "bank_data.db")),
+    "sharded": lambda verzeichnis: ShardedStorage(os.path.join(verzeichnis, "shards"), 4),
+}
+
+
+def startkonten(anzahl: int) -> list:
+    """Abwechselnd Giro- (Dispo 500) und Sparkonten mit knappem Guthaben (100 EUR)."""
+    return [
+        Girokonto(f"Stress{i}", 100, 500) if i % 2 == 0 else Sparkonto(f"Stress{i}", 100, 0.02)
+        for i in range(anzahl)
+    ]
+
+
+def arbeiter(storage, namen: list, operationen: int, seed: int, sicher: bool = True) -> dict:
+    """
+    Führt zufällige Transaktionen aus.
+
+    Beträge sind ganzzahlig, damit die Summenprüfung ohne Rundungsfehler exakt ist.
+
+    Returns:
+        dict: Summe der bestätigten Ein-/Auszahlungen, Anzahl Überweisungen und Ablehnungen.
+    """
+    rnd = random.Random(seed)
+    ergebnis = {"einzahlungen": 0, "abhebungen": 0, "ueberweisungen": 0, "abgelehnt": 0, "operationen": 0}
+    for _ in range(operationen):
+        art = rnd.random()
+        betrag = rnd.randint(1, 100)
+        von, an = rnd.sample(namen, 2)
+        try:
+            if art < 0.35:
+                if sicher:
+                    with storage.transaktion(von) as konten:
+                        konten[von].einzahlen(betrag)
+                else:
+                    k = storage.konto_holen(von)
+                    k.einzahlen(betrag)
+                    storage.update_kontostand(k)
+                ergebnis["einzahlungen"] += betrag
+            elif art < 0.7:
+                if sicher:
+                    with storage.transaktion(von) as konten:
+                        konten[von].abheben(betrag)
+                else:
+                    k = storage.konto_holen(von)
+                    k.abheben(betrag)
+                    storage.update_kontostand(k)
+                ergebnis["abhebungen"] += betrag
+            else:
+                if sicher:
+                    with storage.transaktion(von, an) as konten:
+                        konten[von].abheben(betrag)
+                        konten[an].einzahlen(betrag)
+                else:
+                    quelle, ziel = storage.konto_holen(von), storage.konto_holen(an)
+                    quelle.abheben(betrag)
+                    ziel.einzahlen(betrag)
+                    storage.update_kontostand(quelle)
+                    storage.update_kontostand(ziel)
+                ergebnis["ueberweisungen"] += 1
+        except ValueError:
+            # Fachlich abgelehnt (Dispo/Guthaben überschritten): nichts wurde geschrieben
+            ergebnis["abgelehnt"] += 1
+        ergebnis["operationen"] += 1
+    return ergebnis
+
+
+def _threads_ausfuehren(storage, namen, threads: int, operationen: int, seed: int, sicher: bool) -> list:
+    """Startet `threads` Arbeiter auf derselben Storage-Instanz (wie in der API)."""
+    ergebnisse = [None] * threads
+
+    def lauf(i):
+        ergebnisse[i] = arbeiter(storage, namen, operationen, seed + i, sicher)
+
+    liste = [threading.Thread(target=lauf, args=(i,)) for i in range(threads)]
+    for t in liste:
+        t.start()
+    for t in liste:
+        t.join()
+    return ergebnisse
+
+
+def _prozess(backend: str, verzeichnis: str, namen, threads: int, operationen: int, seed: int, sicher: bool) -> list:
+    """Einstiegspunkt eines Arbeitsprozesses: eigene Storage-Instanz, eigene Threads."""
+    logger.setLevel(logging.WARNING)
+    storage = BACKENDS[backend](verzeichnis)
+    return _threads_ausfuehren(storage, namen, threads, operationen, seed, sicher)
+
+
+def invarianten_pruefen(konten: list, erwartete_summe: float) -> list:
+    """
+    Prüft Geld-Erhaltung und Dispo-Invarianten.
+
+    Returns:
+        list: Beschreibungen aller Verstöße (leer = in Ordnung).
+    """
+    verstoesse = []
+    summe = sum(k.kontostand for k in konten)
+    if abs(summe - erwartete_summe) > 1e-6:
+        verstoesse.append(f"Geldsumme {summe:.2f} statt {erwartete_summe:.2f} (Differenz {summe - erwartete_summe:+.2f})")
+    for k in konten:
+        untergrenze = -k.dispo if isinstance(k, Girokonto) else 0
+        if k.kontostand < untergrenze:
+            verstoesse.append(f"{k.inhaber}: Kontostand {k.kontostand:.2f} unter Grenze {untergrenze:.2f}")
+    return verstoesse
+
+
+def stresstest(backend: str, verzeichnis: str, threads: int = 8, prozesse: int = 0,
+               operationen: int = 200, anzahl_konten: int = 6, seed: int = 1, sicher: bool = True) -> dict:
+    """
+    Führt den Stresstest für ein Backend aus.
+
+    Args:
+        backend (str): 'json' oder 'sql'.
+        verzeichnis (str): Arbeitsverzeichnis für die Daten.
+        threads (int): Threads je Prozess.
+        prozesse (int): Anzahl Arbeitsprozesse (0 = nur Threads im aktuellen Prozess).
+        operationen (int): Transaktionen je Thread.
+        anzahl_konten (int): Anzahl der Konten (wenige Konten = hohe Konkurrenz).
+        seed (int): Startwert der Zufallsgeneratoren.
+        sicher (bool): False = naives Lesen/Schreiben ohne Transaktion.
+
+    Returns:
+        dict: Durchsatz, Summen und gefundene Verstöße.
+    """
+    storage = BACKENDS[backend](verzeichnis)
+    konten = startkonten(anzahl_konten)
+    storage.konten_schreiben(konten)
+    startsumme = sum(k.kontostand for k in konten)
+    namen = [k.inhaber for k in konten]
+
+    start = time.perf_counter()
+    if prozesse:
+        kontext = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=prozesse, mp_context=kontext) as pool:
+            zukuenfte = [
+                pool.submit(_prozess, backend, verzeichnis, namen, threads, operationen, seed + p * 1000, sicher)
+                for p in range(prozesse)
+            ]
+            ergebnisse = [e for z in zukuenfte for e in z.result()]
+    else:
+        ergebnisse = _threads_ausfuehren(storage, namen, threads, operationen, seed, sicher)
+    dauer = time.perf_counter() - start
+
+    summen = {schluessel: sum(e[schluessel] for e in ergebnisse) for schluessel in ergebnisse[0]}
+    erwartet = startsumme + summen["einzahlungen"] - summen["abhebungen"]
+    return {
+        "backend": backend,
+        "modus": "transaktion" if sicher else "unsicher",
+        "prozesse": prozesse,
+        "threads": threads,
+        **summen,
+        "dauer_s": round(dauer, 3),
+        "ops_pro_s": round(summen["operationen"] / dauer, 1) if dauer else 0.0,
+        "verstoesse": invarianten_pruefen(storage.laden(), erwartet),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Nebenläufigkeits-Stresstest der Storage-Backends")
+    parser.add_argument("--backends", default="json,sql", help="Kommagetrennt: json, sql, sharded")
+    parser.add_argument("--threads", type=int, default=8, help="Threads je Prozess")
+    parser.add_argument("--prozesse", type=int, default=0, help="Arbeitsprozesse (0 = nur Threads)")
+    parser.add_argument("--ops", type=int, default=200, help="Transaktionen je Thread")
+    parser.add_argument("--konten", type=int, default=6, help="Anzahl der Konten")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--unsicher", action="store_true", help="Ohne Transaktionen (Nachweis verlorener Updates)")
+    parser.add_argument("--ausgabe", default=os.path.join("benchmarks", "ergebnisse", "stress.json"))
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    ergebnisse = []
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        with tempfile.TemporaryDirectory() as verzeichnis:
+            ergebnisse.append(stresstest(backend, verzeichnis, args.threads, args.prozesse, args.ops,
+                                         args.konten, args.seed, sicher=not args.unsicher))
+    ergebnis_schreiben(args.ausgabe, "stress", vars(args), ergebnisse)
+    print(json.dumps(ergebnisse, indent=2, ensure_ascii=False))
+    return 1 if any(e["verstoesse"] for e in ergebnisse) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
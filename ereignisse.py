@@ -0,0 +1,216 @@
+"""
+In-Process-Pub/Sub für Kontoänderungen (Grundlage des SSE-Endpunkts `/events`).
+
+Schreibende Storage-Aufrufe laufen meist im Threadpool, Abonnenten sind
+asyncio-Generatoren. Der Bus stellt Ereignisse daher per
+`loop.call_soon_threadsafe` in die begrenzte Queue jedes Abonnements. Läuft eine
+Queue über (langsamer Client), wird das Abonnement getrennt, statt den
+Schreibpfad zu bremsen oder Speicher anzuhäufen.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from metrics import registry
+
+EREIGNIS_TYPEN = ("kontostand", "konto_angelegt")
+
+EVENTS_VEROEFFENTLICHT = registry.counter(
+    "bank_events_published_total", "Veröffentlichte Kontoereignisse.", ("typ",)
+)
+EVENTS_GETRENNT = registry.counter(
+    "bank_events_dropped_subscribers_total", "Wegen voller Queue getrennte Abonnenten.", ()
+)
+EVENTS_ABONNENTEN = registry.gauge(
+    "bank_events_subscribers", "Aktuell verbundene Abonnenten.", ()
+)
+
+
+class Abonnement:
+    """
+    Ein Abonnent mit Filtern und begrenzter Queue.
+
+    Attributes:
+        konto (str): Nur Ereignisse dieses Kontos (normalisiert, None = alle).
+        typ (str): Nur Ereignisse dieses Typs (None = alle).
+        kontotyp (str): Nur 'Girokonto' bzw. 'Sparkonto' (None = alle).
+        getrennt (bool): True, wenn die Queue übergelaufen ist.
+    """
+
+    def __init__(self, loop, max_queue: int, konto: str = None, typ: str = None, kontotyp: str = None):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.konto = konto.strip().lower() if konto else None
+        self.typ = typ
+        self.kontotyp = kontotyp
+        self.getrennt = False
+
+    def passt(self, ereignis: dict) -> bool:
+        """bool: True, wenn das Ereignis alle Filter erfüllt."""
+        return (
+            (self.konto is None or ereignis["inhaber"].lower() == self.konto)
+            and (self.typ is None or ereignis["typ"] == self.typ)
+            and (self.kontotyp is None or ereignis["kontotyp"] == self.kontotyp)
+        )
+
+    async def naechstes(self, timeout: float):
+        """
+        Wartet auf das nächste Ereignis.
+
+        Returns:
+            dict: Das Ereignis, oder None bei Timeout (Zeit für einen Keep-Alive).
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EreignisBus:
+    """
+    Verteilt Kontoereignisse an alle passenden Abonnements.
+
+    Attributes:
+        max_queue (int): Queue-Größe je Abonnement.
+        max_abonnenten (int): Maximale Anzahl gleichzeitiger Abonnements.
+        version (int): Anzahl aller veröffentlichten Ereignisse, auch ohne Abonnenten
+            (Schreib-Generation, z. B. für `SingleFlight`).
+    """
+
+    def __init__(self, max_queue: int = 100, max_abonnenten: int = 1000):
+        self.max_queue = max_queue
+        self.max_abonnenten = max_abonnenten
+        self.version = 0
+        self._abos = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def abonnieren(self, konto: str = None, typ: str = None, kontotyp: str = None) -> Abonnement:
+        """
+        Legt ein Abonnement für den aktuellen Event-Loop an.
+
+        Raises:
+            RuntimeError: Wenn die maximale Anzahl an Abonnements erreicht ist.
+
+        Returns:
+            Abonnement: Das neue Abonnement (mit `abmelden` wieder entfernen).
+        """
+        abo = Abonnement(asyncio.get_running_loop(), self.max_queue, konto, typ, kontotyp)
+        with self._lock:
+            if len(self._abos) >= self.max_abonnenten:
+                raise RuntimeError("Maximale Anzahl an Event-Abonnenten erreicht.")
+            self._abos.add(abo)
+        EVENTS_ABONNENTEN.inc()
+        return abo
+
+    def abmelden(self, abo: Abonnement):
+        """Entfernt ein Abonnement (mehrfacher Aufruf ist unschädlich)."""
+        with self._lock:
+            if abo not in self._abos:
+                return
+            self._abos.discard(abo)
+        EVENTS_ABONNENTEN.dec()
+
+    def anzahl(self) -> int:
+        """int: Anzahl der aktiven Abonnements."""
+        return len(self._abos)
+
+    def veroeffentlichen(self, typ: str, konto):
+        """
+        Veröffentlicht eine Kontoänderung (aus beliebigen Threads aufrufbar).
+
+        Ohne Abonnenten kostet der Aufruf nur eine Längenprüfung.
+
+        Args:
+            typ (str): Ereignistyp (siehe `EREIGNIS_TYPEN`).
+            konto (object): Das geänderte Konto-Objekt.
+        """
+        self.version += 1
+        EVENTS_VEROEFFENTLICHT.inc(typ=typ)
+        if not self._abos:
+            return
+        ereignis = {
+            "id": next(self._ids),
+            "typ": typ,
+            "inhaber": konto.inhaber,
+            "kontotyp": type(konto).__name__,
+            "kontostand": konto.kontostand,
+            "zeit": time.time(),
+        }
+        with self._lock:
+            abos = [abo for abo in self._abos if abo.passt(ereignis)]
+        for abo in abos:
+            try:
+                abo.loop.call_soon_threadsafe(self._einreihen, abo, ereignis)
+            except RuntimeError:
+                # Event-Loop bereits beendet
+                self.abmelden(abo)
+
+    def _einreihen(self, abo: Abonnement, ereignis: dict):
+        """Läuft im Event-Loop des Abonnenten: einreihen oder langsamen Client trennen."""
+        if abo.getrennt:
+            return
+        try:
+            abo.queue.put_nowait(ereignis)
+        except asyncio.QueueFull:
+            abo.getrennt = True
+            EVENTS_GETRENNT.inc()
+            self.abmelden(abo)
+
+
+def sse_format(ereignis: dict) -> str:
+    """str: Ereignis im Server-Sent-Events-Format (id, event, data)."""
+    return f"id: {ereignis['id']}\nevent: {ereignis['typ']}\ndata: {json.dumps(ereignis, ensure_ascii=False)}\n\n"
+
+
+class EreignisStorage:
+    """
+    Proxy um einen Storage-Provider, der nach erfolgreichen Schreibvorgängen
+    Ereignisse veröffentlicht. Alle übrigen Aufrufe werden unverändert durchgereicht.
+
+    Attributes:
+        backend (StorageInterface): Der eigentliche Provider.
+        bus (EreignisBus): Ziel der Ereignisse.
+    """
+
+    def __init__(self, backend, bus: EreignisBus):
+        self.backend = backend
+        self.bus = bus
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def _alle(self, typ: str, konten):
+        for konto in konten:
+            self.bus.veroeffentlichen(typ, konto)
+
+    def konto_hinzufuegen(self, konto):
+        self.backend.konto_hinzufuegen(konto)
+        self.bus.veroeffentlichen("konto_angelegt", konto)
+
+    def mehrere_konten_hinzufuegen(self, konten) -> list:
+        abgelehnt = self.backend.mehrere_konten_hinzufuegen(konten)
+        ausgelassen = {id(k) for k in abgelehnt}
+        self._alle("konto_angelegt", [k for k in konten if id(k) not in ausgelassen])
+        return abgelehnt
+
+    def update_kontostand(self, konto):
+        self.backend.update_kontostand(konto)
+        self.bus.veroeffentlichen("kontostand", konto)
+
+    def konten_schreiben(self, konten):
+        self.backend.konten_schreiben(konten)
+        self._alle("kontostand", konten)
+
+    def speichern(self, konten_liste):
+        self.backend.speichern(konten_liste)
+        self._alle("kontostand", konten_liste)
+
+    @contextmanager
+    def transaktion(self, *namen):
+        """Veröffentlicht die geänderten Kontostände erst nach dem Commit."""
+        with self.backend.transaktion(*namen) as konten:
+            yield konten
+        self._alle("kontostand", {id(k): k for k in konten.values()}.values())
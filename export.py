@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import zlib
+
+# Spaltenreihenfolge für CSV (entspricht `konto_zu_zeile`)
+SPALTEN = ("inhaber", "kontostand", "typ", "extra")
+
+FORMATE = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def ndjson_strom(bloecke):
+    """
+    Wandelt Zeilen-Blöcke in NDJSON um (eine JSON-Zeile je Konto).
+
+    Args:
+        bloecke (iterable): Blöcke von Zeilen-Dictionaries (z. B. `storage.konten_iterieren()`).
+
+    Yields:
+        bytes: Ein Block UTF-8-kodierter NDJSON-Zeilen.
+    """
+    for block in bloecke:
+        yield "".join(json.dumps(zeile, ensure_ascii=False) + "\n" for zeile in block).encode("utf-8")
+
+
+def csv_strom(bloecke):
+    """
+    Wandelt Zeilen-Blöcke in CSV um (mit Kopfzeile).
+
+    Args:
+        bloecke (iterable): Blöcke von Zeilen-Dictionaries.
+
+    Yields:
+        bytes: Kopfzeile bzw. ein Block UTF-8-kodierter CSV-Zeilen.
+    """
+    puffer = io.StringIO()
+    writer = csv.DictWriter(puffer, fieldnames=SPALTEN, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    yield puffer.getvalue().encode("utf-8")
+    for block in bloecke:
+        puffer.seek(0)
+        puffer.truncate()
+        writer.writerows(block)
+        yield puffer.getvalue().encode("utf-8")
+
+
+def gzip_strom(teile, level: int = 6):
+    """
+    Komprimiert einen Byte-Strom fortlaufend im gzip-Format (konstanter Speicherbedarf).
+
+    Args:
+        teile (iterable): Die unkomprimierten Byte-Blöcke.
+        level (int): Kompressionsstufe 1-9.
+
+    Yields:
+        bytes: Komprimierte Daten (leere Zwischenergebnisse werden übersprungen).
+    """
+    kompressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip-Header und -Prüfsumme
+    for teil in teile:
+        daten = kompressor.compress(teil)
+        if daten:
+            yield daten
+    yield kompressor.flush()
+
+
+def export_strom(bloecke, format: str, komprimieren: bool = False):
+    """
+    Erzeugt den Export-Strom für das gewünschte Format.
+
+    Args:
+        bloecke (iterable): Blöcke von Zeilen-Dictionaries.
+        format (str): 'ndjson' oder 'csv'.
+        komprimieren (bool): True = gzip.
+
+    Raises:
+        ValueError: Bei unbekanntem Format.
+
+    Returns:
+        iterator: Byte-Blöcke für eine `StreamingResponse`.
+    """
+    if format == "ndjson":
+        strom = ndjson_strom(bloecke)
+    elif format == "csv":
+        strom = csv_strom(bloecke)
+    else:
+        raise ValueError(f"Unbekanntes Exportformat: {format} (erlaubt: {', '.join(FORMATE)})")
+    return gzip_strom(strom) if komprimieren else strom
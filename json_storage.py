@@ -1,10 +1,13 @@
 import json
 import os
-from storage_interface import StorageInterface
-from sparkonto import Sparkonto
-from girokonto import Girokonto
+import tempfile
+import threading
+from contextlib import contextmanager
+from storage_interface import StorageInterface, konto_zu_zeile, konto_aus_zeile
+from konto_locks import konto_sperren
 import random
 from logger_config import logger
+from metrics import storage_zeitmessung, storage_abschnitt
 
 
 
@@ -20,7 +23,33 @@ class JSONStorage(StorageInterface):
             dateiname (str): Der Name der JSON-Datei. Standard ist 'konten.json'.
         """
         self.dateiname = dateiname
+        self._lokal = threading.local()
 
+    @contextmanager
+    def _dateisperre(self):
+        """
+        Exklusive Sperre über eine Lock-Datei (`<datei>.lock`), wirksam zwischen
+        Threads und Prozessen. Innerhalb eines Threads wiederverwendbar (reentrant).
+        """
+        tiefe = getattr(self._lokal, "tiefe", 0)
+        if tiefe:
+            self._lokal.tiefe = tiefe + 1
+            try:
+                yield
+            finally:
+                self._lokal.tiefe = tiefe
+            return
+
+        with open(self.dateiname + ".lock", "a+b") as lock_datei:
+            _datei_sperren(lock_datei)
+            self._lokal.tiefe = 1
+            try:
+                yield
+            finally:
+                self._lokal.tiefe = 0
+                _datei_entsperren(lock_datei)
+
+    @storage_zeitmessung
     def laden(self):
         """
         Lädt Konten aus einer JSON-Datei und erstellt die entsprechenden Objekte.
@@ -39,17 +68,34 @@ class JSONStorage(StorageInterface):
             with open(self.dateiname, "r", encoding="utf-8") as f:
                 daten = json.load(f)
                 for d in daten:
-                    if d["typ"] == "Girokonto":
-                        k = Girokonto(d["inhaber"], d["kontostand"], d["extra"])
-                    elif d["typ"] == "Sparkonto":
-                        k = Sparkonto(d["inhaber"], d["kontostand"], d["extra"])
-                    geladene_konten.append(k)
-            logger.info(f"JSON-Daten erfolgreich geladen ({self.dateiname})")
+                    geladene_konten.append(konto_aus_zeile(d))
+            logger.info("JSON-Daten erfolgreich geladen (%s)", self.dateiname)
             return geladene_konten
         except Exception as e:
-            logger.error(f"Datenbankfehler (JSON) bein Laden von {self.dateiname}: {e}")
+            logger.error("Datenbankfehler (JSON) bein Laden von %s: %s", self.dateiname, e)
             raise RuntimeError(f"Datenbankfehler (JSON): {e}")
         
+    @storage_zeitmessung
+    def ist_leer(self):
+        """
+        Prüft anhand der ersten Bytes der Datei, ob Konten vorhanden sind,
+        ohne die gesamte Liste zu parsen.
+
+        Returns:
+            bool: True, wenn die Datei fehlt oder eine leere Liste enthält.
+        """
+        if not os.path.exists(self.dateiname):
+            return True
+        with open(self.dateiname, "r", encoding="utf-8") as f:
+            anfang = ""
+            while len(anfang) < 2:
+                block = f.read(4096)
+                if not block:
+                    break
+                anfang += "".join(block.split())
+        return anfang in ("", "[", "[]")
+
+    @storage_zeitmessung
     def speichern(self, konten_liste):
         """
         Serialisiert die Konten-Liste in eine JSON-Datei.
@@ -60,22 +106,25 @@ class JSONStorage(StorageInterface):
         Raises:
             IOError: Wenn die Datei nicht geschrieben werden kann.
         """
-        daten = []
-        for k in konten_liste:
-            daten.append({
-                "inhaber": k.inhaber,
-                "kontostand": k.kontostand,
-                "typ": type(k).__name__,
-                "extra": getattr(k, 'dispo', getattr(k, 'zins', None))
-            })
+        daten = [konto_zu_zeile(k) for k in konten_liste]
         try:
-            with open(self.dateiname, "w", encoding="utf-8") as f:
-                json.dump(daten, f, indent=4)
-            logger.info(f"Speichervorgang (JSON) erfolgreich in {self.dateiname} gesichert")
+            # Atomar ersetzen: Leser sehen nie eine halb geschriebene Datei
+            verzeichnis = os.path.dirname(os.path.abspath(self.dateiname))
+            fd, temp_pfad = tempfile.mkstemp(prefix=".konten-", suffix=".tmp", dir=verzeichnis)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(daten, f, indent=4)
+                os.replace(temp_pfad, self.dateiname)
+            except BaseException:
+                if os.path.exists(temp_pfad):
+                    os.remove(temp_pfad)
+                raise
+            logger.info("Speichervorgang (JSON) erfolgreich in %s gesichert", self.dateiname)
         except Exception as e:
-            logger.error(f"Speichervorgang (JSON) fehlergeschlagen ({self.dateiname}): {e}")
+            logger.error("Speichervorgang (JSON) fehlergeschlagen (%s): %s", self.dateiname, e)
             raise IOError(f"Speichervorgang (JSON) fehlergeschlagen : {e}")
         
+    @storage_zeitmessung
     def name_existiert(self, name):
         """
         Name-Check für Konto
@@ -90,6 +139,7 @@ class JSONStorage(StorageInterface):
         aktuelle_konten = self.laden()
         return any(k.inhaber.lower() == name_bereinigt.strip().lower() for k in aktuelle_konten)
     
+    @storage_zeitmessung
     def konto_holen(self, name):
         """
         Sucht ein Konto in der Liste(JSON-Datei) basierend auf dem Inhabernamen.
@@ -110,7 +160,7 @@ class JSONStorage(StorageInterface):
         konten = self.laden() # Lädt aktuelle Daten
         konto = next((k for k in konten if k.inhaber.lower() == name_bereinigt), None)
         if konto is None:
-            logger.warning(f"Konto für '{name}' wurde in ({self.dateiname}) nicht gefunden.")
+            logger.warning("Konto für '%s' wurde in (%s) nicht gefunden.", name, self.dateiname)
             raise ValueError(f"Konto für '{name}' wurde in ({self.dateiname}) nicht gefunden.")
         return konto
     
@@ -136,27 +186,211 @@ class JSONStorage(StorageInterface):
                     vorschlaege.append(neuer_name)
         return vorschlaege
         
+    @storage_zeitmessung
     def konto_hinzufuegen(self, konto):
         """
         Prüft auf Namensdoppelungen und fügt das Konto hinzu.
         Falls der Name existiert, wird ein Fehler mit Namensvorschlägen geworfen.
         """
-        if self.name_existiert(konto.inhaber):
-            vorschlaege = self.generiere_vorschlaege(konto.inhaber)
-            logger.warning(f"Versuchtes Duplikat (JSON) ebgelehnt für Inhaber: {konto.inhaber}")
-            raise ValueError(f"Name existiert bereits. Vorschläge: {', '.join(vorschlaege)}")
-        
-        aktuelle_konten = self.laden()
-        aktuelle_konten.append(konto)
-        logger.info(f"Neues Konto (JSON) erstellt: {konto.inhaber} ({type(konto).__name__})")
-        self.speichern(aktuelle_konten)
+        with self._dateisperre():
+            if self.name_existiert(konto.inhaber):
+                vorschlaege = self.generiere_vorschlaege(konto.inhaber)
+                logger.warning("Versuchtes Duplikat (JSON) ebgelehnt für Inhaber: %s", konto.inhaber)
+                raise ValueError(f"Name existiert bereits. Vorschläge: {', '.join(vorschlaege)}")
 
+            aktuelle_konten = self.laden()
+            aktuelle_konten.append(konto)
+            logger.info("Neues Konto (JSON) erstellt: %s (%s)", konto.inhaber, type(konto).__name__)
+            self.speichern(aktuelle_konten)
+
+    @storage_zeitmessung
     def update_kontostand(self, konto):
         """JSON-Workaround: Lädt alles, aktualisiert das eine Konto und speichert neu."""
-        konten = self.laden()
-        for k in konten:
-            if k.inhaber.lower() == konto.inhaber.lower():
-                k.kontostand = konto.kontostand
-                break
-        self.speichern(konten)
-        logger.info(f"JSON: Kontostand für {konto.inhaber} aktualisiert.")
\ No newline at end of file
+        with self._dateisperre():
+            konten = self.laden()
+            for k in konten:
+                if k.inhaber.lower() == konto.inhaber.lower():
+                    k.kontostand = konto.kontostand
+                    if hasattr(konto, "letzte_verzinsung"):
+                        k.letzte_verzinsung = konto.letzte_verzinsung
+                    break
+            self.speichern(konten)
+        logger.info("JSON: Kontostand für %s aktualisiert.", konto.inhaber)
+
+    @storage_zeitmessung
+    def konten_schreiben(self, konten):
+        """
+        Upsert mehrerer Konten mit nur einem Lade- und einem Schreibvorgang.
+
+        Args:
+            konten (list): Die zu schreibenden Konto-Objekte.
+        """
+        with self._dateisperre():
+            aktuelle_konten = self.laden()
+            index = {k.inhaber.lower(): i for i, k in enumerate(aktuelle_konten)}
+            for konto in konten:
+                position = index.get(konto.inhaber.lower())
+                if position is None:
+                    index[konto.inhaber.lower()] = len(aktuelle_konten)
+                    aktuelle_konten.append(konto)
+                else:
+                    aktuelle_konten[position] = konto
+            self.speichern(aktuelle_konten)
+        logger.info("JSON: %s Konten gesammelt geschrieben.", len(konten))
+
+    @storage_zeitmessung
+    def konten_holen(self, namen) -> dict:
+        """
+        Holt mehrere Konten mit einmaligem Laden der Datei (Dictionary-Lookups statt Suche je Name).
+
+        Args:
+            namen (iterable): Die gesuchten Inhabernamen.
+
+        Returns:
+            dict: Normalisierter Name -> Konto-Objekt (nicht gefundene Namen fehlen).
+        """
+        gesucht = {n.strip().lower() for n in namen}
+        return {k.inhaber.lower(): k for k in self.laden() if k.inhaber.lower() in gesucht}
+
+    @storage_zeitmessung
+    def namen_existieren(self, namen) -> set:
+        """
+        Mengen-Prüfung mit einmaligem Laden der Datei.
+
+        Args:
+            namen (iterable): Die zu prüfenden Inhabernamen.
+
+        Returns:
+            set: Die vergebenen Namen in normalisierter Form.
+        """
+        gesucht = {n.strip().lower() for n in namen}
+        return {k.inhaber.lower() for k in self.laden()} & gesucht
+
+    @storage_zeitmessung
+    def mehrere_konten_hinzufuegen(self, konten) -> list:
+        """
+        Legt mehrere Konten mit einem Lade- und einem Schreibvorgang an (unter der Datei-Sperre).
+
+        Args:
+            konten (list): Die neuen Konto-Objekte.
+
+        Returns:
+            list: Die abgelehnten Konto-Objekte (Name bereits vergeben).
+        """
+        with self._dateisperre():
+            aktuelle_konten = self.laden()
+            neu, abgelehnt = self._duplikate_trennen(konten, {k.inhaber.lower() for k in aktuelle_konten})
+            if neu:
+                self.speichern(aktuelle_konten + neu)
+        logger.info("JSON: %s Konten angelegt, %s Duplikate abgelehnt.", len(neu), len(abgelehnt))
+        return abgelehnt
+
+    def konten_iterieren(self, batch_groesse: int = 1000, chunk_groesse: int = 65536):
+        """
+        Parst die JSON-Datei inkrementell (Objekt für Objekt) statt sie komplett zu laden.
+        Da Schreibvorgänge die Datei atomar ersetzen, liest der Generator einen
+        konsistenten Stand, auch wenn parallel gespeichert wird.
+
+        Args:
+            batch_groesse (int): Anzahl der Zeilen je Block.
+            chunk_groesse (int): Gelesene Zeichen je Dateizugriff.
+
+        Raises:
+            RuntimeError: Wenn die Datei kein gültiges JSON-Array enthält.
+
+        Yields:
+            list: Ein Block von Zeilen-Dictionaries.
+        """
+        if not os.path.exists(self.dateiname):
+            return
+        decoder = json.JSONDecoder()
+        block = []
+        with open(self.dateiname, "r", encoding="utf-8") as f:
+            puffer = f.read(chunk_groesse).lstrip()
+            if not puffer.startswith("["):
+                raise RuntimeError(f"Datenbankfehler (JSON): {self.dateiname} enthält keine Liste.")
+            position = 1
+            dateiende = False
+            while True:
+                # Trennzeichen zwischen den Objekten überspringen
+                while position < len(puffer) and puffer[position] in " \t\r\n,":
+                    position += 1
+                if position < len(puffer) and puffer[position] == "]":
+                    break
+                try:
+                    zeile, position = decoder.raw_decode(puffer, position)
+                except json.JSONDecodeError:
+                    # Objekt ist noch unvollständig: weiterlesen
+                    if dateiende:
+                        raise RuntimeError(f"Datenbankfehler (JSON): {self.dateiname} ist unvollständig.")
+                    neu = f.read(chunk_groesse)
+                    dateiende = not neu
+                    puffer, position = puffer[position:] + neu, 0
+                    continue
+                block.append(zeile)
+                if len(block) >= batch_groesse:
+                    yield block
+                    block = []
+        if block:
+            yield block
+
+    @contextmanager
+    def transaktion(self, *namen):
+        """
+        Atomare Transaktion unter der Datei-Sperre: Die Datei wird einmal geladen,
+        die Konten im Block geändert und einmal (atomar) zurückgeschrieben.
+        Die Sperre wirkt auch zwischen mehreren Prozessen.
+
+        Args:
+            *namen (str): Die Inhabernamen.
+
+        Raises:
+            ValueError: Wenn eines der Konten nicht existiert (es wird nichts geschrieben).
+            TimeoutError: Wenn eine Konto-Sperre nicht rechtzeitig frei wird.
+
+        Yields:
+            dict: Übergebener Name -> Konto-Objekt.
+        """
+        with konto_sperren.sperre_mehrere(namen), self._dateisperre():
+            with storage_abschnitt(self, "transaktion_lesen"):
+                alle_konten = self.laden()
+                index = {k.inhaber.lower(): k for k in alle_konten}
+
+                def holen(name):
+                    konto = index.get(name.strip().lower())
+                    if konto is None:
+                        raise ValueError(f"Konto für '{name}' wurde in ({self.dateiname}) nicht gefunden.")
+                    return konto
+
+                _, konten = self._transaktions_konten(namen, holen)
+            yield konten
+            with storage_abschnitt(self, "transaktion_schreiben"):
+                self.speichern(alle_konten)
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _datei_sperren(datei):
+        """Blockiert, bis die Lock-Datei exklusiv gesperrt ist (Windows)."""
+        datei.seek(0)
+        while True:
+            try:
+                msvcrt.locking(datei.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gibt nach ca. 10 Sekunden auf
+                continue
+
+    def _datei_entsperren(datei):
+        datei.seek(0)
+        msvcrt.locking(datei.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _datei_sperren(datei):
+        """Blockiert, bis die Lock-Datei exklusiv gesperrt ist (POSIX flock)."""
+        fcntl.flock(datei.fileno(), fcntl.LOCK_EX)
+
+    def _datei_entsperren(datei):
+        fcntl.flock(datei.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,176 @@
+"""
+Stapelverarbeitung von Kontobuchungen ohne API (z. B. `python main.py --storage sql run ops.ndjson`).
+
+Jede Zeile ist eine Operation, z. B. (NDJSON):
+    {"op": "deposit", "name": "Tom", "betrag": 50}
+    {"op": "withdraw", "name": "Tom", "betrag": 20}
+    {"op": "interest", "name": "Jim"}
+    {"op": "create", "name": "Ana", "typ": "spar", "start_saldo": 100, "extra": 2}
+
+Die Datei wird gestreamt und blockweise verarbeitet. Buchungen eines Blocks laufen
+in einer einzigen `storage.transaktion` über alle betroffenen Konten; fehlgeschlagene
+Buchungen (unbekanntes Konto, fehlende Deckung, ...) werden einzeln abgelehnt, ohne den
+Block zu verwerfen. Anlagen laufen über `KontenImport` (`mehrere_konten_hinzufuegen`).
+Die Reihenfolge der Datei bleibt erhalten: Ein Wechsel zwischen Anlage und Buchung
+schließt den laufenden Block ab.
+"""
+import time
+from konten_import import KontenImport
+from konto_locks import normalisiere_name
+from logger_config import logger
+
+# Operation (englisch wie die CLI-Befehle, deutsch wie die API) -> interner Name
+OPERATIONEN = {
+    "deposit": "einzahlen", "einzahlen": "einzahlen",
+    "withdraw": "abheben", "abheben": "abheben",
+    "interest": "zinsen", "zinsen": "zinsen",
+    "create": "anlegen", "anlegen": "anlegen",
+}
+
+
+def _buchen(konto, operation: str, daten: dict):
+    """Führt eine Buchung auf dem Konto-Objekt aus (ändert es nur bei Erfolg)."""
+    if operation == "einzahlen":
+        konto.einzahlen(daten.get("betrag"))
+    elif operation == "abheben":
+        konto.abheben(daten.get("betrag"))
+    elif not hasattr(konto, "zinsen_berechnen"):
+        raise ValueError(f"Konto '{konto.inhaber}' ist kein Sparkonto und erhält keine Zinsen.")
+    else:
+        konto.zinsen_berechnen()
+
+
+class StapelLauf:
+    """
+    Sammelt Operationen und führt sie blockweise aus.
+
+    Attributes:
+        storage (StorageInterface): Ziel-Backend.
+        chunk_groesse (int): Operationen je Transaktion.
+        max_abgelehnt (int): Maximal gemeldete abgelehnte Zeilen (gezählt werden alle).
+        fortschritt (callable): Erhält nach jedem Block den Zwischenstand (siehe `stand`).
+    """
+
+    def __init__(self, storage, chunk_groesse: int = 500, max_abgelehnt: int = 1000, fortschritt=None):
+        self.storage = storage
+        self.chunk_groesse = chunk_groesse
+        self.max_abgelehnt = max_abgelehnt
+        self.fortschritt = fortschritt
+        self.gelesen = 0
+        self.verbucht = 0
+        self.abgelehnt_anzahl = 0
+        self.abgelehnt = []
+        self._import = KontenImport(storage, chunk_groesse, max_abgelehnt)
+        self._anlagen = 0
+        self._block = []
+        self._start = time.perf_counter()
+
+    def hinzufuegen(self, zeilen, operation: str = None):
+        """
+        Nimmt Zeilen (zeilennummer, felder, fehler) entgegen und führt volle Blöcke aus.
+
+        Args:
+            zeilen (list): Zeilen aus `ZeilenLeser`.
+            operation (str): Feste Operation für alle Zeilen (sonst Feld `op` je Zeile).
+        """
+        for nummer, daten, fehler in zeilen:
+            if fehler is None and not isinstance(daten, dict):
+                fehler = "Zeile ist kein Objekt."
+            if fehler is None:
+                op = OPERATIONEN.get(str(operation or daten.get("op") or "").strip().lower())
+                if op is None:
+                    fehler = "Unbekannte Operation (erlaubt: deposit, withdraw, interest, create)."
+            if fehler is not None:
+                self.gelesen += 1
+                self._ablehnen(nummer, daten.get("name") or daten.get("inhaber") if isinstance(daten, dict) else None, fehler)
+            elif op == "anlegen":
+                self._buchungen_ausfuehren()
+                self._anlagen += 1
+                if self._import.hinzufuegen([(nummer, daten, None)]):
+                    self._anlegen()
+            else:
+                self._anlegen()
+                self.gelesen += 1
+                self._block.append((nummer, op, daten))
+                if len(self._block) >= self.chunk_groesse:
+                    self._buchungen_ausfuehren()
+
+    def abschliessen(self) -> dict:
+        """Führt die angefangenen Blöcke aus und liefert das Ergebnis."""
+        self._buchungen_ausfuehren()
+        self._anlegen()
+        return self.ergebnis()
+
+    def _anlegen(self):
+        """Legt die gesammelten Konten an (`KontenImport`)."""
+        if self._anlagen:
+            self._import.block_anlegen(alles=True)
+            self._anlagen = 0
+            self._melden()
+
+    def _buchungen_ausfuehren(self):
+        """Führt den aktuellen Buchungsblock in einer Transaktion aus."""
+        if not self._block:
+            return
+        block, self._block = self._block, []
+        mit_namen = []
+        for nummer, op, daten in block:
+            name = str(daten.get("name") or daten.get("inhaber") or "").strip()
+            if name:
+                mit_namen.append((nummer, op, daten, name))
+            else:
+                self._ablehnen(nummer, None, "Name fehlt.")
+        # Eine Abfrage für den ganzen Block: unbekannte Konten würden die Transaktion abbrechen
+        vorhanden = self.storage.namen_existieren([name for *_, name in mit_namen])
+        gueltig = []
+        for eintrag in mit_namen:
+            if normalisiere_name(eintrag[3]) in vorhanden:
+                gueltig.append(eintrag)
+            else:
+                self._ablehnen(eintrag[0], eintrag[3], f"Konto für '{eintrag[3]}' wurde nicht gefunden.")
+        if gueltig:
+            self._transaktion(gueltig)
+        self._melden()
+
+    def _transaktion(self, gueltig: list):
+        """
+        Eine Transaktion über alle Konten des Blocks. Fehlgeschlagene Buchungen ändern
+        das Konto nicht und verwerfen den Block daher nicht.
+        """
+        with self.storage.transaktion(*dict.fromkeys(name for *_, name in gueltig)) as konten:
+            for nummer, op, daten, name in gueltig:
+                try:
+                    _buchen(konten[name], op, daten)
+                    self.verbucht += 1
+                except (ValueError, TypeError) as e:
+                    self._ablehnen(nummer, name, str(e))
+
+    def _ablehnen(self, nummer: int, inhaber, grund: str):
+        self.abgelehnt_anzahl += 1
+        if len(self.abgelehnt) < self.max_abgelehnt:
+            self.abgelehnt.append({"zeile": nummer, "inhaber": inhaber, "grund": grund, "vorschlaege": []})
+
+    def stand(self) -> dict:
+        """dict: Zwischenstand (gelesen, verbucht, angelegt, abgelehnt, Zeilen je Sekunde)."""
+        dauer = time.perf_counter() - self._start
+        gelesen = self.gelesen + self._import.gelesen
+        return {
+            "gelesen": gelesen,
+            "verbucht": self.verbucht,
+            "angelegt": self._import.angelegt,
+            "abgelehnt_anzahl": self.abgelehnt_anzahl + self._import.abgelehnt_anzahl,
+            "zeilen_pro_s": round(gelesen / dauer) if dauer > 0 else 0,
+            "dauer_s": round(dauer, 3),
+        }
+
+    def _melden(self):
+        if self.fortschritt is not None:
+            self.fortschritt(self.stand())
+
+    def ergebnis(self) -> dict:
+        """dict: Zusammenfassung inkl. der abgelehnten Zeilen (nach Zeilennummer sortiert)."""
+        stand = self.stand()
+        logger.info("Stapellauf: %s Zeilen gelesen, %s verbucht, %s angelegt, %s abgelehnt.",
+                    stand["gelesen"], stand["verbucht"], stand["angelegt"], stand["abgelehnt_anzahl"])
+        abgelehnt = sorted(self.abgelehnt + self._import.abgelehnt, key=lambda a: a["zeile"])[:self.max_abgelehnt]
+        return {**stand, "abgelehnt": abgelehnt, "abgelehnt_gekuerzt": stand["abgelehnt_anzahl"] > len(abgelehnt)}
@@ -0,0 +1,235 @@
+"""
+Massen-Import von Konten (NDJSON/CSV-Upload und JSON-Liste).
+
+Die Zeilen werden blockweise verarbeitet: Jeder Block wird validiert
+(über `Girokonto`/`Sparkonto`), per `namen_existieren` mit einer Abfrage auf
+Duplikate geprüft und mit `mehrere_konten_hinzufuegen` in einer Transaktion
+angelegt. Abgelehnte Zeilen werden mit Grund und Namensvorschlägen gemeldet.
+"""
+import csv
+import json
+import random
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from logger_config import logger
+
+IMPORT_FORMATE = ("ndjson", "csv")
+
+# Schutz vor unbegrenzt wachsendem Puffer bei Uploads ohne Zeilenumbruch
+MAX_ZEILENLAENGE = 64 * 1024
+
+# Kontotyp-Angaben: Schema der API ('giro'/'spar') und Export-Format (Klassenname)
+_TYPEN = {
+    "giro": Girokonto, "girokonto": Girokonto,
+    "spar": Sparkonto, "sparkonto": Sparkonto,
+}
+
+
+def konto_aus_daten(daten: dict):
+    """
+    Erstellt ein Konto aus einer Import-Zeile.
+
+    Akzeptiert sowohl die Felder des Erstell-Schemas (`name`, `typ`, `start_saldo`, `extra`)
+    als auch die des Exports (`inhaber`, `typ`, `kontostand`, `extra`).
+
+    Args:
+        daten (dict): Die Felder der Zeile.
+
+    Raises:
+        ValueError: Bei fehlendem Namen, unbekanntem Typ oder ungültigen Beträgen.
+
+    Returns:
+        object: Girokonto- oder Sparkonto-Objekt.
+    """
+    if not isinstance(daten, dict):
+        raise ValueError("Zeile ist kein Objekt.")
+    name = str(daten.get("name") or daten.get("inhaber") or "").strip()
+    if not name:
+        raise ValueError("Name fehlt.")
+    klasse = _TYPEN.get(str(daten.get("typ") or "").strip().lower())
+    if klasse is None:
+        raise ValueError("Ungültiger Kontotyp! Erlaubt sind 'giro' oder 'spar'.")
+    saldo = daten.get("start_saldo", daten.get("kontostand"))
+    try:
+        return klasse(name, saldo, daten.get("extra"))
+    except TypeError as e:
+        # Die Konto-Klassen melden nicht-numerische Werte als TypeError
+        raise ValueError(str(e))
+
+
+class ZeilenLeser:
+    """
+    Zerlegt einen Byte-Strom inkrementell in Import-Zeilen.
+
+    Es wird immer nur die aktuell unvollständige Zeile gepuffert. CSV-Dateien
+    benötigen eine Kopfzeile; Felder mit eingebetteten Zeilenumbrüchen werden
+    nicht unterstützt.
+
+    Attributes:
+        format (str): 'ndjson' oder 'csv'.
+        zeilennummer (int): Anzahl der bisher gelesenen Zeilen (inkl. Kopfzeile).
+    """
+
+    def __init__(self, format: str):
+        if format not in IMPORT_FORMATE:
+            raise ValueError(f"Unbekanntes Importformat: {format} (erlaubt: {', '.join(IMPORT_FORMATE)})")
+        self.format = format
+        self.zeilennummer = 0
+        self._rest = b""
+        self._kopf = None
+
+    def fuettern(self, daten: bytes) -> list:
+        """
+        Verarbeitet den nächsten Teil des Uploads.
+
+        Raises:
+            ValueError: Wenn eine Zeile länger als `MAX_ZEILENLAENGE` ist.
+
+        Returns:
+            list: Tupel (zeilennummer, felder, fehler) der vollständigen Zeilen.
+        """
+        self._rest += daten
+        *zeilen, self._rest = self._rest.split(b"\n")
+        if len(self._rest) > MAX_ZEILENLAENGE:
+            raise ValueError(f"Zeile {self.zeilennummer + 1} überschreitet {MAX_ZEILENLAENGE} Bytes.")
+        return self._zeilen(zeilen)
+
+    def abschliessen(self) -> list:
+        """Liefert die letzte Zeile (falls der Upload nicht mit einem Zeilenumbruch endet)."""
+        rest, self._rest = self._rest, b""
+        return self._zeilen([rest]) if rest.strip() else []
+
+    def _zeilen(self, zeilen) -> list:
+        ergebnis = []
+        for roh in zeilen:
+            self.zeilennummer += 1
+            text = roh.decode("utf-8", errors="replace").strip()
+            if not text:
+                continue
+            if self.format == "ndjson":
+                try:
+                    ergebnis.append((self.zeilennummer, json.loads(text), None))
+                except json.JSONDecodeError as e:
+                    ergebnis.append((self.zeilennummer, None, f"Ungültiges JSON: {e.msg}"))
+                continue
+            felder = next(csv.reader([text]))
+            if self._kopf is None:
+                self._kopf = [f.strip().lower() for f in felder]
+            elif len(felder) != len(self._kopf):
+                ergebnis.append((self.zeilennummer, None, f"{len(felder)} statt {len(self._kopf)} Spalten."))
+            else:
+                ergebnis.append((self.zeilennummer, dict(zip(self._kopf, felder)), None))
+        return ergebnis
+
+
+class KontenImport:
+    """
+    Sammelt Import-Zeilen und legt sie blockweise an.
+
+    Attributes:
+        storage (StorageInterface): Ziel-Backend.
+        chunk_groesse (int): Zeilen je Transaktion.
+        max_abgelehnt (int): Maximal gemeldete abgelehnte Zeilen (gezählt werden alle).
+    """
+
+    def __init__(self, storage, chunk_groesse: int = 1000, max_abgelehnt: int = 1000):
+        self.storage = storage
+        self.chunk_groesse = chunk_groesse
+        self.max_abgelehnt = max_abgelehnt
+        self.gelesen = 0
+        self.angelegt = 0
+        self.abgelehnt_anzahl = 0
+        self.abgelehnt = []
+        self._block = []
+
+    def hinzufuegen(self, zeilen) -> bool:
+        """
+        Nimmt Zeilen (zeilennummer, felder, fehler) entgegen.
+
+        Returns:
+            bool: True, wenn ein voller Block zum Anlegen bereitliegt (`block_anlegen`).
+        """
+        for nummer, daten, fehler in zeilen:
+            self.gelesen += 1
+            if fehler is None:
+                try:
+                    self._block.append((nummer, konto_aus_daten(daten)))
+                    continue
+                except ValueError as e:
+                    fehler = str(e)
+            inhaber = daten.get("name") or daten.get("inhaber") if isinstance(daten, dict) else None
+            self._ablehnen(nummer, inhaber, fehler)
+        return len(self._block) >= self.chunk_groesse
+
+    def block_anlegen(self, alles: bool = False):
+        """
+        Legt volle Blöcke an (mit `alles=True` auch den angefangenen Rest).
+        Blockierend, in der API daher im Threadpool ausführen.
+        """
+        while self._block and (alles or len(self._block) >= self.chunk_groesse):
+            block, self._block = self._block[:self.chunk_groesse], self._block[self.chunk_groesse:]
+            abgelehnt = {id(k) for k in self.storage.mehrere_konten_hinzufuegen([k for _, k in block])}
+            duplikate = [(n, k) for n, k in block if id(k) in abgelehnt]
+            self.angelegt += len(block) - len(duplikate)
+            vorschlaege = self._vorschlaege([k.inhaber for _, k in duplikate])
+            for nummer, konto in duplikate:
+                self._ablehnen(nummer, konto.inhaber, "Name existiert bereits.", vorschlaege.get(konto.inhaber, []))
+
+    def _vorschlaege(self, namen, anzahl: int = 3, kandidaten: int = 6) -> dict:
+        """
+        Namensvorschläge für alle Duplikate eines Blocks mit einer einzigen
+        `namen_existieren`-Abfrage (statt einer Prüfung je Vorschlag).
+        """
+        if not namen:
+            return {}
+        kandidaten_je_name = {
+            name: list(dict.fromkeys(f"{name}{random.randint(10, 99)}" for _ in range(kandidaten)))
+            for name in namen
+        }
+        vergeben = self.storage.namen_existieren([k for liste in kandidaten_je_name.values() for k in liste])
+        return {
+            name: [k for k in liste if k.lower() not in vergeben][:anzahl]
+            for name, liste in kandidaten_je_name.items()
+        }
+
+    def _ablehnen(self, nummer: int, inhaber, grund: str, vorschlaege=None):
+        self.abgelehnt_anzahl += 1
+        if len(self.abgelehnt) < self.max_abgelehnt:
+            self.abgelehnt.append({
+                "zeile": nummer, "inhaber": inhaber, "grund": grund, "vorschlaege": vorschlaege or [],
+            })
+
+    def ergebnis(self) -> dict:
+        """dict: Zusammenfassung des Imports (abgelehnte Zeilen nach Zeilennummer sortiert)."""
+        logger.info("Import: %s Zeilen gelesen, %s angelegt, %s abgelehnt.",
+                    self.gelesen, self.angelegt, self.abgelehnt_anzahl)
+        return {
+            "gelesen": self.gelesen,
+            "angelegt": self.angelegt,
+            "abgelehnt_anzahl": self.abgelehnt_anzahl,
+            "abgelehnt": sorted(self.abgelehnt, key=lambda a: a["zeile"]),
+            "abgelehnt_gekuerzt": self.abgelehnt_anzahl > len(self.abgelehnt),
+        }
+
+
+def importieren(storage, teile, format: str, chunk_groesse: int = 1000) -> dict:
+    """
+    Synchroner Import aus einem Byte-Strom (z. B. einer geöffneten Datei).
+
+    Args:
+        storage (StorageInterface): Ziel-Backend.
+        teile (iterable): Byte-Blöcke des Uploads.
+        format (str): 'ndjson' oder 'csv'.
+        chunk_groesse (int): Zeilen je Transaktion.
+
+    Returns:
+        dict: Siehe `KontenImport.ergebnis`.
+    """
+    leser = ZeilenLeser(format)
+    importer = KontenImport(storage, chunk_groesse)
+    for teil in teile:
+        if importer.hinzufuegen(leser.fuettern(teil)):
+            importer.block_anlegen()
+    importer.hinzufuegen(leser.abschliessen())
+    importer.block_anlegen(alles=True)
+    return importer.ergebnis()
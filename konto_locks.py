@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from metrics import registry
+
+
+LOCK_ANFORDERUNGEN = registry.counter(
+    "bank_konto_lock_acquisitions_total", "Angeforderte Konto-Sperren.", ()
+)
+LOCK_KONFLIKTE = registry.counter(
+    "bank_konto_lock_contention_total", "Konto-Sperren, auf die gewartet werden musste.", ()
+)
+LOCK_WARTEZEIT = registry.histogram(
+    "bank_konto_lock_wait_seconds", "Wartezeit auf belegte Konto-Sperren in Sekunden.", ()
+)
+
+
+def normalisiere_name(name: str) -> str:
+    """Normalisiert einen Inhabernamen wie die Storage-Backends (trim + case-insensitive)."""
+    return name.strip().lower()
+
+
+class KontoSperren:
+    """
+    Lock-Manager mit Lock-Striping für Konto-Transaktionen.
+
+    Jeder normalisierte Inhabername wird per CRC32 auf einen von `anzahl_streifen`
+    Locks abgebildet. Dasselbe Konto wird so über `konto_holen` -> `update_kontostand`
+    serialisiert, während Transaktionen auf anderen Konten (meist auf anderen Streifen)
+    parallel laufen. Der Speicherbedarf bleibt unabhängig von der Anzahl der Konten konstant.
+
+    Die Sperren isolieren nur Konten untereinander (innerhalb eines Prozesses). Dass sich
+    Schreibvorgänge auf verschiedenen Konten nicht gegenseitig überschreiben, muss das
+    Backend selbst sicherstellen (JSON: Dateisperre um Laden und Speichern der ganzen
+    Datei, SQLite: Update einzelner Zeilen).
+
+    Attributes:
+        anzahl_streifen (int): Anzahl der Locks.
+        timeout (float): Maximale Wartezeit in Sekunden (None = unbegrenzt).
+    """
+
+    def __init__(self, anzahl_streifen: int = 64, timeout: float = None):
+        self.anzahl_streifen = anzahl_streifen
+        self.timeout = timeout
+        self._sperren = [threading.Lock() for _ in range(anzahl_streifen)]
+
+    def streifen(self, name: str) -> int:
+        """int: Index des Locks, der für den Inhabernamen zuständig ist."""
+        return zlib.crc32(normalisiere_name(name).encode("utf-8")) % self.anzahl_streifen
+
+    def _erwerben(self, index: int):
+        """Erwirbt den Lock eines Streifens und erfasst Konflikte und Wartezeit."""
+        LOCK_ANFORDERUNGEN.inc()
+        sperre = self._sperren[index]
+        if sperre.acquire(blocking=False):
+            return
+        LOCK_KONFLIKTE.inc()
+        start = time.perf_counter()
+        erworben = sperre.acquire(timeout=-1 if self.timeout is None else self.timeout)
+        LOCK_WARTEZEIT.observe(time.perf_counter() - start)
+        if not erworben:
+            raise TimeoutError("Konto ist derzeit durch eine andere Transaktion gesperrt.")
+
+    @contextmanager
+    def sperre(self, name: str):
+        """
+        Context-Manager: Sperrt ein Konto für die Dauer des Blocks.
+
+        Args:
+            name (str): Der Inhabername (beliebige Schreibweise).
+
+        Raises:
+            TimeoutError: Wenn der Lock nicht innerhalb von `timeout` frei wird.
+        """
+        index = self.streifen(name)
+        self._erwerben(index)
+        try:
+            yield
+        finally:
+            self._sperren[index].release()
+
+    @contextmanager
+    def sperre_mehrere(self, namen):
+        """
+        Context-Manager: Sperrt mehrere Konten (z. B. für Überweisungen).
+
+        Die Streifen werden dedupliziert und immer in aufsteigender Reihenfolge
+        gesperrt, damit sich zwei gegenläufige Transaktionen nicht verklemmen.
+
+        Args:
+            namen (iterable): Die Inhabernamen.
+
+        Raises:
+            TimeoutError: Wenn ein Lock nicht innerhalb von `timeout` frei wird.
+        """
+        indizes = sorted({self.streifen(n) for n in namen})
+        erworben = []
+        try:
+            for index in indizes:
+                self._erwerben(index)
+                erworben.append(index)
+            yield
+        finally:
+            for index in reversed(erworben):
+                self._sperren[index].release()
+
+
+# Zentrale Instanz für API und Storage-Transaktionen
+_timeout = float(os.getenv("KONTO_LOCK_TIMEOUT", "10"))
+konto_sperren = KontoSperren(
+    anzahl_streifen=int(os.getenv("KONTO_LOCK_STRIPES", "64")),
+    timeout=_timeout if _timeout > 0 else None,
+)
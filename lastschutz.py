@@ -0,0 +1,103 @@
+"""
+Rate-Limiting und Lastabwurf für die API (genutzt von der Middleware in `api.py`).
+
+Jede Anfrage wird über eine Regeltabelle einer Gruppe mit Kosten zugeordnet,
+z. B. teure Vollscans (`/suche`, `/konten`) der Gruppe "scan". Je Gruppe gibt es
+einen eigenen Token-Bucket je Client (Benutzer oder IP): Ein Client, der die Suche
+flutet, erschöpft nur sein Scan-Kontingent, nicht das für Transaktionen.
+
+Zusätzlich begrenzt eine globale Obergrenze die gleichzeitig laufenden Anfragen.
+Jede Gruppe wird ab einem eigenen Anteil dieser Grenze abgewiesen; Scans also früher
+als Transaktionen, die damit auch unter Last noch Platz finden.
+"""
+from rate_limit import TokenBucketLimiter
+from metrics import registry
+
+ABGEWIESEN = registry.counter(
+    "bank_requests_shed_total", "Wegen Rate-Limit (429) oder Überlast (503) abgewiesene Anfragen.",
+    ("grund", "gruppe"),
+)
+LAUFEND = registry.gauge(
+    "bank_requests_limited_in_flight", "Laufende Anfragen unter der globalen Obergrenze.", ()
+)
+
+
+class Gruppe:
+    """
+    Limits einer Routen-Gruppe.
+
+    Attributes:
+        name (str): Name der Gruppe (Label der Metriken).
+        limiter (TokenBucketLimiter): Token-Bucket je Client.
+        anteil (float): Anteil von `max_laufend`, ab dem Anfragen der Gruppe abgewiesen werden.
+    """
+
+    def __init__(self, name: str, rate: float, kapazitaet: float, anteil: float = 1.0):
+        self.name = name
+        self.limiter = TokenBucketLimiter(rate, kapazitaet)
+        self.anteil = anteil
+
+
+class Lastschutz:
+    """
+    Entscheidet je Anfrage über Zulassen, 429 (Client-Kontingent erschöpft) oder
+    503 (Server überlastet). Wird nur im Event-Loop benutzt (kein Lock für den Zähler).
+
+    Attributes:
+        gruppen (dict): Gruppenname -> Gruppe.
+        regeln (list): Tupel (Methode, Pfad, Gruppe, Kosten); die erste passende Regel gilt.
+            Ein Pfad passt auch auf seine Unterpfade. Gruppe None = nicht begrenzt.
+        standard (tuple): (Gruppe, Kosten) für Anfragen ohne passende Regel.
+        max_laufend (int): Globale Obergrenze gleichzeitiger Anfragen (0 = keine).
+        retry_after_ueberlast (int): Retry-After in Sekunden bei 503.
+        laufend (int): Aktuell laufende, begrenzte Anfragen.
+    """
+
+    def __init__(self, gruppen, regeln, standard=("standard", 1), max_laufend: int = 0,
+                 retry_after_ueberlast: int = 1):
+        self.gruppen = {g.name: g for g in gruppen}
+        self.regeln = regeln
+        self.standard = standard
+        self.max_laufend = max_laufend
+        self.retry_after_ueberlast = retry_after_ueberlast
+        self.laufend = 0
+
+    def regel(self, methode: str, pfad: str) -> tuple:
+        """tuple: (Gruppe, Kosten) für die Anfrage; Gruppe None = nicht begrenzt."""
+        for regel_methode, regel_pfad, gruppe, kosten in self.regeln:
+            if regel_methode in ("*", methode) and (
+                pfad == regel_pfad or pfad.startswith(regel_pfad.rstrip("/") + "/")
+            ):
+                return gruppe, kosten
+        return self.standard
+
+    def zulassen(self, client: str, gruppe: str, kosten: float) -> tuple:
+        """
+        Prüft eine Anfrage (Gruppe und Kosten siehe `regel`). Zugelassene Anfragen
+        zählen bis zum Aufruf von `beenden` als laufend.
+
+        Args:
+            client (str): Schlüssel des Clients (z. B. "user:admin" oder "ip:10.0.0.1").
+            gruppe (str): Name der Gruppe.
+            kosten (float): Verbrauchte Tokens.
+
+        Returns:
+            tuple: (None, 0.0) = zugelassen, sonst (Statuscode 429/503, Retry-After in Sekunden).
+        """
+        limits = self.gruppen[gruppe]
+        # Überlast zuerst prüfen: abgewiesene Anfragen verbrauchen kein Kontingent
+        if self.max_laufend and self.laufend >= self.max_laufend * limits.anteil:
+            ABGEWIESEN.inc(grund="ueberlast", gruppe=gruppe)
+            return 503, float(self.retry_after_ueberlast)
+        wartezeit = limits.limiter.pruefen(f"{gruppe}:{client}", kosten)
+        if wartezeit > 0:
+            ABGEWIESEN.inc(grund="rate_limit", gruppe=gruppe)
+            return 429, wartezeit
+        self.laufend += 1
+        LAUFEND.inc()
+        return None, 0.0
+
+    def beenden(self):
+        """Meldet das Ende einer zugelassenen Anfrage."""
+        self.laufend -= 1
+        LAUFEND.dec()
@@ -0,0 +1,134 @@
+"""
+Lazy-Zinsmodus: Zinsen werden beim Lesen berechnet statt periodisch gebucht.
+
+Jedes Sparkonto trägt den Zeitstempel seiner letzten Verzinsung
+(`Sparkonto.letzte_verzinsung`). Beim Lesen oder Anfassen werden die seither
+abgelaufenen Perioden in O(1) nachgeholt (`zinsen_nachholen`, Zinseszins über
+die Potenz). Das Ergebnis entspricht einer Buchung je Periode wie beim
+`ZinsPlaner`, ohne den gesamten Bestand je Periode neu zu schreiben.
+
+Lesende Aufrufe liefern den verzinsten Stand, schreiben ihn aber nicht zurück.
+Gespeichert wird er erst mit dem nächsten echten Schreibvorgang auf dem Konto
+(z. B. einer Einzahlung in `transaktion`), zusammen mit dem neuen Zeitstempel.
+Konten ohne Zeitstempel (Bestand vor dem Lazy-Modus) erhalten ihn einmalig über
+`zeitstempel_nachtragen` (die API ruft es beim Start auf); ab dann werden auch
+Konten verzinst, die nur gelesen werden.
+"""
+import time
+from contextlib import contextmanager
+from storage_interface import konto_zu_zeile, konto_aus_zeile
+from metrics import registry
+
+ZINS_NACHGEHOLT = registry.counter(
+    "bank_lazy_zins_perioden_total", "Beim Zugriff nachgeholte Zinsperioden.", ()
+)
+
+
+class LazyZinsStorage:
+    """
+    Proxy um einen Storage-Provider, der Sparkonten beim Zugriff verzinst.
+    Alle übrigen Aufrufe werden unverändert durchgereicht.
+
+    Attributes:
+        backend (StorageInterface): Der eigentliche Provider.
+        periode_s (float): Länge einer Zinsperiode in Sekunden.
+        uhr (callable): Liefert die aktuelle Unix-Zeit (in Tests ersetzbar).
+    """
+
+    def __init__(self, backend, periode_s: float, uhr=time.time):
+        self.backend = backend
+        self.periode_s = periode_s
+        self.uhr = uhr
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def _verzinsen(self, konten):
+        """Holt die abgelaufenen Perioden für alle Sparkonten nach (nur im Objekt)."""
+        jetzt = self.uhr()
+        perioden = 0
+        for konto in konten:
+            if hasattr(konto, "zinsen_nachholen"):
+                perioden += konto.zinsen_nachholen(self.periode_s, jetzt)
+        if perioden:
+            ZINS_NACHGEHOLT.inc(perioden)
+        return konten
+
+    # --- Lesen: verzinster Stand, kein Zurückschreiben ---
+
+    def konto_holen(self, name):
+        return self._verzinsen([self.backend.konto_holen(name)])[0]
+
+    def konten_holen(self, namen) -> dict:
+        konten = self.backend.konten_holen(namen)
+        self._verzinsen(konten.values())
+        return konten
+
+    def laden(self) -> list:
+        return self._verzinsen(self.backend.laden())
+
+    def konten_seite(self, offset: int, limit: int):
+        gesamt, konten = self.backend.konten_seite(offset, limit)
+        return gesamt, self._verzinsen(konten)
+
+    def konten_iterieren(self, batch_groesse: int = 1000):
+        for zeilen in self.backend.konten_iterieren(batch_groesse):
+            if any(z["typ"] == "Sparkonto" for z in zeilen):
+                zeilen = [konto_zu_zeile(k) for k in self._verzinsen([konto_aus_zeile(z) for z in zeilen])]
+            yield zeilen
+
+    def konten_block(self, marke=None, anzahl: int = 1000) -> tuple:
+        zeilen, marke = self.backend.konten_block(marke, anzahl)
+        if any(z["typ"] == "Sparkonto" for z in zeilen):
+            zeilen = [konto_zu_zeile(k) for k in self._verzinsen([konto_aus_zeile(z) for z in zeilen])]
+        return zeilen, marke
+
+    # --- Schreiben: Zeitstempel für neue Sparkonten setzen ---
+
+    def konto_hinzufuegen(self, konto):
+        self._verzinsen([konto])
+        self.backend.konto_hinzufuegen(konto)
+
+    def mehrere_konten_hinzufuegen(self, konten) -> list:
+        return self.backend.mehrere_konten_hinzufuegen(self._verzinsen(konten))
+
+    def zeitstempel_nachtragen(self, chunk_groesse: int = 500) -> int:
+        """
+        Speichert für Sparkonten ohne Zeitstempel einmalig den Beginn der aktuellen Periode.
+        Ohne gespeicherten Zeitstempel würde ein nur gelesenes Konto bei jedem Lesen neu
+        in der aktuellen Periode beginnen und nie verzinst. Je Block eine Transaktion;
+        Konten, die inzwischen einen Zeitstempel haben, bleiben unverändert.
+
+        Args:
+            chunk_groesse (int): Konten je Block.
+
+        Returns:
+            int: Anzahl der nachgetragenen Konten.
+        """
+        anzahl, marke = 0, None
+        while True:
+            zeilen, marke = self.backend.konten_block(marke, chunk_groesse)
+            namen = [z["inhaber"] for z in zeilen
+                     if z["typ"] == "Sparkonto" and z.get("letzte_verzinsung") is None]
+            if namen:
+                with self.backend.transaktion(*namen) as konten:
+                    jetzt = self.uhr()
+                    for konto in konten.values():
+                        if konto.letzte_verzinsung is None:
+                            konto.zinsen_nachholen(self.periode_s, jetzt)
+                            anzahl += 1
+            if len(zeilen) < chunk_groesse:
+                return anzahl
+
+    def konten_schreiben(self, konten):
+        self.backend.konten_schreiben(self._verzinsen(konten))
+
+    def speichern(self, konten_liste):
+        self.backend.speichern(self._verzinsen(konten_liste))
+
+    @contextmanager
+    def transaktion(self, *namen):
+        """Verzinst die Konten vor dem Block; der Commit schreibt Stand und Zeitstempel."""
+        with self.backend.transaktion(*namen) as konten:
+            self._verzinsen({id(k): k for k in konten.values()}.values())
+            yield konten
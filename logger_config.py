@@ -1,6 +1,14 @@
+import atexit
+import gzip
+import json
 import logging
-import sys
+import logging.handlers
 import os
+import queue
+import shutil
+import sys
+import threading
+import time
 
 
 # Verzeichnis für Log-Dateien
@@ -8,36 +16,185 @@ LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
+LOG_DATEI = os.path.join(LOG_DIR, "bank_api.log")
+
+# Konfiguration über Umgebungsvariablen (Docker / Azure App Settings)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()            # "text" oder "json" (JSON-Lines)
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size").lower()        # "size" oder "time"
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATION_WHEN = os.getenv("LOG_ROTATION_WHEN", "midnight")
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "7"))
+LOG_COMPRESS = os.getenv("LOG_COMPRESS", "1") == "1"
+ACCESS_LOG_SAMPLE_THRESHOLD = int(os.getenv("ACCESS_LOG_SAMPLE_THRESHOLD", "50"))
+ACCESS_LOG_SAMPLE_RATE = int(os.getenv("ACCESS_LOG_SAMPLE_RATE", "10"))
+
+# Hintergrund-Listener, der die Handler (Konsole & Datei) bedient
+_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formatiert jeden Log-Eintrag als einzelne JSON-Zeile (JSON-Lines).
+
+    Zusätzliche Felder können über `extra={"felder": {...}}` mitgegeben werden.
+    """
+
+    def format(self, record):
+        eintrag = {
+            "zeit": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "nachricht": record.getMessage(),
+        }
+        felder = getattr(record, "felder", None)
+        if isinstance(felder, dict):
+            eintrag.update(felder)
+        if record.exc_info:
+            eintrag["exception"] = self.formatException(record.exc_info)
+        return json.dumps(eintrag, ensure_ascii=False, default=str)
+
+
+class ZugriffsLogSampler(logging.Filter):
+    """
+    Reduziert das Zugriffs-Log bei hoher Last.
+
+    Bis zu `schwelle` Einträge pro Sekunde werden vollständig geloggt. Darüber hinaus
+    wird nur noch jeder `rate`-te Eintrag durchgelassen. Warnungen und Fehler
+    werden nie verworfen.
+
+    Attributes:
+        schwelle (int): Einträge pro Sekunde, ab denen gesampelt wird (0 = nie sampeln).
+        rate (int): Nur jeder n-te Eintrag oberhalb der Schwelle wird geloggt.
+        verworfen (int): Anzahl der verworfenen Einträge.
+    """
+
+    def __init__(self, schwelle: int = 50, rate: int = 10):
+        super().__init__()
+        self.schwelle = schwelle
+        self.rate = max(1, rate)
+        self.verworfen = 0
+        self._sekunde = None
+        self._anzahl = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.schwelle <= 0:
+            return True
+        with self._lock:
+            sekunde = int(time.monotonic())
+            if sekunde != self._sekunde:
+                self._sekunde = sekunde
+                self._anzahl = 0
+            self._anzahl += 1
+            if self._anzahl <= self.schwelle or self._anzahl % self.rate == 0:
+                return True
+            self.verworfen += 1
+            return False
+
+
+def _gzip_namer(name):
+    """Hängt '.gz' an den Namen rotierter Log-Dateien an."""
+    return name + ".gz"
+
+
+def _gzip_rotator(quelle, ziel):
+    """Komprimiert die rotierte Log-Datei mit gzip und löscht das Original."""
+    with open(quelle, "rb") as f_in, gzip.open(ziel, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(quelle)
+
+
+def _erstelle_datei_handler():
+    """
+    Erstellt den rotierenden Datei-Handler (Größe oder Zeit) inkl. optionaler Kompression.
+
+    Returns:
+        logging.Handler: RotatingFileHandler oder TimedRotatingFileHandler.
+    """
+    if LOG_ROTATION == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_DATEI, when=LOG_ROTATION_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_DATEI, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    if LOG_COMPRESS:
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def _stoppe_listener():
+    """Leert die Warteschlange beim Programmende, damit keine Einträge verloren gehen."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_bank_logger():
     """
     Erstellt und konfiguriert den zentralen Logger für das Projekt.
 
+    Der Logger schreibt nur in eine Warteschlange (`QueueHandler`). Ein
+    `QueueListener` im Hintergrund-Thread übernimmt die eigentlichen Schreibzugriffe
+    auf Konsole und Datei, sodass der Request-Thread nicht auf die Festplatte wartet.
+
     Returns:
         logger: Logger
     """
+    global _listener
     logger = logging.getLogger("Softmaster_Bank")
 
     # Verhindert doppelte Logs, falls der Logger mehrfach aufgerufen wird
     if not logger.handlers:
         logger.setLevel(logging.INFO)
 
-        # Format: Zeit | Level | Modul | Nachricht
-        formatter = logging.Formatter(
-            '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
-            datefmt='%d-%m-%Y %H:%M:%S'
-        )
+        if LOG_FORMAT == "json":
+            formatter = JsonLinesFormatter(datefmt='%Y-%m-%dT%H:%M:%S%z')
+        else:
+            # Format: Zeit | Level | Modul | Nachricht
+            formatter = logging.Formatter(
+                '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
+                datefmt='%d-%m-%Y %H:%M:%S'
+            )
 
         # 1. StreamHandler für die Konsole (für Docker & Azure Logs)
         console_handler = logging.StreamHandler(sys.stdout)
         # console_handler.setLevel(logging.WARNING) # when aktiv - Zeigt nur noch Fehler/Warnungen im Terminal
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
 
-        # 2. FileHandler für dauerhafte Speicherung
-        file_handler = logging.FileHandler("logs/bank_api.log", encoding="utf-8")
+        # 2. Rotierender FileHandler für dauerhafte Speicherung
+        file_handler = _erstelle_datei_handler()
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+
+        # 3. Request-Threads schreiben nur in die Warteschlange
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_stoppe_listener)
 
     return logger
 
-logger = get_bank_logger()
\ No newline at end of file
+
+def get_access_logger():
+    """
+    Liefert den Logger für das Zugriffs-Log (eine Zeile pro Request).
+
+    Er gibt seine Einträge an den zentralen Logger weiter, wird aber bei hoher
+    Last über den `ZugriffsLogSampler` ausgedünnt.
+
+    Returns:
+        logger: Logger
+    """
+    access = logging.getLogger("Softmaster_Bank.access")
+    if not access.filters:
+        access.addFilter(ZugriffsLogSampler(ACCESS_LOG_SAMPLE_THRESHOLD, ACCESS_LOG_SAMPLE_RATE))
+    return access
+
+logger = get_bank_logger()
+access_logger = get_access_logger()
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LoginUeberlastet(Exception):
+    """Wird ausgelöst, wenn keine Passwortprüfung mehr angenommen werden kann."""
+
+
+class PasswortPruefer:
+    """
+    Führt die (absichtlich teure) bcrypt-Prüfung außerhalb des Event-Loops aus.
+
+    Die Prüfungen laufen in einem eigenen, begrenzten Thread-Pool (bcrypt gibt
+    während des Hashens den GIL frei). Höchstens `max_parallel` Prüfungen laufen
+    gleichzeitig, weitere `max_warteschlange` Anfragen warten. Ist die Warteschlange
+    voll oder dauert die Prüfung länger als `timeout`, wird `LoginUeberlastet` ausgelöst.
+
+    Attributes:
+        max_parallel (int): Anzahl gleichzeitig laufender Hash-Prüfungen.
+        max_warteschlange (int): Anzahl wartender Prüfungen.
+        timeout (float): Maximale Wartezeit einer Anfrage in Sekunden.
+    """
+
+    def __init__(self, pruef_funktion, max_parallel: int = 2, max_warteschlange: int = 32, timeout: float = 5.0):
+        """
+        Args:
+            pruef_funktion (callable): Funktion (passwort, hash) -> bool, z. B. `verify_password`.
+            max_parallel (int): Größe des Thread-Pools.
+            max_warteschlange (int): Zusätzliche Anfragen, die warten dürfen.
+            timeout (float): Timeout in Sekunden (inkl. Wartezeit in der Warteschlange).
+        """
+        self._pruef_funktion = pruef_funktion
+        self.max_parallel = max_parallel
+        self.max_warteschlange = max_warteschlange
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="passwort")
+        self._ausstehend = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ausstehend(self) -> int:
+        """int: Anzahl laufender und wartender Prüfungen."""
+        return self._ausstehend
+
+    def _freigeben(self, _future):
+        """Callback: Gibt den Platz frei, sobald die Prüfung beendet oder abgebrochen ist."""
+        with self._lock:
+            self._ausstehend -= 1
+
+    async def pruefen(self, passwort: str, passwort_hash: str) -> bool:
+        """
+        Prüft das Passwort im Thread-Pool, ohne den Event-Loop zu blockieren.
+
+        Args:
+            passwort (str): Das Klartext-Passwort.
+            passwort_hash (str): Der gespeicherte bcrypt-Hash.
+
+        Raises:
+            LoginUeberlastet: Wenn die Warteschlange voll ist oder der Timeout abläuft.
+
+        Returns:
+            bool: Ergebnis der Passwortprüfung.
+        """
+        with self._lock:
+            if self._ausstehend >= self.max_parallel + self.max_warteschlange:
+                raise LoginUeberlastet("Zu viele gleichzeitige Login-Versuche.")
+            self._ausstehend += 1
+
+        future = self._executor.submit(self._pruef_funktion, passwort, passwort_hash)
+        # Der Platz wird erst frei, wenn der Thread wirklich fertig ist (auch nach Timeout)
+        future.add_done_callback(self._freigeben)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            # Noch wartende Prüfungen werden aus der Warteschlange entfernt
+            future.cancel()
+            raise LoginUeberlastet("Zeitüberschreitung bei der Passwortprüfung.")
@@ -2,13 +2,26 @@
 bank-management-api
 Hauptmodul zur Verwaltung und Automatisierung von Bankkonten.
 Nutzung von JSON-Persistenz und interaktivem Menü.
+
+Ohne Befehl startet das interaktive Menü. Für Skripte gibt es Stapelbefehle, z. B.:
+    python main.py --storage sql run ops.ndjson
+    python main.py --storage sql deposit einzahlungen.csv
+    python main.py search Tom
 """
+import argparse
+import atexit
+import json
 import os
+import sys
+import time
 from sparkonto import Sparkonto
 from girokonto import Girokonto
 from logger_config import logger
 from dotenv import load_dotenv
 from storage_factory import get_storage
+from storage_interface import konto_aus_zeile
+from konten_import import ZeilenLeser, IMPORT_FORMATE
+from konten_batch import StapelLauf
 load_dotenv()
 
 
@@ -38,6 +51,119 @@ def filtere_konten(konten_liste, suchbegriff):
     begriff_bereinigt = suchbegriff.strip().lower()
     return [k for k in konten_liste if begriff_bereinigt in k.inhaber.lower()]
 
+def konten_durchsuchen(storage, suchbegriff, batch_groesse: int = 1000):
+    """
+    Wie `filtere_konten`, liest den Bestand aber blockweise (`konten_iterieren`)
+    statt ihn komplett zu laden.
+
+    Args:
+        storage (StorageInterface): Der Storage-Provider.
+        suchbegriff (str): Teil des Inhabernamens ('' = alle Konten).
+        batch_groesse (int): Konten je gelesenem Block.
+
+    Yields:
+        object: Die passenden Konto-Objekte.
+    """
+    for block in storage.konten_iterieren(batch_groesse):
+        yield from filtere_konten([konto_aus_zeile(z) for z in block], suchbegriff)
+
+# --- STAPELBEFEHLE (ohne Menü) ---
+
+def _datei_teile(pfad: str, groesse: int = 65536):
+    """Liest eine Datei ('-' = stdin) in Byte-Blöcken."""
+    if pfad == "-":
+        yield from iter(lambda: sys.stdin.buffer.read(groesse), b"")
+        return
+    with open(pfad, "rb") as f:
+        yield from iter(lambda: f.read(groesse), b"")
+
+
+def _fortschritt_anzeigen(stand: dict):
+    """Überschreibt die Fortschrittszeile auf stderr."""
+    print(f"\r⏳ {stand['gelesen']} Zeilen | {stand['verbucht']} verbucht | {stand['angelegt']} angelegt | "
+          f"{stand['abgelehnt_anzahl']} abgelehnt | {stand['zeilen_pro_s']}/s", end="", file=sys.stderr, flush=True)
+
+
+def stapel_ausfuehren(storage, args) -> int:
+    """
+    Führt einen Stapelbefehl aus (`run`, `deposit`, `withdraw`, `interest`, `create`, `search`).
+
+    Args:
+        storage (StorageInterface): Der Storage-Provider.
+        args (argparse.Namespace): Die geparsten Argumente.
+
+    Returns:
+        int: Exit-Code (0 = alles verbucht, 1 = abgelehnte Zeilen, 2 = Abbruch).
+    """
+    if args.befehl == "search":
+        anzahl = 0
+        for k in konten_durchsuchen(storage, args.begriff, args.chunk):
+            anzahl += 1
+            print(k)
+        print(f"{anzahl} Treffer.", file=sys.stderr)
+        return 0
+
+    anzeigen = None if args.leise else _fortschritt_anzeigen
+    lauf = StapelLauf(storage, args.chunk, fortschritt=anzeigen)
+    operation = None if args.befehl == "run" else args.befehl
+    try:
+        if args.befehl == "interest" and args.datei is None:
+            # Ohne Datei: alle Sparkonten, blockweise aus dem Bestand
+            nummer = 0
+            for block in storage.konten_iterieren(args.chunk):
+                zeilen = []
+                for z in block:
+                    nummer += 1
+                    if z["typ"] == "Sparkonto":
+                        zeilen.append((nummer, {"name": z["inhaber"]}, None))
+                lauf.hinzufuegen(zeilen, operation)
+        else:
+            format = args.format or ("csv" if args.datei.lower().endswith(".csv") else "ndjson")
+            leser = ZeilenLeser(format)
+            for teil in _datei_teile(args.datei):
+                lauf.hinzufuegen(leser.fuettern(teil), operation)
+            lauf.hinzufuegen(leser.abschliessen(), operation)
+        ergebnis = lauf.abschliessen()
+    except (OSError, ValueError, RuntimeError, TimeoutError) as e:
+        if anzeigen:
+            print(file=sys.stderr)
+        print(f"❌  Abbruch nach {lauf.stand()['gelesen']} Zeilen: {e}", file=sys.stderr)
+        return 2
+    if anzeigen:
+        print(file=sys.stderr)
+    print(json.dumps(ergebnis, indent=2, ensure_ascii=False))
+    return 0 if ergebnis["abgelehnt_anzahl"] == 0 else 1
+
+
+def _argumente_parsen(argv=None):
+    parser = argparse.ArgumentParser(description="Softmaster Bank-Management (CLI)")
+    parser.add_argument("--storage", choices=("json", "sql", "sharded"),
+                        help="Speicher-Backend (ohne Angabe: Auswahl im Menü bzw. STORAGE_TYPE)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Speicherallokationen aufzeichnen und beim Beenden die Top-Allokationen ausgeben")
+    parser.add_argument("--tracemalloc-top", type=int, default=20, metavar="N",
+                        help="Anzahl der ausgegebenen Allokationsstellen (Standard: 20)")
+
+    gemeinsam = argparse.ArgumentParser(add_help=False)
+    gemeinsam.add_argument("--chunk", type=int, default=500, help="Zeilen je Transaktion (Standard: 500)")
+    gemeinsam.add_argument("--format", choices=IMPORT_FORMATE, help="Dateiformat (Standard: nach Endung, sonst ndjson)")
+    gemeinsam.add_argument("--leise", action="store_true", help="Keine Fortschrittsanzeige")
+
+    befehle = parser.add_subparsers(dest="befehl", metavar="befehl")
+    run = befehle.add_parser("run", parents=[gemeinsam], help="Operationen aus Datei ausführen (Feld 'op' je Zeile)")
+    run.add_argument("datei", help="NDJSON/CSV-Datei ('-' = stdin)")
+    for name, hilfe in (("deposit", "Einzahlungen (Felder: name, betrag)"),
+                        ("withdraw", "Abhebungen (Felder: name, betrag)"),
+                        ("create", "Konten anlegen (Felder: name, typ, start_saldo, extra)")):
+        befehl = befehle.add_parser(name, parents=[gemeinsam], help=hilfe)
+        befehl.add_argument("datei", help="NDJSON/CSV-Datei ('-' = stdin)")
+    zinsen = befehle.add_parser("interest", parents=[gemeinsam], help="Zinsen gutschreiben (Feld: name)")
+    zinsen.add_argument("datei", nargs="?", help="NDJSON/CSV-Datei (ohne Angabe: alle Sparkonten)")
+    suche = befehle.add_parser("search", parents=[gemeinsam], help="Konten nach Namensteil suchen")
+    suche.add_argument("begriff", help="Teil des Inhabernamens")
+    return parser.parse_args(argv)
+
+
 def interaktives_menue():
     """Startet die Benutzerschnittstelle für die Kontoverwaltung."""
     while True:
@@ -54,12 +180,14 @@ def interaktives_menue():
         wahl = input("\nWählen Sie eine Option (1-8): ")
 
         if wahl == "1":
-            aktuelle_daten = storage.laden()
-            if aktuelle_daten:
-                print("\nAktuelle Konten:")
-                for k in aktuelle_daten:
-                    print(k)
-            else:
+            # Blockweise statt storage.laden(): konstanter Speicherbedarf bei großen Beständen
+            anzahl = 0
+            for k in konten_durchsuchen(storage, ""):
+                if not anzahl:
+                    print("\nAktuelle Konten:")
+                anzahl += 1
+                print(k)
+            if not anzahl:
                 print("\nKeine Konten vorhanden.")
         
         elif wahl == "2":
@@ -107,8 +235,7 @@ def interaktives_menue():
         
         elif wahl == "4":
             begriff = input("\n🔍 Filtern nach Name: ")
-            aktuelle_daten = storage.laden()
-            treffer = filtere_konten(aktuelle_daten, begriff) # Logik aufrufen
+            treffer = list(konten_durchsuchen(storage, begriff)) # Logik aufrufen
             
             if not treffer:
                 print(f"⚠️  Keine Konten gefunden für: '{begriff}'")
@@ -209,23 +336,39 @@ def interaktives_menue():
 storage_type = ""
 # --- HAUPTPROGRAMM ---
 if __name__ == "__main__":
+    args = _argumente_parsen()
+
+    if args.tracemalloc:
+        # Import erst bei Bedarf, Aufzeichnung startet vor dem Laden der Konten
+        from speicher_diagnose import speicher_diagnose
+        speicher_diagnose.starten()
+        atexit.register(lambda: print("\n" + speicher_diagnose.bericht(args.tracemalloc_top)))
+
     logger.info(f"Programm gestartet")
+    if args.befehl:
+        storage = get_storage(args.storage)
+        if os.getenv("ZINS_MODUS") == "lazy" and float(os.getenv("ZINS_INTERVALL_S", "0")) > 0:
+            # Wie die API: Sparkonten vor jeder Buchung auf den aktuellen Zinsstand bringen
+            from lazy_zins_storage import LazyZinsStorage
+            storage = LazyZinsStorage(storage, float(os.getenv("ZINS_INTERVALL_S")))
+            storage.zeitstempel_nachtragen()
+        sys.exit(stapel_ausfuehren(storage, args))
+
     print("\n" + "="*40)
     print("      🏦 Softmaster BANK-MANAGEMENT")
     print("="*40)
-    print("Wählen Sie den Speicher-Modus:")
-    print(" [1] JSON-Datei (Lokal/Einfach)")
-    print(" [2] SQLite-Datenbank (Professionell/Relational)")
-    print(" [Enter] Standard aus .env nutzen")
-    
-    wahl = input("\nAuswahl > ").strip()
-    
-    if wahl == "1":
-        storage_type = "json"
-        storage = get_storage("json")
-    elif wahl == "2":
-        storage_type = "sql"
-        storage = get_storage("sql")
+    if args.storage:
+        wahl = args.storage
+    else:
+        print("Wählen Sie den Speicher-Modus:")
+        print(" [1] JSON-Datei (Lokal/Einfach)")
+        print(" [2] SQLite-Datenbank (Professionell/Relational)")
+        print(" [Enter] Standard aus .env nutzen")
+        wahl = {"1": "json", "2": "sql"}.get(input("\nAuswahl > ").strip())
+
+    if wahl:
+        storage_type = wahl
+        storage = get_storage(wahl)
     else:
         storage_type = os.getenv("STORAGE_TYPE", "json").lower()
         storage = get_storage()
@@ -0,0 +1,285 @@
+"""
+In-Process-Metriken im Prometheus-Textformat (Exposition Format 0.0.4).
+
+Die Metriken werden im Hot-Path mit minimalem Locking erfasst: Das Anlegen einer
+neuen Label-Kombination läuft unter dem Lock der Metrik, jede weitere Erfassung
+nur noch unter dem (kaum umkämpften) Lock der jeweiligen Label-Kombination.
+"""
+import functools
+from contextlib import contextmanager
+import math
+import threading
+import time
+from server_timing import span_erfassen
+
+
+# Standard-Buckets für Latenzen in Sekunden
+STANDARD_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LE_INF = 'le="+Inf"'
+
+
+def _label_wert(wert) -> str:
+    """Maskiert einen Label-Wert gemäß Prometheus-Textformat."""
+    return str(wert).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(namen, werte, zusatz=None) -> str:
+    """Erzeugt den Label-Block '{a="1",b="2"}' (leer, wenn keine Labels vorhanden sind)."""
+    paare = [f'{n}="{_label_wert(w)}"' for n, w in zip(namen, werte)]
+    if zusatz:
+        paare.append(zusatz)
+    return "{" + ",".join(paare) + "}" if paare else ""
+
+
+def _zahl(wert) -> str:
+    """Formatiert einen Zahlenwert für das Textformat (inkl. +Inf)."""
+    if math.isinf(wert):
+        return "+Inf" if wert > 0 else "-Inf"
+    if float(wert).is_integer():
+        return str(int(wert))
+    return repr(float(wert))
+
+
+class _Metrik:
+    """
+    Basisklasse für Counter, Gauge und Histogram.
+
+    Attributes:
+        name (str): Name der Metrik (z. B. 'bank_http_requests_total').
+        hilfe (str): Beschreibungstext für die '# HELP'-Zeile.
+        label_namen (tuple): Namen der Labels.
+    """
+    typ = "untyped"
+
+    def __init__(self, name: str, hilfe: str, label_namen=()):
+        self.name = name
+        self.hilfe = hilfe
+        self.label_namen = tuple(label_namen)
+        self._kinder = {}
+        self._lock = threading.Lock()
+
+    def _neues_kind(self):
+        raise NotImplementedError
+
+    def _kind(self, labels: dict):
+        """Liefert den Wert-Container einer Label-Kombination (legt ihn bei Bedarf an)."""
+        schluessel = tuple(str(labels.get(n, "")) for n in self.label_namen)
+        kind = self._kinder.get(schluessel)
+        if kind is None:
+            with self._lock:
+                kind = self._kinder.setdefault(schluessel, self._neues_kind())
+        return kind
+
+    def _zeilen(self):
+        raise NotImplementedError
+
+    def exposition(self) -> str:
+        """Gibt die Metrik inkl. HELP/TYPE-Zeilen im Textformat zurück."""
+        zeilen = [f"# HELP {self.name} {self.hilfe}", f"# TYPE {self.name} {self.typ}"]
+        zeilen.extend(self._zeilen())
+        return "\n".join(zeilen)
+
+
+class _Wert:
+    """Einzelner, per Lock geschützter Zahlenwert."""
+    __slots__ = ("wert", "lock")
+
+    def __init__(self):
+        self.wert = 0.0
+        self.lock = threading.Lock()
+
+
+class Counter(_Metrik):
+    """Monoton steigender Zähler."""
+    typ = "counter"
+
+    def _neues_kind(self):
+        return _Wert()
+
+    def inc(self, betrag: float = 1.0, **labels):
+        """Erhöht den Zähler der angegebenen Label-Kombination."""
+        kind = self._kind(labels)
+        with kind.lock:
+            kind.wert += betrag
+
+    def _zeilen(self):
+        for werte, kind in list(self._kinder.items()):
+            yield f"{self.name}{_labels_text(self.label_namen, werte)} {_zahl(kind.wert)}"
+
+
+class Gauge(Counter):
+    """Wert, der steigen und fallen kann (z. B. laufende Requests)."""
+    typ = "gauge"
+
+    def dec(self, betrag: float = 1.0, **labels):
+        """Verringert den Wert der angegebenen Label-Kombination."""
+        self.inc(-betrag, **labels)
+
+    def set(self, wert: float, **labels):
+        """Setzt den Wert der angegebenen Label-Kombination."""
+        kind = self._kind(labels)
+        with kind.lock:
+            kind.wert = float(wert)
+
+
+class _HistogrammWerte:
+    """Bucket-Zähler, Summe und Anzahl einer Label-Kombination."""
+    __slots__ = ("buckets", "summe", "anzahl", "lock")
+
+    def __init__(self, anzahl_buckets):
+        self.buckets = [0] * anzahl_buckets
+        self.summe = 0.0
+        self.anzahl = 0
+        self.lock = threading.Lock()
+
+
+class Histogram(_Metrik):
+    """Histogramm mit festen Bucket-Grenzen (kumulativ ausgegeben)."""
+    typ = "histogram"
+
+    def __init__(self, name: str, hilfe: str, label_namen=(), buckets=STANDARD_BUCKETS):
+        super().__init__(name, hilfe, label_namen)
+        self.grenzen = tuple(sorted(buckets))
+
+    def _neues_kind(self):
+        return _HistogrammWerte(len(self.grenzen))
+
+    def observe(self, wert: float, **labels):
+        """Erfasst einen Messwert (z. B. eine Dauer in Sekunden)."""
+        kind = self._kind(labels)
+        index = len(self.grenzen)
+        for i, grenze in enumerate(self.grenzen):
+            if wert <= grenze:
+                index = i
+                break
+        with kind.lock:
+            if index < len(self.grenzen):
+                kind.buckets[index] += 1
+            kind.summe += wert
+            kind.anzahl += 1
+
+    def _zeilen(self):
+        for werte, kind in list(self._kinder.items()):
+            with kind.lock:
+                buckets, summe, anzahl = list(kind.buckets), kind.summe, kind.anzahl
+            kumuliert = 0
+            for grenze, zaehler in zip(self.grenzen, buckets):
+                kumuliert += zaehler
+                le = f'le="{_zahl(grenze)}"'
+                yield f"{self.name}_bucket{_labels_text(self.label_namen, werte, le)} {kumuliert}"
+            yield f"{self.name}_bucket{_labels_text(self.label_namen, werte, _LE_INF)} {anzahl}"
+            yield f"{self.name}_sum{_labels_text(self.label_namen, werte)} {_zahl(summe)}"
+            yield f"{self.name}_count{_labels_text(self.label_namen, werte)} {anzahl}"
+
+
+class MetricsRegistry:
+    """
+    Sammelt alle Metriken und erzeugt die Ausgabe für den `/metrics`-Endpunkt.
+
+    Neben registrierten Metriken können Sammler-Funktionen hinterlegt werden, die
+    erst beim Abruf Werte liefern (z. B. die Zähler des Token-Caches).
+    """
+
+    def __init__(self):
+        self._metriken = {}
+        self._sammler = []
+        self._lock = threading.Lock()
+
+    def _registrieren(self, metrik):
+        with self._lock:
+            return self._metriken.setdefault(metrik.name, metrik)
+
+    def counter(self, name, hilfe, label_namen=()) -> Counter:
+        """Legt einen Counter an (oder liefert den bereits registrierten)."""
+        return self._registrieren(Counter(name, hilfe, label_namen))
+
+    def gauge(self, name, hilfe, label_namen=()) -> Gauge:
+        """Legt ein Gauge an (oder liefert das bereits registrierte)."""
+        return self._registrieren(Gauge(name, hilfe, label_namen))
+
+    def histogram(self, name, hilfe, label_namen=(), buckets=STANDARD_BUCKETS) -> Histogram:
+        """Legt ein Histogramm an (oder liefert das bereits registrierte)."""
+        return self._registrieren(Histogram(name, hilfe, label_namen, buckets))
+
+    def sammler_hinzufuegen(self, funktion):
+        """
+        Registriert eine Funktion, die beim Abruf Metriken liefert.
+
+        Args:
+            funktion (callable): Liefert eine Liste von Tupeln (name, typ, hilfe, wert).
+        """
+        with self._lock:
+            self._sammler.append(funktion)
+
+    def exposition(self) -> str:
+        """
+        Erzeugt den kompletten Text für den `/metrics`-Endpunkt.
+
+        Returns:
+            str: Alle Metriken im Prometheus-Textformat.
+        """
+        bloecke = [m.exposition() for m in list(self._metriken.values())]
+        for funktion in list(self._sammler):
+            for name, typ, hilfe, wert in funktion():
+                bloecke.append(f"# HELP {name} {hilfe}\n# TYPE {name} {typ}\n{name} {_zahl(wert)}")
+        return "\n".join(bloecke) + "\n"
+
+
+# Zentrale Registry und die Standard-Metriken der API
+registry = MetricsRegistry()
+
+HTTP_ANFRAGEN = registry.counter(
+    "bank_http_requests_total", "Anzahl der HTTP-Anfragen je Route und Status.", ("method", "route", "status")
+)
+HTTP_DAUER = registry.histogram(
+    "bank_http_request_duration_seconds", "Antwortzeit der HTTP-Anfragen in Sekunden.", ("method", "route", "status")
+)
+HTTP_LAUFEND = registry.gauge(
+    "bank_http_requests_in_flight", "Aktuell laufende HTTP-Anfragen.", ("method",)
+)
+STORAGE_DAUER = registry.histogram(
+    "bank_storage_operation_duration_seconds", "Dauer der Storage-Operationen in Sekunden.", ("backend", "method")
+)
+STORAGE_FEHLER = registry.counter(
+    "bank_storage_operation_errors_total", "Fehlgeschlagene Storage-Operationen.", ("backend", "method")
+)
+LOGIN_VERSUCHE = registry.counter(
+    "bank_login_attempts_total", "Login-Versuche nach Ergebnis.", ("result",)
+)
+
+
+@contextmanager
+def storage_abschnitt(storage, methode: str):
+    """
+    Context-Manager: Misst einen Abschnitt einer Storage-Operation wie `storage_zeitmessung`
+    (z. B. Lese- und Schreibphase einer Transaktion).
+
+    Args:
+        storage (StorageInterface): Das Backend (Klassenname als Label).
+        methode (str): Name des Abschnitts (Label und Server-Timing 'storage.<methode>').
+    """
+    backend = type(storage).__name__
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STORAGE_FEHLER.inc(backend=backend, method=methode)
+        raise
+    finally:
+        dauer = time.perf_counter() - start
+        STORAGE_DAUER.observe(dauer, backend=backend, method=methode)
+        span_erfassen(f"storage.{methode}", dauer)
+
+
+def storage_zeitmessung(func):
+    """
+    Decorator: Misst die Dauer einer Storage-Methode und zählt Fehler.
+
+    Als Labels dienen der Klassenname des Backends und der Methodenname. Die Dauer
+    fließt zusätzlich als Abschnitt 'storage.<methode>' in den Server-Timing-Header.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with storage_abschnitt(self, func.__name__):
+            return func(self, *args, **kwargs)
+    return wrapper
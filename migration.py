@@ -0,0 +1,164 @@
+"""
+Online-Migration zwischen den Storage-Backends (z. B. JSON -> SQLite).
+
+Die Quelle wird blockweise gelesen (`konten_iterieren`), die Gegenstücke im Ziel
+mit einer Abfrage je Block geholt (`konten_holen`) und per Prüfsumme verglichen.
+Nur abweichende Konten werden geschrieben; nach dem Schreiben wird die
+Prüfsumme des Blocks im Ziel erneut verifiziert. Ein erneuter Lauf kopiert daher
+nur die Unterschiede, die seit dem letzten Lauf entstanden sind (z. B. während
+die API weiterläuft).
+
+Konten, die nur im Ziel existieren, werden nicht gelöscht.
+
+Aufruf:
+    python migration.py --von json --nach sql --chunk 1000
+"""
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from storage_interface import konto_zu_zeile, konto_aus_zeile
+from logger_config import logger
+
+
+def _normalisiert(zeile: dict) -> tuple:
+    """Vergleichbare Form einer Zeile (Zahlen als float, Name als Schlüssel)."""
+    extra = zeile["extra"]
+    verzinsung = zeile.get("letzte_verzinsung")
+    return (
+        zeile["inhaber"].strip().lower(),
+        zeile["inhaber"],
+        float(zeile["kontostand"]),
+        zeile["typ"],
+        None if extra is None else float(extra),
+        None if verzinsung is None else float(verzinsung),
+    )
+
+
+def pruefsumme(zeilen) -> str:
+    """
+    SHA-256 über die normalisierten Zeilen (unabhängig von der Reihenfolge).
+
+    Args:
+        zeilen (iterable): Zeilen-Dictionaries (siehe `konto_zu_zeile`).
+
+    Returns:
+        str: Hex-Prüfsumme.
+    """
+    daten = json.dumps(sorted(_normalisiert(z) for z in zeilen), separators=(",", ":"))
+    return hashlib.sha256(daten.encode("utf-8")).hexdigest()
+
+
+class Migration:
+    """
+    Kopiert bzw. synchronisiert alle Konten von `quelle` nach `ziel`.
+
+    Attributes:
+        quelle (StorageInterface): Backend, aus dem gelesen wird (darf weiter beschrieben werden).
+        ziel (StorageInterface): Backend, in das geschrieben wird.
+        chunk_groesse (int): Konten je Block.
+        pause (float): Wartezeit in Sekunden nach jedem Block (schont den laufenden Betrieb).
+        status (dict): Fortschritt und Ergebnis (thread-sicher über `status_abfragen`).
+    """
+
+    def __init__(self, quelle, ziel, chunk_groesse: int = 1000, pause: float = 0.0):
+        self.quelle = quelle
+        self.ziel = ziel
+        self.chunk_groesse = chunk_groesse
+        self.pause = pause
+        self._lock = threading.Lock()
+        self._gesamt = hashlib.sha256()
+        self.status = {
+            "zustand": "bereit", "quelle": type(quelle).__name__, "ziel": type(ziel).__name__,
+            "bloecke": 0, "gelesen": 0, "kopiert": 0, "unveraendert": 0,
+            "fehlerhafte_bloecke": [], "pruefsumme": None, "fehler": None,
+            "gestartet": None, "dauer_s": None,
+        }
+
+    def status_abfragen(self) -> dict:
+        """dict: Kopie des aktuellen Status."""
+        with self._lock:
+            return {**self.status, "fehlerhafte_bloecke": list(self.status["fehlerhafte_bloecke"])}
+
+    def _aktualisieren(self, **werte):
+        with self._lock:
+            self.status.update(werte)
+
+    def ausfuehren(self) -> dict:
+        """
+        Führt die Migration vollständig aus.
+
+        Returns:
+            dict: Der Abschluss-Status (zustand 'fertig', 'abweichung' oder 'fehler').
+        """
+        start = time.perf_counter()
+        self._aktualisieren(zustand="laeuft", gestartet=time.time())
+        logger.info("Migration gestartet: %s -> %s", self.status["quelle"], self.status["ziel"])
+        try:
+            for nummer, zeilen in enumerate(self.quelle.konten_iterieren(self.chunk_groesse), start=1):
+                self._block(nummer, zeilen)
+                if self.pause:
+                    time.sleep(self.pause)
+        except Exception as e:
+            logger.error("Migration abgebrochen: %s", e)
+            self._aktualisieren(zustand="fehler", fehler=str(e), dauer_s=round(time.perf_counter() - start, 3))
+            return self.status_abfragen()
+        with self._lock:
+            self.status["zustand"] = "abweichung" if self.status["fehlerhafte_bloecke"] else "fertig"
+            self.status["pruefsumme"] = self._gesamt.hexdigest()
+            self.status["dauer_s"] = round(time.perf_counter() - start, 3)
+        ergebnis = self.status_abfragen()
+        logger.info("Migration %s: %s gelesen, %s kopiert, %s unverändert.",
+                    ergebnis["zustand"], ergebnis["gelesen"], ergebnis["kopiert"], ergebnis["unveraendert"])
+        return ergebnis
+
+    def _block(self, nummer: int, zeilen: list):
+        """Vergleicht einen Block per Prüfsumme, kopiert die Abweichungen und verifiziert."""
+        soll = pruefsumme(zeilen)
+        namen = [z["inhaber"] for z in zeilen]
+        vorhanden = {n: konto_zu_zeile(k) for n, k in self.ziel.konten_holen(namen).items()}
+        kopiert = 0
+        if pruefsumme(vorhanden.values()) != soll:
+            abweichend = [
+                z for z in zeilen
+                if z["inhaber"].strip().lower() not in vorhanden
+                or _normalisiert(vorhanden[z["inhaber"].strip().lower()]) != _normalisiert(z)
+            ]
+            self.ziel.konten_schreiben([konto_aus_zeile(z) for z in abweichend])
+            kopiert = len(abweichend)
+            ist = pruefsumme(konto_zu_zeile(k) for k in self.ziel.konten_holen(namen).values())
+            if ist != soll:
+                logger.warning("Migration: Prüfsumme von Block %s weicht ab.", nummer)
+                with self._lock:
+                    self.status["fehlerhafte_bloecke"].append(nummer)
+        with self._lock:
+            self._gesamt.update(soll.encode("ascii"))
+            self.status["bloecke"] = nummer
+            self.status["gelesen"] += len(zeilen)
+            self.status["kopiert"] += kopiert
+            self.status["unveraendert"] += len(zeilen) - kopiert
+
+
+def main(argv=None) -> int:
+    from storage_factory import get_storage
+
+    parser = argparse.ArgumentParser(description="Konten zwischen Storage-Backends migrieren/synchronisieren")
+    parser.add_argument("--von", required=True, choices=("json", "sql", "sharded"), help="Quell-Backend")
+    parser.add_argument("--nach", required=True, choices=("json", "sql", "sharded"), help="Ziel-Backend")
+    parser.add_argument("--chunk", type=int, default=1000, help="Konten je Block")
+    parser.add_argument("--pause-ms", type=float, default=0.0, help="Pause nach jedem Block")
+    args = parser.parse_args(argv)
+    if args.von == args.nach:
+        parser.error("Quelle und Ziel müssen verschieden sein.")
+
+    migration = Migration(get_storage(args.von, write_behind=False), get_storage(args.nach, write_behind=False),
+                          args.chunk, args.pause_ms / 1000)
+    ergebnis = migration.ausfuehren()
+    print(json.dumps(ergebnis, indent=2, ensure_ascii=False))
+    return 0 if ergebnis["zustand"] == "fertig" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """
+    Klassischer Token-Bucket: Füllt sich mit `rate` Tokens pro Sekunde bis zur
+    `kapazitaet` auf. Jede Anfrage entnimmt `kosten` Tokens.
+
+    Die Klasse selbst ist nicht threadsicher; der `TokenBucketLimiter` schützt
+    den Zugriff mit einem Lock.
+
+    Attributes:
+        rate (float): Nachfüllrate in Tokens pro Sekunde.
+        kapazitaet (float): Maximale Anzahl Tokens (erlaubter Burst).
+        tokens (float): Aktuell verfügbare Tokens.
+    """
+
+    def __init__(self, rate: float, kapazitaet: float, jetzt: float = None):
+        self.rate = rate
+        self.kapazitaet = kapazitaet
+        self.tokens = kapazitaet
+        self._zeitpunkt = time.monotonic() if jetzt is None else jetzt
+
+    def entnehmen(self, kosten: float = 1.0, jetzt: float = None) -> float:
+        """
+        Versucht, `kosten` Tokens zu entnehmen.
+
+        Args:
+            kosten (float): Anzahl der benötigten Tokens.
+            jetzt (float): Optionaler Zeitpunkt (monotonic), Standard ist `time.monotonic()`.
+
+        Returns:
+            float: 0.0, wenn die Anfrage erlaubt ist, sonst die Wartezeit in Sekunden,
+                bis genügend Tokens verfügbar sind.
+        """
+        jetzt = time.monotonic() if jetzt is None else jetzt
+        vergangen = max(0.0, jetzt - self._zeitpunkt)
+        self.tokens = min(self.kapazitaet, self.tokens + vergangen * self.rate)
+        self._zeitpunkt = jetzt
+
+        if self.tokens >= kosten:
+            self.tokens -= kosten
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (kosten - self.tokens) / self.rate
+
+
+class TokenBucketLimiter:
+    """
+    Verwaltet je Schlüssel (z. B. Benutzername oder IP) einen eigenen Token-Bucket.
+
+    Die Anzahl der Schlüssel ist begrenzt; bei Überlauf wird der am längsten
+    ungenutzte Bucket verworfen, damit Anfragen mit zufälligen Schlüsseln
+    den Speicher nicht füllen können.
+
+    Attributes:
+        rate (float): Nachfüllrate je Bucket in Tokens pro Sekunde.
+        kapazitaet (float): Burst-Größe je Bucket.
+        max_schluessel (int): Maximale Anzahl gleichzeitig verwalteter Buckets.
+        abgelehnt (int): Anzahl der abgelehnten Anfragen.
+    """
+
+    def __init__(self, rate: float, kapazitaet: float, max_schluessel: int = 10000):
+        self.rate = rate
+        self.kapazitaet = kapazitaet
+        self.max_schluessel = max_schluessel
+        self.abgelehnt = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pruefen(self, schluessel: str, kosten: float = 1.0, jetzt: float = None) -> float:
+        """
+        Prüft, ob für den Schlüssel noch Kontingent vorhanden ist, und verbraucht es.
+
+        Args:
+            schluessel (str): Der Schlüssel des Buckets (z. B. "ip:10.0.0.1").
+            kosten (float): Anzahl der benötigten Tokens.
+            jetzt (float): Optionaler Zeitpunkt (monotonic).
+
+        Returns:
+            float: 0.0 bei Erfolg, sonst die empfohlene Wartezeit in Sekunden (Retry-After).
+        """
+        with self._lock:
+            bucket = self._buckets.get(schluessel)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.kapazitaet, jetzt)
+                self._buckets[schluessel] = bucket
+                if len(self._buckets) > self.max_schluessel:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(schluessel)
+            wartezeit = bucket.entnehmen(kosten, jetzt)
+            if wartezeit > 0:
+                self.abgelehnt += 1
+            return wartezeit
@@ -0,0 +1,214 @@
+import cProfile
+import functools
+import inspect
+import itertools
+import os
+import profile
+import pstats
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+
+
+# Request-lokale Liste der Profiler aller profilierten Abschnitte (None = Request wird nicht profiliert)
+_profile: ContextVar = ContextVar("request_profile", default=None)
+
+
+def _neuer_profiler():
+    """
+    Profiler, der nur den aufrufenden Thread erfasst. cProfile läuft ab Python 3.12
+    über sys.monitoring und damit prozessweit (alle Threads, also auch parallele
+    Requests); dort wird das langsamere, aber thread-lokale `profile` verwendet.
+    """
+    if sys.version_info < (3, 12):
+        return cProfile.Profile()
+    return profile.Profile(time.perf_counter)
+
+
+class RequestProfiler:
+    """
+    Profiliert einzelne Requests und legt die Statistiken als `.prof`-Dateien in
+    einem rotierenden Verzeichnis ab.
+
+    Profiliert wird nicht der Event-Loop (dort laufen parallel andere Requests),
+    sondern nur Code, der über `ausfuehren` läuft: synchrone Endpunkte (siehe
+    `umschliessen`) und die Thread-Pool-Arbeit asynchroner Endpunkte. Jeder
+    Abschnitt erhält einen eigenen, thread-lokalen Profiler; beim Speichern werden
+    sie zu einem Profil zusammengeführt.
+
+    Es wird immer höchstens ein Request gleichzeitig profiliert (begrenzt den
+    Overhead). Ist bereits ein Request in Profilierung, läuft der nächste ohne Profil.
+
+    Attributes:
+        verzeichnis (str): Ablageort der `.prof`-Dateien.
+        sample_rate (int): Jeder n-te Request wird profiliert (0 = Sampling aus).
+        max_dateien (int): Maximale Anzahl aufbewahrter Profile (älteste werden gelöscht).
+    """
+
+    def __init__(self, verzeichnis: str, sample_rate: int = 0, max_dateien: int = 50):
+        self.verzeichnis = verzeichnis
+        self.sample_rate = sample_rate
+        self.max_dateien = max_dateien
+        self._lock = threading.Lock()
+        self._zaehler = itertools.count(1)
+        os.makedirs(self.verzeichnis, exist_ok=True)
+
+    def sampling_faellig(self) -> bool:
+        """bool: True, wenn der aktuelle Request laut Sampling-Rate profiliert werden soll."""
+        return self.sample_rate > 0 and next(self._zaehler) % self.sample_rate == 0
+
+    def starten(self):
+        """
+        Startet die Profilierung des aktuellen Requests, sofern gerade kein anderer
+        profiliert wird. Muss wie `server_timing.messung_starten` in der Middleware
+        vor `call_next` aufgerufen werden.
+
+        Returns:
+            Token | None: Token für `anhalten` oder None, wenn belegt.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        return _profile.set([])
+
+    def anhalten(self, token) -> list:
+        """
+        Beendet die Profilierung des Requests (im selben Kontext wie `starten`).
+
+        Args:
+            token: Der von `starten` gelieferte Token.
+
+        Returns:
+            list: Die Profiler der erfassten Abschnitte (für `speichern`).
+        """
+        try:
+            profile_liste = _profile.get() or []
+            _profile.reset(token)
+        finally:
+            self._lock.release()
+        return profile_liste
+
+    def ausfuehren(self, funktion, *args, **kwargs):
+        """
+        Führt `funktion` aus; wird der aktuelle Request profiliert, unter einem eigenen
+        Profiler für den aufrufenden Thread. Nur außerhalb des Event-Loops aufrufen
+        (z. B. `run_in_threadpool(request_profiler.ausfuehren, funktion)`).
+
+        Returns:
+            object: Das Ergebnis von `funktion`.
+        """
+        profile_liste = _profile.get()
+        if profile_liste is None:
+            return funktion(*args, **kwargs)
+        profiler = _neuer_profiler()
+        profile_liste.append(profiler)
+        # Verschachtelte Aufrufe laufen unter diesem Profiler mit
+        token = _profile.set(None)
+        try:
+            return profiler.runcall(funktion, *args, **kwargs)
+        finally:
+            _profile.reset(token)
+
+    def umschliessen(self, endpunkt):
+        """
+        Umschließt einen synchronen Endpunkt mit `ausfuehren` (FastAPI führt ihn weiterhin
+        im Thread-Pool aus). Asynchrone Endpunkte bleiben unverändert.
+
+        Args:
+            endpunkt (callable): Die Endpunkt-Funktion.
+
+        Returns:
+            callable: Der (ggf. umschlossene) Endpunkt mit unveränderter Signatur.
+        """
+        if inspect.iscoroutinefunction(endpunkt) or inspect.isasyncgenfunction(endpunkt):
+            return endpunkt
+
+        @functools.wraps(endpunkt)
+        def profiliert(*args, **kwargs):
+            return self.ausfuehren(endpunkt, *args, **kwargs)
+
+        return profiliert
+
+    def speichern(self, profile_liste: list, art: str = "manuell") -> str:
+        """
+        Führt die Abschnitte zusammen, speichert die Statistik und rotiert das Verzeichnis.
+        Blockierende Datei-I/O: aus dem Event-Loop per `run_in_threadpool` aufrufen.
+
+        Args:
+            profile_liste (list): Die von `anhalten` gelieferten Profiler.
+            art (str): 'manuell' (Admin-Anforderung) oder 'sample'.
+
+        Returns:
+            str: Die ID des gespeicherten Profils.
+        """
+        profil_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{art}-{uuid.uuid4().hex[:8]}"
+        pstats.Stats(*profile_liste).dump_stats(self._pfad(profil_id))
+        self._rotieren()
+        return profil_id
+
+    def _pfad(self, profil_id: str) -> str:
+        return os.path.join(self.verzeichnis, f"{profil_id}.prof")
+
+    def _rotieren(self):
+        """Löscht die ältesten Profile, sobald mehr als `max_dateien` vorhanden sind."""
+        dateien = sorted(
+            (os.path.join(self.verzeichnis, d) for d in os.listdir(self.verzeichnis) if d.endswith(".prof")),
+            key=os.path.getmtime,
+        )
+        for datei in dateien[:max(0, len(dateien) - self.max_dateien)]:
+            try:
+                os.remove(datei)
+            except OSError:
+                pass
+
+    def auflisten(self) -> list:
+        """
+        Listet die gespeicherten Profile (neueste zuerst).
+
+        Returns:
+            list: IDs der vorhandenen Profile.
+        """
+        dateien = [d for d in os.listdir(self.verzeichnis) if d.endswith(".prof")]
+        dateien.sort(key=lambda d: os.path.getmtime(os.path.join(self.verzeichnis, d)), reverse=True)
+        return [d[:-len(".prof")] for d in dateien]
+
+    def top_funktionen(self, profil_id: str, anzahl: int = 25, sortierung: str = "cumulative") -> dict:
+        """
+        Liefert die teuersten Funktionen eines gespeicherten Profils.
+
+        Args:
+            profil_id (str): Die ID des Profils.
+            anzahl (int): Anzahl der zurückgegebenen Funktionen.
+            sortierung (str): 'cumulative' (inkl. Unterfunktionen) oder 'tottime' (nur eigene Zeit).
+
+        Raises:
+            ValueError: Wenn das Profil nicht existiert oder die Sortierung ungültig ist.
+
+        Returns:
+            dict: Gesamtdauer, Anzahl der Aufrufe und die Liste der Top-Funktionen.
+        """
+        if sortierung not in ("cumulative", "tottime"):
+            raise ValueError("Sortierung muss 'cumulative' oder 'tottime' sein.")
+        # Nur einfache IDs zulassen (kein Pfad-Traversal)
+        if os.path.basename(profil_id) != profil_id or not os.path.exists(self._pfad(profil_id)):
+            raise ValueError(f"Profil '{profil_id}' wurde nicht gefunden.")
+
+        stats = pstats.Stats(self._pfad(profil_id))
+        index = 3 if sortierung == "cumulative" else 2
+        eintraege = sorted(stats.stats.items(), key=lambda e: e[1][index], reverse=True)[:anzahl]
+        return {
+            "id": profil_id,
+            "gesamtdauer_s": round(stats.total_tt, 6),
+            "aufrufe": stats.total_calls,
+            "sortierung": sortierung,
+            "funktionen": [
+                {
+                    "funktion": f"{datei}:{zeile}({name})",
+                    "aufrufe": aufrufe,
+                    "eigene_zeit_s": round(eigen, 6),
+                    "kumuliert_s": round(kumuliert, 6),
+                }
+                for (datei, zeile, name), (_primitiv, aufrufe, eigen, kumuliert, _aufrufer) in eintraege
+            ],
+        }
@@ -0,0 +1,92 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Request-lokale Liste der gemessenen Abschnitte: [(name, dauer_in_sekunden), ...]
+_spans: ContextVar = ContextVar("server_timing_spans", default=None)
+
+
+def messung_starten():
+    """
+    Startet die Zeitmessung für den aktuellen Request.
+
+    Muss in der Middleware vor `call_next` aufgerufen werden, damit Endpunkte,
+    Dependencies und Storage-Aufrufe (auch im Thread-Pool) dieselbe Liste sehen.
+
+    Returns:
+        Token: Token für `messung_beenden`.
+    """
+    return _spans.set([])
+
+
+def messung_beenden(token) -> list:
+    """
+    Beendet die Zeitmessung und liefert die erfassten Abschnitte.
+
+    Args:
+        token: Der von `messung_starten` gelieferte Token.
+
+    Returns:
+        list: Liste von Tupeln (name, dauer_in_sekunden).
+    """
+    spans = _spans.get() or []
+    _spans.reset(token)
+    return spans
+
+
+def span_erfassen(name: str, dauer: float):
+    """Erfasst einen bereits gemessenen Abschnitt (ohne Wirkung außerhalb eines Requests)."""
+    spans = _spans.get()
+    if spans is not None:
+        spans.append((name, dauer))
+
+
+@contextmanager
+def span(name: str):
+    """
+    Context-Manager: Misst die Dauer des umschlossenen Blocks als Abschnitt `name`.
+
+    Args:
+        name (str): Name des Abschnitts (z. B. 'auth', 'domain').
+    """
+    if _spans.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        span_erfassen(name, time.perf_counter() - start)
+
+
+def zusammenfassen(spans: list) -> dict:
+    """
+    Summiert mehrfach auftretende Abschnitte (z. B. zwei Storage-Aufrufe).
+
+    Args:
+        spans (list): Liste von Tupeln (name, dauer_in_sekunden).
+
+    Returns:
+        dict: Abschnittsname -> Gesamtdauer in Millisekunden (Reihenfolge des ersten Auftretens).
+    """
+    summen = {}
+    for name, dauer in spans:
+        summen[name] = summen.get(name, 0.0) + dauer * 1000
+    return summen
+
+
+def header_wert(spans: list, gesamt: float) -> str:
+    """
+    Baut den Wert des `Server-Timing`-Headers.
+
+    Args:
+        spans (list): Liste von Tupeln (name, dauer_in_sekunden).
+        gesamt (float): Gesamtdauer des Requests in Sekunden.
+
+    Returns:
+        str: z. B. 'auth;dur=0.120, storage.konto_holen;dur=1.800, total;dur=2.400'.
+    """
+    teile = [f"{name};dur={ms:.3f}" for name, ms in zusammenfassen(spans).items()]
+    teile.append(f"total;dur={gesamt * 1000:.3f}")
+    return ", ".join(teile)
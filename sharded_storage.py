@@ -0,0 +1,294 @@
+"""
+Storage-Provider, der die Konten per Hash auf mehrere SQLite-Dateien verteilt.
+
+SQLite erlaubt nur einen Schreiber je Datei. Mit N Shards laufen Schreibvorgänge
+auf Konten verschiedener Shards parallel (jeder Shard hat seine eigene
+Schreib-Verbindung). Lesende Operationen über alle Konten (`laden`, Suche)
+werden parallel an alle Shards verteilt und zusammengeführt.
+
+Umverteilen auf eine andere Shard-Anzahl:
+    python sharded_storage.py --von shards --nach shards_neu --shards 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from itertools import chain
+from storage_interface import StorageInterface
+from sqlite_storage import SQLiteStorage
+from konto_locks import konto_sperren, normalisiere_name
+from logger_config import logger
+from metrics import storage_zeitmessung
+
+META_DATEI = "shards.json"
+
+
+class ShardedStorage(StorageInterface):
+    """
+    Verteilt die Konten per CRC32 des normalisierten Inhabernamens auf `anzahl_shards`
+    SQLite-Dateien.
+
+    Die Shard-Anzahl wird in `shards.json` im Verzeichnis festgehalten; ein Öffnen mit
+    abweichender Anzahl wird abgelehnt (dafür gibt es `umverteilen`).
+
+    Transaktionen innerhalb eines Shards sind atomar wie bei `SQLiteStorage`. Bei
+    Transaktionen über mehrere Shards werden alle Konto-Sperren vorab erworben und
+    die Shards in fester Reihenfolge gesperrt; ein Fehler vor dem Commit verwirft alle
+    Änderungen. Die Commits der einzelnen Dateien sind jedoch nicht gemeinsam atomar:
+    Bei einem Absturz genau zwischen zwei Commits kann nur eine Seite geschrieben sein.
+
+    Attributes:
+        verzeichnis (str): Verzeichnis der Shard-Dateien.
+        anzahl_shards (int): Anzahl der Shards.
+        shards (list): Die SQLiteStorage-Instanzen.
+    """
+
+    def __init__(self, verzeichnis: str = "shards", anzahl_shards: int = 4):
+        if anzahl_shards < 1:
+            raise ValueError("Es wird mindestens ein Shard benötigt.")
+        os.makedirs(verzeichnis, exist_ok=True)
+        self.verzeichnis = verzeichnis
+        self.anzahl_shards = anzahl_shards
+        self._meta_pruefen()
+        self.shards = [
+            SQLiteStorage(os.path.join(verzeichnis, f"shard_{i:02d}.db")) for i in range(anzahl_shards)
+        ]
+        self._pool = ThreadPoolExecutor(max_workers=anzahl_shards, thread_name_prefix="shard")
+
+    def _meta_pruefen(self):
+        """Legt `shards.json` an bzw. prüft, ob die Shard-Anzahl zum Bestand passt."""
+        pfad = os.path.join(self.verzeichnis, META_DATEI)
+        if os.path.exists(pfad):
+            with open(pfad, "r", encoding="utf-8") as f:
+                vorhanden = json.load(f)["anzahl_shards"]
+            if vorhanden != self.anzahl_shards:
+                raise ValueError(
+                    f"'{self.verzeichnis}' enthält {vorhanden} Shards, angefordert: {self.anzahl_shards}. "
+                    "Bitte mit `python sharded_storage.py` umverteilen."
+                )
+        else:
+            with open(pfad, "w", encoding="utf-8") as f:
+                json.dump({"anzahl_shards": self.anzahl_shards}, f)
+
+    def shard_index(self, name: str) -> int:
+        """int: Index des Shards, der für den Inhabernamen zuständig ist."""
+        return zlib.crc32(normalisiere_name(name).encode("utf-8")) % self.anzahl_shards
+
+    def _shard(self, name: str) -> SQLiteStorage:
+        return self.shards[self.shard_index(name)]
+
+    def _gruppieren(self, elemente, name=lambda e: e) -> dict:
+        """dict: Shard-Index -> Liste der Elemente, die zu diesem Shard gehören."""
+        gruppen = {}
+        for element in elemente:
+            gruppen.setdefault(self.shard_index(name(element)), []).append(element)
+        return gruppen
+
+    def _parallel(self, auftraege: dict) -> list:
+        """
+        Führt Aufrufe je Shard parallel aus.
+
+        Args:
+            auftraege (dict): Shard-Index -> Funktion, die den Shard erhält.
+
+        Returns:
+            list: Die Ergebnisse in Reihenfolge der Shard-Indizes.
+        """
+        if len(auftraege) == 1:
+            index, funktion = next(iter(auftraege.items()))
+            return [funktion(self.shards[index])]
+        zukuenfte = [self._pool.submit(funktion, self.shards[i]) for i, funktion in sorted(auftraege.items())]
+        return [z.result() for z in zukuenfte]
+
+    def _alle(self, funktion) -> list:
+        """list: Ergebnisse von `funktion(shard)` für alle Shards (parallel)."""
+        return self._parallel({i: funktion for i in range(self.anzahl_shards)})
+
+    def schliessen(self):
+        """Beendet den Thread-Pool und schließt die Verbindungen aller Shards."""
+        self._pool.shutdown(wait=True)
+        for shard in self.shards:
+            shard.schliessen()
+
+    @storage_zeitmessung
+    def laden(self) -> list:
+        """Lädt alle Shards parallel und führt die Ergebnisse zusammen."""
+        return list(chain.from_iterable(self._alle(lambda shard: shard.laden())))
+
+    @storage_zeitmessung
+    def speichern(self, konten_liste):
+        """Speichert die Konten gruppiert nach Shard (parallel)."""
+        gruppen = self._gruppieren(konten_liste, lambda k: k.inhaber)
+        self._parallel({i: (lambda shard, teil=teil: shard.speichern(teil)) for i, teil in gruppen.items()})
+
+    @storage_zeitmessung
+    def name_existiert(self, name):
+        return self._shard(name).name_existiert(name)
+
+    @storage_zeitmessung
+    def konto_holen(self, name):
+        return self._shard(name).konto_holen(name)
+
+    def generiere_vorschlaege(self, name):
+        """
+        Erzeugt 3 Namensvorschläge mit Zufallszahlen, die in keinem Shard existieren.
+
+        Args:
+            name (str): Der Name des gesuchten Kontoinhabers.
+        """
+        vorschlaege = []
+        while len(vorschlaege) < 3:
+            neuer_name = f"{name}{random.randint(10, 99)}"
+            if neuer_name not in vorschlaege and not self.name_existiert(neuer_name):
+                vorschlaege.append(neuer_name)
+        return vorschlaege
+
+    @storage_zeitmessung
+    def konto_hinzufuegen(self, konto):
+        """
+        Legt das Konto im zuständigen Shard an.
+
+        Raises:
+            ValueError: Wenn der Name bereits existiert (mit Namensvorschlägen).
+        """
+        if self.name_existiert(konto.inhaber):
+            vorschlaege = self.generiere_vorschlaege(konto.inhaber)
+            raise ValueError(f"Name existiert bereits. Vorschläge: {', '.join(vorschlaege)}")
+        self._shard(konto.inhaber).konto_hinzufuegen(konto)
+
+    @storage_zeitmessung
+    def update_kontostand(self, konto):
+        self._shard(konto.inhaber).update_kontostand(konto)
+
+    @storage_zeitmessung
+    def ist_leer(self) -> bool:
+        return all(self._alle(lambda shard: shard.ist_leer()))
+
+    @storage_zeitmessung
+    def konten_schreiben(self, konten):
+        """Upsert gruppiert nach Shard: eine Transaktion je Shard, Shards parallel."""
+        gruppen = self._gruppieren(konten, lambda k: k.inhaber)
+        self._parallel({i: (lambda shard, teil=teil: shard.konten_schreiben(teil)) for i, teil in gruppen.items()})
+
+    @storage_zeitmessung
+    def konten_holen(self, namen) -> dict:
+        gruppen = self._gruppieren(namen)
+        ergebnis = {}
+        for teil in self._parallel({i: (lambda shard, teil=teil: shard.konten_holen(teil)) for i, teil in gruppen.items()}):
+            ergebnis.update(teil)
+        return ergebnis
+
+    @storage_zeitmessung
+    def namen_existieren(self, namen) -> set:
+        gruppen = self._gruppieren(namen)
+        return set().union(*self._parallel(
+            {i: (lambda shard, teil=teil: shard.namen_existieren(teil)) for i, teil in gruppen.items()}
+        ))
+
+    @storage_zeitmessung
+    def mehrere_konten_hinzufuegen(self, konten) -> list:
+        """
+        Legt die Konten je Shard in einer Transaktion an (Shards parallel). Gleiche Namen
+        landen immer im selben Shard, die Duplikat-Prüfung bleibt daher vollständig.
+        """
+        gruppen = self._gruppieren(konten, lambda k: k.inhaber)
+        abgelehnt = self._parallel(
+            {i: (lambda shard, teil=teil: shard.mehrere_konten_hinzufuegen(teil)) for i, teil in gruppen.items()}
+        )
+        return list(chain.from_iterable(abgelehnt))
+
+    def konten_iterieren(self, batch_groesse: int = 1000):
+        """Liest die Shards nacheinander blockweise (Reihenfolge: nach Shard, dann Anlage)."""
+        for shard in self.shards:
+            yield from shard.konten_iterieren(batch_groesse)
+
+    def konten_block(self, marke=None, anzahl: int = 1000) -> tuple:
+        """
+        Keyset-Paginierung wie `SQLiteStorage.konten_block`, Shard für Shard.
+
+        Returns:
+            tuple: (Liste der Zeilen-Dictionaries, Marke [Shard-Index, Marke im Shard])
+        """
+        index, shard_marke = marke if marke is not None else (0, None)
+        zeilen = []
+        while index < len(self.shards) and len(zeilen) < anzahl:
+            rest = anzahl - len(zeilen)
+            block, shard_marke = self.shards[index].konten_block(shard_marke, rest)
+            zeilen.extend(block)
+            if len(block) < rest:
+                index, shard_marke = index + 1, None
+        return zeilen, [index, shard_marke]
+
+    @contextmanager
+    def transaktion(self, *namen):
+        """
+        Transaktion über ein oder mehrere Konten (siehe Klassenbeschreibung zur Atomarität
+        über mehrere Shards).
+
+        Raises:
+            ValueError: Wenn eines der Konten nicht existiert (Rollback in allen Shards).
+            TimeoutError: Wenn eine Konto-Sperre nicht rechtzeitig frei wird.
+
+        Yields:
+            dict: Übergebener Name -> Konto-Objekt.
+        """
+        gruppen = self._gruppieren(namen)
+        with konto_sperren.sperre_mehrere(namen), ExitStack() as stapel:
+            konten = {}
+            # Feste Shard-Reihenfolge: keine Verklemmung zwischen gegenläufigen Überweisungen
+            for index in sorted(gruppen):
+                konten.update(stapel.enter_context(self.shards[index]._transaktion_ohne_sperren(gruppen[index])))
+            yield konten
+
+
+def umverteilen(quelle_verzeichnis: str, ziel_verzeichnis: str, anzahl_shards: int,
+                quelle_shards: int = None, chunk_groesse: int = 1000) -> dict:
+    """
+    Verteilt einen Shard-Bestand auf eine neue Shard-Anzahl in einem neuen Verzeichnis
+    (blockweise mit Prüfsummen über `migration.Migration`, wiederholbar).
+
+    Args:
+        quelle_verzeichnis (str): Bestehendes Shard-Verzeichnis.
+        ziel_verzeichnis (str): Neues Verzeichnis.
+        anzahl_shards (int): Neue Shard-Anzahl.
+        quelle_shards (int): Shard-Anzahl der Quelle (Standard: aus `shards.json`).
+        chunk_groesse (int): Konten je Block.
+
+    Returns:
+        dict: Ergebnis der Migration.
+    """
+    from migration import Migration
+
+    if quelle_shards is None:
+        with open(os.path.join(quelle_verzeichnis, META_DATEI), "r", encoding="utf-8") as f:
+            quelle_shards = json.load(f)["anzahl_shards"]
+    quelle = ShardedStorage(quelle_verzeichnis, quelle_shards)
+    ziel = ShardedStorage(ziel_verzeichnis, anzahl_shards)
+    try:
+        logger.info("Umverteilen: %s (%s Shards) -> %s (%s Shards)",
+                    quelle_verzeichnis, quelle_shards, ziel_verzeichnis, anzahl_shards)
+        return Migration(quelle, ziel, chunk_groesse).ausfuehren()
+    finally:
+        quelle.schliessen()
+        ziel.schliessen()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Shard-Bestand auf eine neue Shard-Anzahl umverteilen")
+    parser.add_argument("--von", required=True, help="Bestehendes Shard-Verzeichnis")
+    parser.add_argument("--nach", required=True, help="Neues Shard-Verzeichnis")
+    parser.add_argument("--shards", type=int, required=True, help="Neue Shard-Anzahl")
+    parser.add_argument("--chunk", type=int, default=1000, help="Konten je Block")
+    args = parser.parse_args(argv)
+
+    ergebnis = umverteilen(args.von, args.nach, args.shards, chunk_groesse=args.chunk)
+    print(json.dumps(ergebnis, indent=2, ensure_ascii=False))
+    return 0 if ergebnis["zustand"] == "fertig" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Bündelung gleichzeitiger identischer Leseanfragen ("Single Flight").
+
+Kommen mehrere identische Anfragen (gleiche Route, gleiche Parameter) an, während
+deren Berechnung noch läuft, warten die späteren auf dieselbe Berechnung und
+erhalten dieselben serialisierten Bytes, statt den Bestand erneut zu laden.
+Es wird nichts über das Ende der Berechnung hinaus zwischengespeichert.
+
+Der Schlüssel enthält eine Schreib-Generation (z. B. die Anzahl der veröffentlichten
+Kontoereignisse): Eine Anfrage nach einem abgeschlossenen Schreibvorgang schließt sich
+keiner Berechnung an, die vor diesem Schreibvorgang begonnen hat.
+"""
+import asyncio
+from metrics import registry
+
+SINGLE_FLIGHT = registry.counter(
+    "bank_single_flight_total",
+    "Leseanfragen nach Ergebnis der Bündelung (fuehrend = eigene Berechnung, geteilt = angeschlossen).",
+    ("route", "ergebnis"),
+)
+
+
+class SingleFlight:
+    """
+    Teilt laufende Berechnungen zwischen identischen Anfragen (nur im Event-Loop benutzen).
+
+    Attributes:
+        routen (set): Routen, für die gebündelt wird (andere werden direkt berechnet).
+        generation (callable): Liefert die aktuelle Schreib-Generation.
+    """
+
+    def __init__(self, routen, generation=lambda: 0):
+        self.routen = set(routen)
+        self.generation = generation
+        self._laufend = {}
+
+    def laufend(self) -> int:
+        """int: Anzahl der aktuell geteilten Berechnungen."""
+        return len(self._laufend)
+
+    async def ausfuehren(self, route: str, schluessel, funktion):
+        """
+        Führt `funktion` aus oder schließt sich einer laufenden identischen Berechnung an.
+
+        Die Berechnung läuft als eigener Task: Bricht die erste Anfrage ab (z. B. weil der
+        Client die Verbindung trennt), läuft sie für die übrigen Anfragen weiter.
+
+        Args:
+            route (str): Name der Route (Schalter und Metrik-Label).
+            schluessel (hashable): Die Parameter der Anfrage.
+            funktion (callable): Liefert ein Awaitable mit dem Ergebnis (z. B. den Bytes).
+
+        Returns:
+            object: Das (geteilte) Ergebnis; Exceptions werden an alle Wartenden weitergegeben.
+        """
+        if route not in self.routen:
+            return await funktion()
+        key = (route, schluessel, self.generation())
+        task = self._laufend.get(key)
+        if task is None:
+            SINGLE_FLIGHT.inc(route=route, ergebnis="fuehrend")
+            task = asyncio.ensure_future(funktion())
+            self._laufend[key] = task
+            task.add_done_callback(lambda t: self._beendet(key, t))
+        else:
+            SINGLE_FLIGHT.inc(route=route, ergebnis="geteilt")
+        return await asyncio.shield(task)
+
+    def _beendet(self, key, task):
+        if self._laufend.get(key) is task:
+            del self._laufend[key]
+        if not task.cancelled():
+            # Als abgerufen markieren, falls alle Wartenden abgebrochen haben
+            task.exception()
@@ -8,7 +8,11 @@ class Sparkonto(Konto):
         inhaber (str): Name des Kontoinhabers (vererbt).
         kontostand (float): Aktueller Saldo (darf nicht negativ sein).
         zins (float): Zinssatz in Prozent (positiver Wert).
+        letzte_verzinsung (float): Beginn der Zinsperiode, bis zu der zuletzt verzinst wurde
+            (Unix-Zeit, nur im Lazy-Zinsmodus gesetzt, sonst None).
     """
+    letzte_verzinsung = None
+
     def __init__(self, inhaber, kontostand, zins):
         super().__init__(inhaber, kontostand)
         self.zins = zins
@@ -50,6 +54,31 @@ class Sparkonto(Konto):
         return f"Zinsberechnung mit {self.zins}% erfolgt. Stand: {self.kontostand:.2f} EUR"
     
 
+    def zinsen_nachholen(self, periode_s: float, jetzt: float) -> int:
+        """
+        Verbucht alle seit `letzte_verzinsung` abgelaufenen Zinsperioden auf einmal
+        (Zinseszins über die Potenz statt eine Buchung je Periode).
+
+        Ohne Zeitstempel beginnt die Verzinsung mit der aktuellen Periode.
+
+        Args:
+            periode_s (float): Länge einer Zinsperiode in Sekunden.
+            jetzt (float): Aktuelle Unix-Zeit.
+
+        Returns:
+            int: Anzahl der nachgeholten Perioden.
+        """
+        aktuell = int(jetzt // periode_s)
+        if self.letzte_verzinsung is None:
+            self.letzte_verzinsung = aktuell * periode_s
+            return 0
+        perioden = aktuell - int(self.letzte_verzinsung // periode_s)
+        if perioden <= 0:
+            return 0
+        self.kontostand *= (1 + self.zins / 100) ** perioden
+        self.letzte_verzinsung = aktuell * periode_s
+        return perioden
+
     def zinsen_berechnen_mit(self, neuer_zins):
         """
         Simuliert die Zinsberechnung temporär mit einem abweichenden Zinssatz, 
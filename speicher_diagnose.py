@@ -0,0 +1,173 @@
+import itertools
+import threading
+import time
+import tracemalloc
+
+
+class SpeicherDiagnose:
+    """
+    Verwaltet `tracemalloc`-Messungen und Snapshots zur Analyse des Speicherverbrauchs.
+
+    Snapshots werden mit fortlaufender ID im Speicher gehalten (begrenzt auf
+    `max_snapshots`, älteste zuerst verworfen).
+
+    Attributes:
+        max_snapshots (int): Maximale Anzahl aufbewahrter Snapshots.
+    """
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._snapshots = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def aktiv(self) -> bool:
+        """bool: True, wenn tracemalloc gerade Allokationen aufzeichnet."""
+        return tracemalloc.is_tracing()
+
+    def starten(self, frames: int = 1) -> dict:
+        """
+        Startet die Aufzeichnung der Allokationen.
+
+        Args:
+            frames (int): Anzahl der gespeicherten Stack-Frames je Allokation (mehr = teurer).
+
+        Returns:
+            dict: Aktueller Status.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return self.status()
+
+    def stoppen(self) -> dict:
+        """
+        Beendet die Aufzeichnung. Bereits erstellte Snapshots bleiben erhalten.
+
+        Returns:
+            dict: Aktueller Status.
+        """
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return self.status()
+
+    def status(self) -> dict:
+        """
+        Liefert den Status der Aufzeichnung.
+
+        Returns:
+            dict: Aktiv-Flag, aktueller und maximaler Verbrauch (Bytes) sowie die Snapshot-IDs.
+        """
+        aktuell, spitze = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        with self._lock:
+            snapshot_ids = list(self._snapshots)
+        return {
+            "aktiv": tracemalloc.is_tracing(),
+            "aktuell_bytes": aktuell,
+            "spitze_bytes": spitze,
+            "snapshots": snapshot_ids,
+        }
+
+    def snapshot_erstellen(self) -> int:
+        """
+        Erstellt einen Snapshot der aktuellen Allokationen.
+
+        Raises:
+            RuntimeError: Wenn tracemalloc nicht aktiv ist.
+
+        Returns:
+            int: Die ID des Snapshots.
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc ist nicht aktiv. Bitte zuerst die Aufzeichnung starten.")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        with self._lock:
+            snapshot_id = next(self._ids)
+            self._snapshots[snapshot_id] = (time.time(), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.pop(next(iter(self._snapshots)))
+        return snapshot_id
+
+    def _snapshot(self, snapshot_id: int):
+        with self._lock:
+            eintrag = self._snapshots.get(snapshot_id)
+        if eintrag is None:
+            raise ValueError(f"Snapshot {snapshot_id} wurde nicht gefunden.")
+        return eintrag[1]
+
+    def top_allokationen(self, snapshot_id: int, anzahl: int = 20, gruppierung: str = "lineno") -> list:
+        """
+        Liefert die größten Allokationsstellen eines Snapshots.
+
+        Args:
+            snapshot_id (int): ID des Snapshots.
+            anzahl (int): Anzahl der Einträge.
+            gruppierung (str): 'lineno', 'filename' oder 'traceback'.
+
+        Raises:
+            ValueError: Wenn der Snapshot nicht existiert.
+
+        Returns:
+            list: Einträge mit Ort, Größe (Bytes) und Anzahl der Blöcke.
+        """
+        statistiken = self._snapshot(snapshot_id).statistics(gruppierung)[:anzahl]
+        return [
+            {"ort": str(s.traceback[0]), "groesse_bytes": s.size, "bloecke": s.count}
+            for s in statistiken
+        ]
+
+    def differenz(self, alt_id: int, neu_id: int, anzahl: int = 20, gruppierung: str = "lineno") -> list:
+        """
+        Vergleicht zwei Snapshots und liefert die Stellen mit dem größten Zuwachs.
+
+        Args:
+            alt_id (int): ID des älteren Snapshots.
+            neu_id (int): ID des neueren Snapshots.
+            anzahl (int): Anzahl der Einträge.
+            gruppierung (str): 'lineno', 'filename' oder 'traceback'.
+
+        Raises:
+            ValueError: Wenn einer der Snapshots nicht existiert.
+
+        Returns:
+            list: Einträge mit Ort, Größen-/Blockdifferenz und Gesamtgröße im neuen Snapshot.
+        """
+        vergleich = self._snapshot(neu_id).compare_to(self._snapshot(alt_id), gruppierung)[:anzahl]
+        return [
+            {
+                "ort": str(s.traceback[0]),
+                "differenz_bytes": s.size_diff,
+                "differenz_bloecke": s.count_diff,
+                "groesse_bytes": s.size,
+            }
+            for s in vergleich
+        ]
+
+    def bericht(self, anzahl: int = 20) -> str:
+        """
+        Erstellt einen Textbericht (aktueller Verbrauch und Top-Allokationen),
+        z. B. für die Ausgabe beim Programmende.
+
+        Returns:
+            str: Der formatierte Bericht.
+        """
+        if not tracemalloc.is_tracing():
+            return "tracemalloc ist nicht aktiv."
+        snapshot_id = self.snapshot_erstellen()
+        status = self.status()
+        zeilen = [
+            f"Speicher aktuell: {status['aktuell_bytes'] / 1024:.1f} KiB | "
+            f"Spitze: {status['spitze_bytes'] / 1024:.1f} KiB",
+            f"Top {anzahl} Allokationsstellen:",
+        ]
+        for eintrag in self.top_allokationen(snapshot_id, anzahl):
+            zeilen.append(f"  {eintrag['groesse_bytes'] / 1024:10.1f} KiB | {eintrag['bloecke']:8d} Blöcke | {eintrag['ort']}")
+        return "\n".join(zeilen)
+
+
+# Zentrale Instanz für API und CLI
+speicher_diagnose = SpeicherDiagnose()
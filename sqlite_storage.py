@@ -1,22 +1,134 @@
-import sqlite3
+import queue
 import random
-from storage_interface import StorageInterface
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from storage_interface import StorageInterface, konto_aus_zeile
+from konto_locks import konto_sperren
 from logger_config import logger
-from sparkonto import Sparkonto
-from girokonto import Girokonto
+from metrics import storage_zeitmessung, storage_abschnitt
+
+# Spalten in der Reihenfolge von `_als_zeile`
+SPALTEN = "inhaber, kontostand, typ, extra_wert, letzte_verzinsung"
+
+
+def _als_zeile(werte) -> dict:
+    """dict: Zeilen-Darstellung (siehe `konto_zu_zeile`) eines Ergebnisses von `SELECT SPALTEN`."""
+    inhaber, kontostand, typ, extra, verzinsung = werte
+    return {"inhaber": inhaber, "kontostand": kontostand, "typ": typ, "extra": extra,
+            "letzte_verzinsung": verzinsung}
 
 
 class SQLiteStorage(StorageInterface):
-    def __init__(self, db_path="bank_data.db"):
+    """
+    Speicher-Provider für SQLite im WAL-Modus mit getrennten Lese- und Schreibwegen.
+
+    Lesende Methoden leihen sich eine schreibgeschützte Verbindung (`mode=ro`,
+    `query_only`) aus einem Pool; jede Ausleihe ist eine Lese-Transaktion und sieht
+    damit einen konsistenten Snapshot, ohne auf Schreiber zu warten. Alle
+    Schreibvorgänge laufen seriell über eine einzige Schreib-Verbindung je Prozess.
+
+    Attributes:
+        db_path (str): Pfad der Datenbank-Datei.
+        lese_verbindungen (int): Maximale Anzahl gepoolter Lese-Verbindungen.
+    """
+
+    def __init__(self, db_path="bank_data.db", lese_verbindungen: int = 8):
         self.db_path = db_path
+        self.lese_verbindungen = lese_verbindungen
+        self._lesepool = queue.LifoQueue(maxsize=lese_verbindungen)
+        self._schreiber = None
+        self._schreib_lock = threading.RLock()
         self._initialisiere_tabelle()
 
+    def _verbinden(self, nur_lesen: bool = False):
+        """Öffnet eine Verbindung (Autocommit, Transaktionen werden explizit gesteuert)."""
+        if nur_lesen:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _lesen(self):
+        """
+        Leiht eine Lese-Verbindung aus dem Pool. Alle Abfragen innerhalb des Blocks
+        laufen in einer Lese-Transaktion und sehen denselben Snapshot.
+
+        Yields:
+            sqlite3.Connection: Schreibgeschützte Verbindung.
+        """
+        try:
+            conn = self._lesepool.get_nowait()
+        except queue.Empty:
+            conn = self._verbinden(nur_lesen=True)
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            try:
+                if conn.in_transaction:
+                    conn.execute("COMMIT")
+                self._lesepool.put_nowait(conn)
+            except (sqlite3.Error, queue.Full):
+                conn.close()
+
+    @contextmanager
+    def _schreibverbindung(self):
+        """
+        Exklusiver Zugriff auf die Schreib-Verbindung (ohne Transaktionssteuerung).
+
+        Yields:
+            sqlite3.Connection: Die Schreib-Verbindung.
+        """
+        with self._schreib_lock:
+            if self._schreiber is None:
+                self._schreiber = self._verbinden()
+            yield self._schreiber
+
+    @contextmanager
+    def _schreiben(self):
+        """
+        Schreib-Transaktion mit `BEGIN IMMEDIATE` (Commit am Ende des Blocks, Rollback bei Fehlern).
+
+        Yields:
+            sqlite3.Connection: Die Schreib-Verbindung.
+        """
+        with self._schreibverbindung() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def schliessen(self):
+        """Schließt die Schreib-Verbindung und alle gepoolten Lese-Verbindungen."""
+        with self._schreib_lock:
+            if self._schreiber is not None:
+                self._schreiber.close()
+                self._schreiber = None
+        while True:
+            try:
+                self._lesepool.get_nowait().close()
+            except queue.Empty:
+                break
+
     def _initialisiere_tabelle(self):
         """
-        Erstellt die Tabelle, falls sie noch nicht existiert.
+        Aktiviert den WAL-Modus und erstellt die Tabelle, falls sie noch nicht existiert.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._schreibverbindung() as conn:
+                # WAL ist eine Eigenschaft der Datei: Leser warten danach nicht mehr auf Schreiber
+                conn.execute("PRAGMA journal_mode = WAL")
+            with self._schreiben() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS konten (
@@ -24,14 +136,21 @@ class SQLiteStorage(StorageInterface):
                         inhaber TEXT NOT NULL UNIQUE,
                         kontostand REAL NOT NULL,
                         typ TEXT NOT NULL,
-                        extra_wert REAL
+                        extra_wert REAL,
+                        letzte_verzinsung REAL
                     )
                 """)
-                conn.commit()
+                # Bestände aus der Zeit vor dem Lazy-Zinsmodus nachrüsten
+                spalten = {z["name"] for z in cursor.execute("PRAGMA table_info(konten)")}
+                if "letzte_verzinsung" not in spalten:
+                    cursor.execute("ALTER TABLE konten ADD COLUMN letzte_verzinsung REAL")
+                # Alle Namenssuchen laufen über LOWER(inhaber): Ausdrucks-Index statt Full Scan
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_konten_inhaber_lower ON konten (LOWER(inhaber))")
                 logger.info("SQLite-Datenbank erfolgreich initialisiert.")
         except Exception as e:
-            logger.error(f"Fehler bei der SQL-Initialisierung: {e}")
+            logger.error("Fehler bei der SQL-Initialisierung: %s", e)
 
+    @storage_zeitmessung
     def speichern(self, konten_liste):
         """
         Synchronisiert eine Liste von Konten mit der Datenbank.
@@ -49,52 +168,45 @@ class SQLiteStorage(StorageInterface):
             return
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._schreiben() as conn:
                 cursor = conn.cursor()
                 
                 for konto in konten_liste:
-                    # Bestimme den Extra-Wert (Dispo oder Zins)
-                    extra = getattr(konto, 'dispo', getattr(konto, 'zins', 0))
-                    
                     # 'INSERT OR REPLACE' nutzt den UNIQUE-Constraint auf 'inhaber'
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO konten (inhaber, kontostand, typ, extra_wert)
-                        VALUES (?, ?, ?, ?)
-                    """, (konto.inhaber, konto.kontostand, type(konto).__name__, extra))
+                    cursor.execute(f"""
+                        INSERT OR REPLACE INTO konten ({SPALTEN})
+                        VALUES (?, ?, ?, ?, ?)
+                    """, self._werte(konto))
                 
-                conn.commit()
-                logger.info(f"SQLite: Synchronisation von {len(konten_liste)} Konten abgeschlossen.")
+                logger.info("SQLite: Synchronisation von %s Konten abgeschlossen.", len(konten_liste))
         except Exception as e:
-            logger.error(f"Fehler beim SQL-Synchronisieren: {e}")
+            logger.error("Fehler beim SQL-Synchronisieren: %s", e)
             raise IOError(f"Datenbank-Synchronisation fehlgeschlagen: {e}")
 
 
+    @storage_zeitmessung
     def laden(self) -> list:
         """
         Lädt alle Konten aus der SQLite-Datenbank und wandelt sie in Objekte um.
         """
         konten_liste = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row # Erlaubt Zugriff via Spaltennamen
+            with self._lesen() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT * from konten")
+                cursor.execute(f"SELECT {SPALTEN} from konten")
                 zeilen = cursor.fetchall()
 
                 for row in zeilen:
                     # Mapping: Datenbank-Spalten -> Python-Objekt-Attribute
-                    if row["typ"] == "Girokonto":
-                        k = Girokonto(row["inhaber"], row["kontostand"], row["extra_wert"])
-                    else:
-                        k = Sparkonto(row["inhaber"], row["kontostand"], row["extra_wert"])
-                    konten_liste.append(k)
+                    konten_liste.append(konto_aus_zeile(_als_zeile(row)))
 
-                logger.info(f"SQLite: {len(konten_liste)} Konten erfolgreich geladen.")
+                logger.info("SQLite: %s Konten erfolgreich geladen.", len(konten_liste))
                 return konten_liste
         except Exception as e:
-            logger.error(f"Fehler beim Laden aus SQLite: {e}")
+            logger.error("Fehler beim Laden aus SQLite: %s", e)
             return []
         
+    @storage_zeitmessung
     def konto_holen(self, name):
         """
         Sucht ein Konto in der SQLite-Datenbank und gibt ein Objekt zurück.
@@ -109,26 +221,23 @@ class SQLiteStorage(StorageInterface):
             object: Das gefundene Konto-Objekt.
         """
         try: 
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._lesen() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT * FROM konten WHERE LOWER(inhaber) = LOWER(?)", (name.strip().lower(),))
+                cursor.execute(f"SELECT {SPALTEN} FROM konten WHERE LOWER(inhaber) = LOWER(?)", (name.strip().lower(),))
                 row = cursor.fetchone()
 
                 if row is None:
                     raise ValueError(f"Konto für '{name}' wurde nicht gefunden.")
                 
                 # Mapping SQL -> Objekt
-                if row["typ"] == "Girokonto":
-                    return Girokonto(row["inhaber"], row["kontostand"], row["extra_wert"])
-                else:
-                    return Sparkonto(row["inhaber"], row["kontostand"], row["extra_wert"])
+                return konto_aus_zeile(_als_zeile(row))
         except ValueError:
             raise
         except Exception as e:
-            logger.error(f"SQLite Fehler beim Holen von {name}: {e}")
+            logger.error("SQLite Fehler beim Holen von %s: %s", name, e)
             raise RuntimeError("Interner Datenbankfehler.")
     
+    @storage_zeitmessung
     def konto_hinzufuegen(self, konto):
         """
         Speichert ein neues Konto permanent in der Datenbank.
@@ -142,25 +251,34 @@ class SQLiteStorage(StorageInterface):
             raise ValueError(f"Name existiert bereits. Vorschläge: {', '.join(vorschlaege)}")
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._schreiben() as conn:
                 cursor = conn.cursor()
-                extra = getattr(konto, 'dispo', getattr(konto, 'zins', 0))
-                # WICHTIG: Das Tupel am Ende muss GENAU 4 Werte enthalten
-                werte = (konto.inhaber, konto.kontostand, type(konto).__name__, extra)
-                cursor.execute("""
-                    INSERT INTO konten (inhaber, kontostand, typ, extra_wert)
-                    VALUES (?, ?, ?, ?)
-                """, werte)
-                conn.commit()
-                logger.info(f"SQLite: Konto für {konto.inhaber} erfolgreich angelegt.")
+                # WICHTIG: Das Tupel muss GENAU so viele Werte wie SPALTEN enthalten
+                cursor.execute(f"""
+                    INSERT INTO konten ({SPALTEN})
+                    VALUES (?, ?, ?, ?, ?)
+                """, self._werte(konto))
+            logger.info("SQLite: Konto für %s erfolgreich angelegt.", konto.inhaber)
         except sqlite3.IntegrityError:
             # Falls der Name-Check oben (Race Condition) versagt, greift das UNIQUE-Constraint der DB
-            logger.warning(f"SQL IntegrityError: Name {konto.inhaber} bereits vergeben.")
+            logger.warning("SQL IntegrityError: Name %s bereits vergeben.", konto.inhaber)
             raise ValueError(f"Datenbank-Fehler: Name '{konto.inhaber}' ist bereits vergeben.")
         except Exception as e:
-            logger.error(f"Fehler beim SQL-Insert: {e}")
+            logger.error("Fehler beim SQL-Insert: %s", e)
             raise RuntimeError("Konto konnte nicht gespeichert werden.")
         
+    @storage_zeitmessung
+    def ist_leer(self):
+        """
+        Existenz-Check ohne Laden der Konten (bricht nach der ersten Zeile ab).
+
+        Returns:
+            bool: True, wenn die Tabelle keine Konten enthält.
+        """
+        with self._lesen() as conn:
+            return conn.execute("SELECT 1 FROM konten LIMIT 1").fetchone() is None
+
+    @storage_zeitmessung
     def name_existiert(self, name):
         """
         Performanter Check auf Datenbank-Ebene.
@@ -169,12 +287,12 @@ class SQLiteStorage(StorageInterface):
             name (str): Der Name des gesuchten Kontoinhabers.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lesen() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT 1 FROM konten WHERE LOWER(inhaber) = LOWER(?) LIMIT 1", (name.strip(),))
                 return cursor.fetchone() is not None
         except Exception as e:
-            logger.error(f"Fehler beim Namen-Check: {e}")
+            logger.error("Fehler beim Namen-Check: %s", e)
             return False
         
     def generiere_vorschlaege (self, name):
@@ -186,7 +304,7 @@ class SQLiteStorage(StorageInterface):
         """
         vorschlaege = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lesen() as conn:
                 cursor = conn.cursor()
                 while len(vorschlaege) < 3:
                     nr = random.randint(10, 99)
@@ -199,9 +317,10 @@ class SQLiteStorage(StorageInterface):
                             vorschlaege.append(neuer_name)
                 return vorschlaege
         except Exception as e:
-            logger.error(f"Fehler dei der Generierung vovn VOrschlägen (SQL): {e}")
+            logger.error("Fehler dei der Generierung vovn VOrschlägen (SQL): %s", e)
             return [f"{name}11", f"{name}22", f"{name}33"] # Fallback
 
+    @storage_zeitmessung
     def update_kontostand(self, konto):
         """
         Aktualisiert nur den Kontostand eines existierenden Kontos in der Datenbank.
@@ -210,14 +329,237 @@ class SQLiteStorage(StorageInterface):
             konto (object): Das Konto-Objekt (Giro- oder Sparkonto) die upgedated werden soll.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._schreiben() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     UPDATE konten
-                    SET kontostand = ?
+                    SET kontostand = ?, letzte_verzinsung = ?
                     WHERE LOWER(inhaber) = LOWER(?)
-                """, (konto.kontostand, konto.inhaber))
-                conn.commit()
-                logger.info(f"SQLite Update: Kontostand für {konto.inhaber} aktualisiert.")
+                """, (konto.kontostand, getattr(konto, 'letzte_verzinsung', None), konto.inhaber))
+            logger.info("SQLite Update: Kontostand für %s aktualisiert.", konto.inhaber)
+        except Exception as e:
+            logger.error("Fehler beim SQL-Update für %s: %s", konto.inhaber, e)
+
+    @storage_zeitmessung
+    def konten_schreiben(self, konten):
+        """
+        Upsert mehrerer Konten in einer einzigen Transaktion.
+
+        Args:
+            konten (list): Die zu schreibenden Konto-Objekte.
+
+        Raises:
+            IOError: Wenn die Transaktion fehlschlägt (es wird nichts geschrieben).
+        """
+        werte = [self._werte(k) for k in konten]
+        try:
+            with self._schreiben() as conn:
+                conn.executemany(f"""
+                    INSERT INTO konten ({SPALTEN})
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(inhaber) DO UPDATE SET
+                        kontostand = excluded.kontostand,
+                        typ = excluded.typ,
+                        extra_wert = excluded.extra_wert,
+                        letzte_verzinsung = excluded.letzte_verzinsung
+                """, werte)
+            logger.info("SQLite: %s Konten gesammelt geschrieben.", len(werte))
+        except Exception as e:
+            logger.error("Fehler beim gesammelten SQL-Schreiben: %s", e)
+            raise IOError(f"Gesammeltes Schreiben fehlgeschlagen: {e}")
+
+    @staticmethod
+    def _werte(konto) -> tuple:
+        """tuple: Parameter eines Kontos in der Reihenfolge von SPALTEN."""
+        return (konto.inhaber, konto.kontostand, type(konto).__name__,
+                getattr(konto, 'dispo', getattr(konto, 'zins', 0)),
+                getattr(konto, 'letzte_verzinsung', None))
+
+    # Unter dem Standardlimit von SQLite für gebundene Parameter (999)
+    MAX_PARAMETER = 900
+
+    def _vergebene_namen(self, conn, namen) -> set:
+        """Eine IN-Abfrage je (höchstens MAX_PARAMETER Namen großem) Block."""
+        namen = list({n.strip().lower() for n in namen})
+        vergeben = set()
+        for start in range(0, len(namen), self.MAX_PARAMETER):
+            teil = namen[start:start + self.MAX_PARAMETER]
+            platzhalter = ",".join("?" * len(teil))
+            zeilen = conn.execute(
+                f"SELECT LOWER(inhaber) FROM konten WHERE LOWER(inhaber) IN ({platzhalter})", teil
+            ).fetchall()
+            vergeben.update(z[0] for z in zeilen)
+        return vergeben
+
+    @storage_zeitmessung
+    def konten_holen(self, namen) -> dict:
+        """
+        Holt mehrere Konten mit einer `IN`-Abfrage je Block von höchstens MAX_PARAMETER Namen.
+
+        Args:
+            namen (iterable): Die gesuchten Inhabernamen.
+
+        Returns:
+            dict: Normalisierter Name -> Konto-Objekt (nicht gefundene Namen fehlen).
+        """
+        namen = list({n.strip().lower() for n in namen})
+        gefunden = {}
+        with self._lesen() as conn:
+            for start in range(0, len(namen), self.MAX_PARAMETER):
+                teil = namen[start:start + self.MAX_PARAMETER]
+                platzhalter = ",".join("?" * len(teil))
+                zeilen = conn.execute(
+                    f"SELECT {SPALTEN} FROM konten WHERE LOWER(inhaber) IN ({platzhalter})",
+                    teil,
+                ).fetchall()
+                for row in zeilen:
+                    gefunden[row["inhaber"].lower()] = konto_aus_zeile(_als_zeile(row))
+        return gefunden
+
+    @storage_zeitmessung
+    def namen_existieren(self, namen) -> set:
+        """
+        Mengen-Prüfung per `IN`-Abfrage (nutzt den Index auf LOWER(inhaber)).
+
+        Args:
+            namen (iterable): Die zu prüfenden Inhabernamen.
+
+        Returns:
+            set: Die vergebenen Namen in normalisierter Form.
+        """
+        with self._lesen() as conn:
+            return self._vergebene_namen(conn, namen)
+
+    @storage_zeitmessung
+    def mehrere_konten_hinzufuegen(self, konten) -> list:
+        """
+        Legt mehrere Konten in einer Transaktion an. Duplikat-Prüfung und Insert laufen
+        unter `BEGIN IMMEDIATE`, daher auch zwischen Prozessen ohne Race Condition.
+
+        Args:
+            konten (list): Die neuen Konto-Objekte.
+
+        Raises:
+            IOError: Wenn die Transaktion fehlschlägt (es wird nichts geschrieben).
+
+        Returns:
+            list: Die abgelehnten Konto-Objekte (Name bereits vergeben).
+        """
+        try:
+            with self._schreiben() as conn:
+                neu, abgelehnt = self._duplikate_trennen(
+                    konten, self._vergebene_namen(conn, [k.inhaber for k in konten])
+                )
+                conn.executemany(
+                    f"INSERT INTO konten ({SPALTEN}) VALUES (?, ?, ?, ?, ?)", [self._werte(k) for k in neu]
+                )
         except Exception as e:
-            logger.error(f"Fehler beim SQL-Update für {konto.inhaber}: {e}")
\ No newline at end of file
+            logger.error("Fehler beim gesammelten SQL-Insert: %s", e)
+            raise IOError(f"Konten konnten nicht angelegt werden: {e}")
+        logger.info("SQLite: %s Konten angelegt, %s Duplikate abgelehnt.", len(neu), len(abgelehnt))
+        return abgelehnt
+
+    @storage_zeitmessung
+    def konten_seite(self, offset: int, limit: int):
+        """
+        Zählung und Seitenabfrage in einer Lese-Transaktion: Gesamtanzahl und Seite
+        stammen aus demselben Snapshot.
+
+        Returns:
+            tuple: (Gesamtanzahl, Liste der Konto-Objekte der Seite)
+        """
+        with self._lesen() as conn:
+            gesamt = conn.execute("SELECT COUNT(*) FROM konten").fetchone()[0]
+            zeilen = conn.execute(
+                f"SELECT {SPALTEN} FROM konten ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return gesamt, [konto_aus_zeile(_als_zeile(row)) for row in zeilen]
+
+    def konten_iterieren(self, batch_groesse: int = 1000):
+        """
+        Liest die Konten blockweise per `fetchmany` (konstanter Speicherbedarf).
+        Alle Blöcke stammen aus demselben Snapshot, auch wenn parallel geschrieben wird.
+
+        Args:
+            batch_groesse (int): Anzahl der Zeilen je Block.
+
+        Yields:
+            list: Ein Block von Zeilen-Dictionaries.
+        """
+        with self._lesen() as conn:
+            cursor = conn.execute(f"SELECT {SPALTEN} FROM konten ORDER BY id")
+            while True:
+                zeilen = cursor.fetchmany(batch_groesse)
+                if not zeilen:
+                    break
+                yield [_als_zeile(row) for row in zeilen]
+
+    def konten_block(self, marke=None, anzahl: int = 1000) -> tuple:
+        """
+        Keyset-Paginierung über den Primärschlüssel (`id > marke`): Jeder Block ist eine
+        eigene, kurze Lese-Transaktion, es bleibt kein Snapshot über den ganzen Lauf offen
+        (der WAL kann zwischen den Blöcken zurückgesetzt werden).
+
+        Returns:
+            tuple: (Liste der Zeilen-Dictionaries, letzte gelesene id als Marke)
+        """
+        with self._lesen() as conn:
+            zeilen = conn.execute(
+                f"SELECT id, {SPALTEN} FROM konten WHERE id > ? ORDER BY id LIMIT ?", (marke or 0, anzahl)
+            ).fetchall()
+        return [_als_zeile(row[1:]) for row in zeilen], (zeilen[-1][0] if zeilen else marke)
+
+    @contextmanager
+    def transaktion(self, *namen):
+        """
+        Atomare Transaktion über die Schreib-Verbindung mit `BEGIN IMMEDIATE`.
+
+        Der Schreib-Lock der Datenbank wird vor dem Lesen erworben, dadurch sind
+        Lesen -> Ändern -> Schreiben auch zwischen mehreren Prozessen serialisiert.
+        Die Konto-Sperren werden vorher erworben, damit Threads an der Sperre ihres
+        Kontos (mit Timeout) warten statt an der Schreib-Verbindung.
+
+        Args:
+            *namen (str): Die Inhabernamen.
+
+        Raises:
+            ValueError: Wenn eines der Konten nicht existiert (Rollback).
+            TimeoutError: Wenn eine Konto-Sperre nicht rechtzeitig frei wird.
+
+        Yields:
+            dict: Übergebener Name -> Konto-Objekt.
+        """
+        with konto_sperren.sperre_mehrere(namen):
+            with self._transaktion_ohne_sperren(namen) as konten:
+                yield konten
+
+    @contextmanager
+    def _transaktion_ohne_sperren(self, namen):
+        """
+        Wie `transaktion`, aber ohne die Konto-Sperren (der Aufrufer hält sie bereits,
+        z. B. `ShardedStorage` bei Transaktionen über mehrere Shards).
+        """
+        with self._schreibverbindung() as conn:
+            try:
+                def holen(name):
+                    row = conn.execute(
+                        f"SELECT {SPALTEN} FROM konten WHERE LOWER(inhaber) = LOWER(?)", (name.strip(),)
+                    ).fetchone()
+                    if row is None:
+                        raise ValueError(f"Konto für '{name}' wurde nicht gefunden.")
+                    return konto_aus_zeile(_als_zeile(row))
+
+                with storage_abschnitt(self, "transaktion_lesen"):
+                    conn.execute("BEGIN IMMEDIATE")
+                    objekte, konten = self._transaktions_konten(namen, holen)
+                yield konten
+                with storage_abschnitt(self, "transaktion_schreiben"):
+                    conn.executemany(
+                        "UPDATE konten SET kontostand = ?, letzte_verzinsung = ? WHERE inhaber = ?",
+                        [(k.kontostand, getattr(k, 'letzte_verzinsung', None), k.inhaber) for k in objekte.values()],
+                    )
+                    conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
@@ -1,3 +1,4 @@
+import atexit
 import os
 from json_storage import JSONStorage
 from sqlite_storage import SQLiteStorage
@@ -5,18 +6,42 @@ from logger_config import logger
 from dotenv import load_dotenv
 load_dotenv()
 
-def get_storage(overridden_type: str = None):
+def get_storage(overridden_type: str = None, write_behind: bool = True):
     """
     Factory-Methode: Entscheidet basierend auf Umgebungsvariablen, 
     welcher Storage-Provider instanziiert wird.
+
+    Args:
+        overridden_type (str): 'json' oder 'sql' statt `STORAGE_TYPE`.
+        write_behind (bool): False = nie mit Write-Behind-Cache umhüllen
+            (z. B. für Migrationen neben der laufenden API, die das Redo-Log nutzt).
     """
     storage_type = (overridden_type or os.getenv("STORAGE_TYPE", "json")).lower()
 
-    if storage_type == "sql":
+    if storage_type == "sharded":
+        from sharded_storage import ShardedStorage
+        verzeichnis = os.getenv("SHARD_DIR", "shards")
+        anzahl = int(os.getenv("SHARD_ANZAHL", "4"))
+        logger.info("Factory: Nutze ShardedStorage (%s, %s Shards)", verzeichnis, anzahl)
+        storage = ShardedStorage(verzeichnis, anzahl)
+    elif storage_type == "sql":
         db_path = os.getenv("DB_FILE", "bank_data.db")
-        logger.info(f"Factory: Nutze SQLite.Storage ({db_path})")
-        return SQLiteStorage(db_path)
+        logger.info("Factory: Nutze SQLite.Storage (%s)", db_path)
+        storage = SQLiteStorage(db_path)
     else:
         json_path = os.getenv("JSON_FILE", "konten.json")
-        logger.info(f"Factory: Nutze JSON-Storage ({json_path})")
-        return JSONStorage(json_path)
\ No newline at end of file
+        logger.info("Factory: Nutze JSON-Storage (%s)", json_path)
+        storage = JSONStorage(json_path)
+
+    if write_behind and os.getenv("WRITE_BEHIND", "0") == "1":
+        from write_behind_storage import WriteBehindStorage
+        redo_log = os.getenv("WRITE_BEHIND_LOG", "redo.log")
+        logger.info("Factory: Aktiviere Write-Behind-Cache (Redo-Log: %s)", redo_log)
+        storage = WriteBehindStorage(
+            storage,
+            redo_log_pfad=redo_log,
+            fsync_intervall=float(os.getenv("WRITE_BEHIND_FSYNC_MS", "50")) / 1000,
+            flush_intervall=float(os.getenv("WRITE_BEHIND_FLUSH_S", "1")),
+        )
+        atexit.register(storage.schliessen)
+    return storage
\ No newline at end of file
@@ -1,4 +1,53 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from konto_locks import konto_sperren, normalisiere_name
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+
+
+def konto_zu_zeile(konto) -> dict:
+    """
+    Wandelt ein Konto-Objekt in die neutrale Zeilen-Darstellung der Storage-Schicht um
+    (identisch mit dem Format der JSON-Datei).
+
+    Args:
+        konto (object): Girokonto- oder Sparkonto-Objekt.
+
+    Returns:
+        dict: {"inhaber", "kontostand", "typ", "extra", "letzte_verzinsung"}
+    """
+    return {
+        "inhaber": konto.inhaber,
+        "kontostand": konto.kontostand,
+        "typ": type(konto).__name__,
+        "extra": getattr(konto, 'dispo', getattr(konto, 'zins', None)),
+        "letzte_verzinsung": getattr(konto, 'letzte_verzinsung', None),
+    }
+
+
+def konto_aus_zeile(zeile: dict):
+    """
+    Erstellt aus einer Zeile (siehe `konto_zu_zeile`) das passende Konto-Objekt.
+
+    Args:
+        zeile (dict): Die Zeilen-Darstellung eines Kontos.
+
+    Raises:
+        ValueError: Wenn der Kontotyp unbekannt ist.
+
+    Returns:
+        object: Girokonto- oder Sparkonto-Objekt.
+    """
+    if zeile["typ"] == "Girokonto":
+        return Girokonto(zeile["inhaber"], zeile["kontostand"], zeile["extra"])
+    if zeile["typ"] == "Sparkonto":
+        konto = Sparkonto(zeile["inhaber"], zeile["kontostand"], zeile["extra"])
+        # Fehlt in Beständen, die vor dem Lazy-Zinsmodus geschrieben wurden
+        if zeile.get("letzte_verzinsung") is not None:
+            konto.letzte_verzinsung = zeile["letzte_verzinsung"]
+        return konto
+    raise ValueError(f"Unbekannter Kontotyp: {zeile['typ']}")
+
 
 class StorageInterface(ABC):
     """
@@ -70,4 +119,210 @@ class StorageInterface(ABC):
         Args:
             konto (object): Das Konto-Objekt mit dem neuen Stand.
         """
-        
\ No newline at end of file
+        pass
+
+    def ist_leer(self) -> bool:
+        """
+        Prüft, ob der Speicher noch keine Konten enthält.
+        Backends sollten dies ohne vollständiges Laden beantworten.
+
+        Returns:
+            bool: True, wenn keine Konten vorhanden sind.
+        """
+        return not self.laden()
+
+    def konten_schreiben(self, konten):
+        """
+        Schreibt mehrere Konten auf einmal (Upsert: vorhandene werden aktualisiert,
+        neue angelegt). Backends sollten dies in einem Schreibvorgang erledigen.
+
+        Die Standard-Implementierung nutzt die Einzel-Methoden.
+
+        Args:
+            konten (list): Die zu schreibenden Konto-Objekte.
+        """
+        for konto in konten:
+            if self.name_existiert(konto.inhaber):
+                self.update_kontostand(konto)
+            else:
+                self.konto_hinzufuegen(konto)
+
+    def konten_holen(self, namen) -> dict:
+        """
+        Holt mehrere Konten auf einmal. Nicht gefundene Namen fehlen im Ergebnis.
+        Backends sollten dies mit einer Abfrage je Aufruf beantworten.
+
+        Args:
+            namen (iterable): Die gesuchten Inhabernamen.
+
+        Returns:
+            dict: Normalisierter Name -> Konto-Objekt.
+        """
+        gefunden = {}
+        for name in namen:
+            try:
+                gefunden[normalisiere_name(name)] = self.konto_holen(name)
+            except ValueError:
+                pass
+        return gefunden
+
+    def namen_existieren(self, namen) -> set:
+        """
+        Mengen-Prüfung: Welche der Namen sind bereits vergeben?
+        Backends sollten dies mit einer Abfrage je Aufruf beantworten.
+
+        Args:
+            namen (iterable): Die zu prüfenden Inhabernamen.
+
+        Returns:
+            set: Die vergebenen Namen in normalisierter Form (trim + lowercase).
+        """
+        return {normalisiere_name(n) for n in namen if self.name_existiert(n)}
+
+    def mehrere_konten_hinzufuegen(self, konten) -> list:
+        """
+        Legt mehrere neue Konten in einem Schreibvorgang an. Bereits vergebene Namen
+        (auch doppelte innerhalb der Liste) werden nicht angelegt, sondern zurückgegeben.
+
+        Die Standard-Implementierung nutzt `namen_existieren` und `konten_schreiben`
+        unter den Konto-Sperren.
+
+        Args:
+            konten (list): Die neuen Konto-Objekte.
+
+        Returns:
+            list: Die abgelehnten Konto-Objekte (Name bereits vergeben).
+        """
+        with konto_sperren.sperre_mehrere([k.inhaber for k in konten]):
+            neu, abgelehnt = self._duplikate_trennen(konten, self.namen_existieren([k.inhaber for k in konten]))
+            if neu:
+                self.konten_schreiben(neu)
+        return abgelehnt
+
+    @staticmethod
+    def _duplikate_trennen(konten, vergeben: set):
+        """
+        Trennt neue Konten von Duplikaten (gegen `vergeben` und innerhalb der Liste).
+
+        Returns:
+            tuple: (neue Konten, abgelehnte Konten)
+        """
+        vergeben = set(vergeben)
+        neu, abgelehnt = [], []
+        for konto in konten:
+            schluessel = normalisiere_name(konto.inhaber)
+            if schluessel in vergeben:
+                abgelehnt.append(konto)
+            else:
+                vergeben.add(schluessel)
+                neu.append(konto)
+        return neu, abgelehnt
+
+    def konten_seite(self, offset: int, limit: int):
+        """
+        Liefert eine Seite der Kontenliste samt Gesamtanzahl.
+
+        Args:
+            offset (int): Anzahl der zu überspringenden Konten.
+            limit (int): Maximale Anzahl Konten der Seite.
+
+        Returns:
+            tuple: (Gesamtanzahl, Liste der Konto-Objekte der Seite)
+        """
+        konten = self.laden()
+        return len(konten), konten[offset:offset + limit]
+
+    def konten_iterieren(self, batch_groesse: int = 1000):
+        """
+        Liefert alle Konten blockweise als Zeilen (siehe `konto_zu_zeile`), z. B. für Exporte.
+        Backends sollten dabei nie den gesamten Bestand im Speicher halten.
+
+        Die Standard-Implementierung nutzt `laden()`.
+
+        Args:
+            batch_groesse (int): Anzahl der Zeilen je Block.
+
+        Yields:
+            list: Ein Block von Zeilen-Dictionaries.
+        """
+        konten = self.laden()
+        for start in range(0, len(konten), batch_groesse):
+            yield [konto_zu_zeile(k) for k in konten[start:start + batch_groesse]]
+
+    def konten_block(self, marke=None, anzahl: int = 1000) -> tuple:
+        """
+        Liest einen Block ab einer Fortsetzungsmarke. Anders als `konten_iterieren` wird
+        zwischen den Blöcken kein Lesezugriff offen gehalten (z. B. für lange, gedrosselte
+        Läufe); die Marke ist JSON-serialisierbar und kann in einem Checkpoint stehen.
+
+        Die Standard-Implementierung überspringt die bereits gelesenen Zeilen über
+        `konten_iterieren` (Marke = Anzahl gelesener Zeilen). Jeder Block liest den
+        Bestand also erneut von vorne, ein ganzer Lauf ist quadratisch in der Anzahl der
+        Konten. Sie ist nur für kleine Bestände gedacht (JSON, dessen Transaktionen die
+        Datei ohnehin vollständig neu schreiben); größere Backends überschreiben die Methode.
+
+        Args:
+            marke: Die Marke des vorherigen Blocks (None = von vorne).
+            anzahl (int): Maximale Anzahl Zeilen; ein kürzerer Block ist der letzte.
+
+        Returns:
+            tuple: (Liste der Zeilen-Dictionaries, Marke für den nächsten Block)
+        """
+        start = marke or 0
+        zeilen, gelesen = [], 0
+        bloecke = self.konten_iterieren(anzahl)
+        try:
+            for block in bloecke:
+                if gelesen + len(block) > start:
+                    zeilen.extend(block[max(start - gelesen, 0):])
+                    if len(zeilen) >= anzahl:
+                        break
+                gelesen += len(block)
+        finally:
+            bloecke.close()
+        zeilen = zeilen[:anzahl]
+        return zeilen, start + len(zeilen)
+
+    @contextmanager
+    def transaktion(self, *namen):
+        """
+        Context-Manager für atomare Lesen-Ändern-Schreiben-Vorgänge auf einem oder
+        mehreren Konten (z. B. Einzahlung oder Überweisung).
+
+        Die Konten werden gesperrt, geladen und nach fehlerfreiem Verlassen des Blocks
+        gemeinsam zurückgeschrieben. Bei einer Exception wird nichts geschrieben.
+
+        Die Standard-Implementierung sperrt über `konto_sperren` (nur innerhalb eines
+        Prozesses). Backends, die von mehreren Prozessen beschrieben werden, sperren
+        zusätzlich auf Speicher-Ebene.
+
+        Args:
+            *namen (str): Die Inhabernamen.
+
+        Raises:
+            ValueError: Wenn eines der Konten nicht existiert.
+            TimeoutError: Wenn eine Sperre nicht rechtzeitig frei wird.
+
+        Yields:
+            dict: Übergebener Name -> Konto-Objekt.
+        """
+        with konto_sperren.sperre_mehrere(namen):
+            objekte, konten = self._transaktions_konten(namen, self.konto_holen)
+            yield konten
+            self.konten_schreiben(list(objekte.values()))
+
+    @staticmethod
+    def _transaktions_konten(namen, holen):
+        """
+        Lädt jedes Konto einer Transaktion genau einmal (auch bei unterschiedlicher Schreibweise).
+
+        Returns:
+            tuple: (normalisierter Name -> Konto, übergebener Name -> Konto)
+        """
+        objekte, konten = {}, {}
+        for name in namen:
+            schluessel = normalisiere_name(name)
+            if schluessel not in objekte:
+                objekte[schluessel] = holen(name)
+            konten[name] = objekte[schluessel]
+        return objekte, konten
@@ -1,7 +1,10 @@
 import unittest
 import random
+import time
+from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
-from api import app
+from api import app, LASTSCHUTZ_REGELN
+from lastschutz import Lastschutz, Gruppe
 
 class TestBankAPI(unittest.TestCase):
     def setUp(self):
@@ -30,7 +33,75 @@ class TestBankAPI(unittest.TestCase):
         self.assertIn("Softmaster Bank-Management API", response.text)
         self.assertIn("static/sm_logo.webp", response.text)
 
+    # --- TAG: System ---
+    def test_metrics(self):
+        """Prüft, ob /metrics das Prometheus-Textformat inkl. Routen-Labels liefert."""
+        self.client.get("/konten")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("text/plain", response.headers["content-type"])
+        self.assertIn('bank_http_requests_total{method="GET",route="/konten",status="200"}', response.text)
+        self.assertIn("bank_token_cache_hits_total", response.text)
+
+    def test_server_timing_header(self):
+        """Prüft, ob Transaktionen ihre Zeitaufschlüsselung im Server-Timing-Header liefern."""
+        token = self.get_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        response = self.client.post("/transaktion/einzahlen/Tom?betrag=1", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        timing = response.headers["server-timing"]
+        for abschnitt in ("auth;dur=", "storage.transaktion_lesen;dur=", "storage.transaktion_schreiben;dur=",
+                          "domain;dur=", "serialisierung;dur=", "total;dur="):
+            self.assertIn(abschnitt, timing)
+
+    def test_profiling_auf_anforderung(self):
+        """Prüft, ob ein Admin einen Request profilieren und die Top-Funktionen abrufen kann."""
+        token = self.get_token()
+        headers = {"Authorization": f"Bearer {token}", "X-Profile": "1"}
+        response = self.client.get("/konten", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        profil_id = response.headers["x-profile-id"]
+
+        response = self.client.get(f"/system/profile/{profil_id}", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.json()["funktionen"]), 0)
+
+    def test_profiling_ohne_admin_ignoriert(self):
+        """Prüft, ob die Profiling-Anforderung ohne Admin-Token ignoriert wird."""
+        response = self.client.get("/konten?profile=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("x-profile-id", response.headers)
+
+    def test_speicher_ungueltige_gruppierung(self):
+        """Prüft, ob eine ungültige Gruppierung als Validierungsfehler (422) abgelehnt wird."""
+        headers = {"Authorization": f"Bearer {self.get_token()}"}
+        response = self.client.get("/system/speicher/diff?von=1&bis=2&gruppierung=zeile", headers=headers)
+        self.assertEqual(response.status_code, 422)
+        response = self.client.get("/system/speicher/snapshot/1?gruppierung=zeile", headers=headers)
+        self.assertEqual(response.status_code, 422)
+
     # --- TAG: 1. Übersicht ---
+    def test_export_ndjson_gzip(self):
+        """Prüft den gestreamten, komprimierten Export (nur Admin)."""
+        import gzip
+        import json
+        response = self.client.get("/konten/export?format=ndjson&gzip=true")
+        self.assertEqual(response.status_code, 401)
+        headers = {"Authorization": f"Bearer {self.get_token()}"}
+        response = self.client.get("/konten/export?format=ndjson&gzip=true", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        zeilen = [json.loads(z) for z in gzip.decompress(response.content).decode("utf-8").splitlines()]
+        self.assertIn("tom", [z["inhaber"].lower() for z in zeilen])
+
+    def test_konten_batch_lesen(self):
+        """Prüft, ob gefundene und fehlende Konten in einer Antwort geliefert werden."""
+        response = self.client.post("/konten/batch-lesen", json={"namen": ["tom", "Gibt-es-nicht", "TOM"]})
+        self.assertEqual(response.status_code, 200)
+        daten = response.json()
+        self.assertEqual([k["inhaber"].lower() for k in daten["konten"]], ["tom"])
+        self.assertEqual(daten["fehlend"], ["Gibt-es-nicht"])
+        self.assertEqual(self.client.post("/konten/batch-lesen", json={"namen": []}).status_code, 422)
+
     def test_alle_konten(self):
         """
         Prüft, ob die Konktenliste (Array) zurückgegeben wird.
@@ -73,6 +144,45 @@ class TestBankAPI(unittest.TestCase):
         if isinstance(data, list):
             self.assertTrue(any("Tom" in k["inhaber"] for k in data))
     
+    def test_suche_keine_treffer_und_lesen_nach_schreiben(self):
+        """Prüft das unveränderte Antwortformat und dass nach einer Buchung neu gelesen wird."""
+        response = self.client.get("/suche?name=gibtesnicht")
+        self.assertEqual(response.json(), {"nachricht": "Keine Treffer", "ergebnisse": []})
+        headers = {"Authorization": f"Bearer {self.get_token()}"}
+        neuer_stand = self.client.post("/transaktion/einzahlen/Tom?betrag=10", headers=headers).json()["neuer_stand"]
+        nachher = next(k for k in self.client.get("/konten").json() if k["inhaber"] == "Tom")["_kontostand"]
+        self.assertEqual(nachher, neuer_stand)
+
+    def test_suche_rate_limit(self):
+        """Prüft 429 mit Retry-After für Scans, während Transaktionen desselben Clients weiterlaufen."""
+        schutz = Lastschutz([Gruppe("standard", 0.001, 10), Gruppe("scan", 0.001, 2)], LASTSCHUTZ_REGELN)
+        with patch("api.lastschutz", schutz):
+            self.assertEqual(self.client.get("/suche?name=Tom").status_code, 200)
+            response = self.client.get("/suche?name=Tom")
+            self.assertEqual(response.status_code, 429)
+            self.assertIn("Retry-After", response.headers)
+            self.assertEqual(self.client.post("/zinsen/simulieren/Jim?sonderzins=5.0").status_code, 200)
+        self.assertIn('bank_requests_shed_total{grund="rate_limit",gruppe="scan"}', self.client.get("/metrics").text)
+
+    def test_export_zaehlt_bis_zum_ende_als_laufend(self):
+        """Prüft, ob ein gestreamter Export seinen Platz unter MAX_IN_FLIGHT erst nach dem Body freigibt."""
+        schutz = Lastschutz([Gruppe("standard", 100, 100), Gruppe("scan", 100, 100)], LASTSCHUTZ_REGELN,
+                            max_laufend=10)
+        waehrend = []
+
+        def langsamer_strom(bloecke, format, komprimieren=False):
+            for i in range(3):
+                time.sleep(0.01)
+                waehrend.append(schutz.laufend)
+                yield f"{i}\n".encode()
+
+        headers = {"Authorization": f"Bearer {self.get_token()}"}
+        with patch("api.lastschutz", schutz), patch("api.export_strom", langsamer_strom):
+            response = self.client.get("/konten/export", headers=headers)
+        self.assertEqual(response.content, b"0\n1\n2\n")
+        self.assertEqual(waehrend, [1, 1, 1])
+        self.assertEqual(schutz.laufend, 0)
+
     def test_konto_erstellen(self):
         token = self.get_token() # 1. Login
         headers = {"Authorization": f"Bearer {token}"} # 2. Token in Header packen
@@ -120,6 +230,32 @@ class TestBankAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("Ungültiger Kontotyp", response.json()["detail"])
 
+    def test_konten_import_ndjson(self):
+        """Prüft den gestreamten Import: neue Zeile angelegt, Duplikat und ungültige Zeile abgelehnt."""
+        headers = {"Authorization": f"Bearer {self.get_token()}"}
+        neu = "Import" + str(random.randint(100000, 999999))
+        body = (
+            f'{{"name": "{neu}", "typ": "giro", "start_saldo": 10, "extra": 0}}\n'
+            '{"inhaber": "Tom", "typ": "Girokonto", "kontostand": 1, "extra": 0}\n'
+            '{"name": "Kaputt", "typ": "falscher_typ", "start_saldo": 1, "extra": 0}\n'
+        )
+        response = self.client.post("/konten/import?format=ndjson", content=body, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        ergebnis = response.json()
+        self.assertEqual(ergebnis["angelegt"], 1)
+        self.assertEqual([a["zeile"] for a in ergebnis["abgelehnt"]], [2, 3])
+        self.assertEqual(len(ergebnis["abgelehnt"][0]["vorschlaege"]), 3)
+
+    def test_konten_erstellen_batch(self):
+        """Prüft die JSON-Variante des Massenanlegens (nur Admin)."""
+        payload = [{"name": "Tom", "typ": "giro", "start_saldo": 1, "extra": 0}]
+        self.assertEqual(self.client.post("/konten/erstellen/batch", json=payload).status_code, 401)
+        headers = {"Authorization": f"Bearer {self.get_token()}"}
+        response = self.client.post("/konten/erstellen/batch", json=payload, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["angelegt"], 0)
+        self.assertEqual(response.json()["abgelehnt"][0]["grund"], "Name existiert bereits.")
+
     # --- TAG: 4. Zinsen ---
     def test_zinsen_gutschreiben(self):
         """
@@ -132,6 +268,16 @@ class TestBankAPI(unittest.TestCase):
             self.assertIn("Erfolg", response.json()["status"])
         else:
             self.assertEqual(response.status_code, 400)
+
+    def test_zinsen_gutschreiben_sperre_belegt(self):
+        """Prüft, ob ein Timeout der Konto-Sperre als 503 mit Retry-After gemeldet wird."""
+        headers = {"Authorization": f"Bearer {self.get_token()}"}
+        storage = MagicMock()
+        storage.transaktion.side_effect = TimeoutError("Konto ist derzeit durch eine andere Transaktion gesperrt.")
+        with patch("api.hole_storage", return_value=storage):
+            response = self.client.post("/zinsen/gutschreiben/Jim", headers=headers)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
     
 
     def test_zinsen_simulation_spar(self):
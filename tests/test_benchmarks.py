@@ -0,0 +1,36 @@
+import unittest
+from benchmarks.auswertung import perzentil, latenz_zusammenfassung
+from benchmarks.storage import erzeuge_konten, benchmark, OPERATIONEN
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Test-Suite für die Benchmark-Hilfsfunktionen."""
+
+    def test_perzentil(self):
+        """Prüft die Nearest-Rank-Perzentile."""
+        werte = list(range(1, 101))
+        self.assertEqual(perzentil(werte, 50), 50)
+        self.assertEqual(perzentil(werte, 99), 99)
+        self.assertEqual(perzentil([], 99), 0.0)
+
+    def test_latenz_zusammenfassung(self):
+        """Prüft Durchsatz und Umrechnung in Millisekunden."""
+        ergebnis = latenz_zusammenfassung([0.001] * 10, 0.5)
+        self.assertEqual(ergebnis["ops_pro_s"], 20.0)
+        self.assertEqual(ergebnis["p99_ms"], 1.0)
+
+    def test_datenbestand_reproduzierbar(self):
+        """Prüft, ob der synthetische Datenbestand bei gleichem Seed identisch ist."""
+        a = [(k.inhaber, k.kontostand) for k in erzeuge_konten(50, seed=1)]
+        b = [(k.inhaber, k.kontostand) for k in erzeuge_konten(50, seed=1)]
+        self.assertEqual(a, b)
+
+    def test_storage_benchmark_klein(self):
+        """Prüft, ob ein Mini-Lauf für beide Backends alle Operationen liefert."""
+        ergebnisse = benchmark(["json", "sql"], [20], max_ops=3, budget=1.0)
+        self.assertEqual(len(ergebnisse), 2 * len(OPERATIONEN))
+        self.assertTrue(all(e["anzahl"] >= 1 for e in ergebnisse))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from sqlite_storage import SQLiteStorage
+from ereignisse import EreignisBus, EreignisStorage, sse_format
+
+
+class TestEreignisse(unittest.TestCase):
+    """Test-Suite für den Ereignis-Bus und den veröffentlichenden Storage-Proxy."""
+
+    def test_filter_und_zustellung_aus_anderem_thread(self):
+        """Prüft, ob Ereignisse aus Worker-Threads gefiltert im Event-Loop ankommen."""
+        bus = EreignisBus()
+
+        async def ablauf():
+            alle = bus.abonnieren()
+            nur_tom = bus.abonnieren(konto="TOM")
+            nur_spar = bus.abonnieren(kontotyp="Sparkonto")
+            t = threading.Thread(target=lambda: (
+                bus.veroeffentlichen("kontostand", Girokonto("Tom", 1, 0)),
+                bus.veroeffentlichen("konto_angelegt", Sparkonto("Anna", 2, 0.01)),
+            ))
+            t.start()
+            t.join()
+            ergebnis = [
+                [(await a.naechstes(1))["inhaber"] for _ in range(n)] for a, n in ((alle, 2), (nur_tom, 1), (nur_spar, 1))
+            ]
+            self.assertIsNone(await nur_tom.naechstes(0.05))
+            for abo in (alle, nur_tom, nur_spar):
+                bus.abmelden(abo)
+            return ergebnis
+
+        self.assertEqual(asyncio.run(ablauf()), [["Tom", "Anna"], ["Tom"], ["Anna"]])
+        self.assertEqual(bus.anzahl(), 0)
+
+    def test_langsamer_abonnent_wird_getrennt(self):
+        """Prüft, ob ein Abonnent mit voller Queue getrennt wird, ohne andere zu beeinflussen."""
+        bus = EreignisBus(max_queue=2)
+
+        async def ablauf():
+            abo = bus.abonnieren()
+            for i in range(3):
+                bus.veroeffentlichen("kontostand", Girokonto("Tom", i, 0))
+            await asyncio.sleep(0)
+            return abo
+
+        abo = asyncio.run(ablauf())
+        self.assertTrue(abo.getrennt)
+        self.assertEqual(abo.queue.qsize(), 2)
+        self.assertEqual(bus.anzahl(), 0)
+
+    def test_maximale_abonnenten(self):
+        """Prüft die Obergrenze gleichzeitiger Abonnements."""
+        bus = EreignisBus(max_abonnenten=1)
+
+        async def ablauf():
+            bus.abonnieren()
+            with self.assertRaises(RuntimeError):
+                bus.abonnieren()
+
+        asyncio.run(ablauf())
+
+    def test_storage_proxy_veroeffentlicht_nach_commit(self):
+        """Prüft, ob der Proxy Transaktionen nach dem Commit und Fehlschläge gar nicht meldet."""
+        gemeldet = []
+
+        class Bus:
+            def veroeffentlichen(self, typ, konto):
+                gemeldet.append((typ, konto.inhaber, konto.kontostand))
+
+        with tempfile.TemporaryDirectory() as verzeichnis:
+            storage = EreignisStorage(SQLiteStorage(os.path.join(verzeichnis, "bank.db")), Bus())
+            storage.konto_hinzufuegen(Girokonto("Tom", 100, 0))
+            with storage.transaktion("Tom", "tom") as konten:
+                konten["Tom"].einzahlen(5)
+            with self.assertRaises(ValueError):
+                with storage.transaktion("Tom") as konten:
+                    konten["Tom"].abheben(1000)
+            self.assertFalse(storage.ist_leer())
+            storage.schliessen()
+        self.assertEqual(gemeldet, [("konto_angelegt", "Tom", 100), ("kontostand", "Tom", 105)])
+
+    def test_sse_format(self):
+        """Prüft das SSE-Format eines Ereignisses."""
+        text = sse_format({"id": 7, "typ": "kontostand", "inhaber": "Tom"})
+        self.assertTrue(text.startswith("id: 7\nevent: kontostand\ndata: {"))
+        self.assertTrue(text.endswith("\n\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import gzip
+import json
+import unittest
+from export import export_strom
+
+
+ZEILEN = [
+    [{"inhaber": "Tom", "kontostand": 500.0, "typ": "Girokonto", "extra": 200.0}],
+    [{"inhaber": "Jim, Jr.", "kontostand": 1000.0, "typ": "Sparkonto", "extra": 0.02}],
+]
+
+
+class TestExport(unittest.TestCase):
+    """Test-Suite für den gestreamten Export (NDJSON/CSV, optional gzip)."""
+
+    def test_ndjson(self):
+        """Prüft, ob jede Zeile ein vollständiges JSON-Objekt ist."""
+        text = b"".join(export_strom(iter(ZEILEN), "ndjson")).decode("utf-8")
+        zeilen = [json.loads(z) for z in text.splitlines()]
+        self.assertEqual([z["inhaber"] for z in zeilen], ["Tom", "Jim, Jr."])
+
+    def test_csv_mit_kopfzeile(self):
+        """Prüft Kopfzeile und Maskierung von Kommas im Namen."""
+        text = b"".join(export_strom(iter(ZEILEN), "csv")).decode("utf-8")
+        self.assertEqual(text.splitlines()[0], "inhaber,kontostand,typ,extra")
+        self.assertIn('"Jim, Jr.",1000.0,Sparkonto,0.02', text)
+
+    def test_gzip(self):
+        """Prüft, ob der komprimierte Strom ein gültiges gzip-Dokument ergibt."""
+        roh = b"".join(export_strom(iter(ZEILEN), "ndjson"))
+        komprimiert = b"".join(export_strom(iter(ZEILEN), "ndjson", komprimieren=True))
+        self.assertEqual(gzip.decompress(komprimiert), roh)
+
+    def test_unbekanntes_format(self):
+        """Prüft, ob ein unbekanntes Format abgelehnt wird."""
+        with self.assertRaises(ValueError):
+            export_strom(iter(ZEILEN), "xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from girokonto import Girokonto
+from konten_batch import StapelLauf
+from konten_import import ZeilenLeser
+from sparkonto import Sparkonto
+from sqlite_storage import SQLiteStorage
+
+
+class TestStapelLauf(unittest.TestCase):
+    """Test-Suite für die blockweise Stapelverarbeitung der CLI."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.storage = SQLiteStorage(os.path.join(self.verzeichnis.name, "bank.db"))
+        self.storage.konten_schreiben([Girokonto("Tom", 100, 0), Sparkonto("Jim", 100, 10)])
+
+    def tearDown(self):
+        self.storage.schliessen()
+        self.verzeichnis.cleanup()
+
+    def ausfuehren(self, text: str, format: str = "ndjson", operation: str = None, **optionen):
+        leser = ZeilenLeser(format)
+        lauf = StapelLauf(self.storage, **optionen)
+        lauf.hinzufuegen(leser.fuettern(text.encode("utf-8")), operation)
+        lauf.hinzufuegen(leser.abschliessen(), operation)
+        return lauf.abschliessen()
+
+    def test_gemischte_operationen_in_reihenfolge(self):
+        """Prüft Anlage und Buchung auf demselben Konto sowie einzeln abgelehnte Zeilen."""
+        ergebnis = self.ausfuehren(
+            '{"op": "deposit", "name": "tom", "betrag": 50}\n'
+            '{"op": "withdraw", "name": "Tom", "betrag": 1000}\n'
+            '{"op": "create", "name": "Ana", "typ": "giro", "start_saldo": 10, "extra": 0}\n'
+            '{"op": "deposit", "name": "Ana", "betrag": 5}\n'
+            '{"op": "interest", "name": "Jim"}\n'
+            '{"op": "interest", "name": "Tom"}\n'
+            '{"op": "deposit", "name": "Niemand", "betrag": 1}\n'
+            '{"op": "ueberweisen", "name": "Tom"}\n',
+            chunk_groesse=2,
+        )
+        self.assertEqual(ergebnis["gelesen"], 8)
+        self.assertEqual(ergebnis["verbucht"], 3)
+        self.assertEqual(ergebnis["angelegt"], 1)
+        self.assertEqual([a["zeile"] for a in ergebnis["abgelehnt"]], [2, 6, 7, 8])
+        self.assertEqual(self.storage.konto_holen("Tom").kontostand, 150)
+        self.assertEqual(self.storage.konto_holen("Ana").kontostand, 15)
+        self.assertAlmostEqual(self.storage.konto_holen("Jim").kontostand, 110)
+
+    def test_feste_operation_aus_csv(self):
+        ergebnis = self.ausfuehren("name,betrag\nTom,30\nJim,x\n", format="csv", operation="withdraw")
+        self.assertEqual(ergebnis["verbucht"], 1)
+        self.assertEqual(ergebnis["abgelehnt_anzahl"], 1)
+        self.assertEqual(self.storage.konto_holen("Tom").kontostand, 70)
+        self.assertEqual(self.storage.konto_holen("Jim").kontostand, 100)
+
+    def test_fortschritt_je_block(self):
+        staende = []
+        zeilen = "".join(f'{{"op": "deposit", "name": "Tom", "betrag": 1}}\n' for _ in range(5))
+        self.ausfuehren(zeilen, chunk_groesse=2, fortschritt=staende.append)
+        self.assertEqual([s["verbucht"] for s in staende], [2, 4, 5])
+        self.assertEqual(self.storage.konto_holen("Tom").kontostand, 105)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from sqlite_storage import SQLiteStorage
+from konten_import import ZeilenLeser, KontenImport, konto_aus_daten, importieren
+
+
+class TestKontenImport(unittest.TestCase):
+    """Test-Suite für den blockweisen Massen-Import."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.storage = SQLiteStorage(os.path.join(self.verzeichnis.name, "bank.db"))
+        self.storage.konten_schreiben([Girokonto("Tom", 100, 0)])
+
+    def tearDown(self):
+        self.verzeichnis.cleanup()
+
+    def test_konto_aus_daten(self):
+        """Prüft Schema- und Export-Felder sowie die Validierung über die Konto-Klassen."""
+        self.assertIsInstance(konto_aus_daten({"name": "A", "typ": "spar", "start_saldo": 1, "extra": 0.02}), Sparkonto)
+        konto = konto_aus_daten({"inhaber": "B", "typ": "Girokonto", "kontostand": "-50", "extra": "100"})
+        self.assertEqual((konto.kontostand, konto.dispo), (-50, 100))
+        for daten in ({"typ": "giro", "start_saldo": 1, "extra": 0},
+                      {"name": "C", "typ": "depot", "start_saldo": 1, "extra": 0},
+                      {"name": "D", "typ": "spar", "start_saldo": -1, "extra": 0},
+                      {"name": "E", "typ": "giro", "start_saldo": "x", "extra": 0}):
+            with self.subTest(daten=daten), self.assertRaises(ValueError):
+                konto_aus_daten(daten)
+
+    def test_zeilen_ueber_chunk_grenzen(self):
+        """Prüft, ob Zeilen, die über Upload-Teile reichen, korrekt zusammengesetzt werden."""
+        leser = ZeilenLeser("csv")
+        text = b"inhaber,kontostand,typ,extra\nAnna,5,Girokonto,0\nBen,6,Sparkonto,0.01"
+        zeilen = []
+        for i in range(0, len(text), 7):
+            zeilen += leser.fuettern(text[i:i + 7])
+        zeilen += leser.abschliessen()
+        self.assertEqual([(n, d["inhaber"]) for n, d, _ in zeilen], [(2, "Anna"), (3, "Ben")])
+
+    def test_importieren_meldet_abgelehnte_zeilen(self):
+        """Prüft Anlegen in Blöcken, Duplikate (Bestand und Datei) und ungültige Zeilen."""
+        daten = (
+            b'{"name": "Anna", "typ": "giro", "start_saldo": 1, "extra": 0}\n'
+            b'{"name": "tom", "typ": "giro", "start_saldo": 1, "extra": 0}\n'
+            b'kein json\n'
+            b'{"name": "ANNA", "typ": "spar", "start_saldo": 1, "extra": 0}\n'
+            b'{"name": "Ben", "typ": "spar", "start_saldo": 1, "extra": 0}\n'
+        )
+        ergebnis = importieren(self.storage, [daten[:50], daten[50:]], "ndjson", chunk_groesse=2)
+        self.assertEqual((ergebnis["gelesen"], ergebnis["angelegt"], ergebnis["abgelehnt_anzahl"]), (5, 2, 3))
+        self.assertEqual([a["zeile"] for a in ergebnis["abgelehnt"]], [2, 3, 4])
+        vorschlaege = ergebnis["abgelehnt"][0]["vorschlaege"]
+        self.assertEqual(len(vorschlaege), 3)
+        self.assertEqual(self.storage.namen_existieren(vorschlaege), set())
+        self.assertEqual(sorted(k.inhaber for k in self.storage.laden()), ["Anna", "Ben", "Tom"])
+
+    def test_abgelehnt_liste_begrenzt(self):
+        """Prüft, ob die Meldeliste gekappt, aber vollständig gezählt wird."""
+        importer = KontenImport(self.storage, max_abgelehnt=2)
+        importer.hinzufuegen([(i, None, "kaputt") for i in range(5)])
+        ergebnis = importer.ergebnis()
+        self.assertEqual((ergebnis["abgelehnt_anzahl"], len(ergebnis["abgelehnt"])), (5, 2))
+        self.assertTrue(ergebnis["abgelehnt_gekuerzt"])
+
+    def test_unbekanntes_format(self):
+        """Prüft, ob ein unbekanntes Format abgelehnt wird."""
+        with self.assertRaises(ValueError):
+            ZeilenLeser("xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
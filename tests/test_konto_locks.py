@@ -0,0 +1,76 @@
+import threading
+import time
+import unittest
+from girokonto import Girokonto
+from konto_locks import KontoSperren
+
+
+class TestKontoSperren(unittest.TestCase):
+    """Test-Suite für den Lock-Manager mit Lock-Striping."""
+
+    def setUp(self):
+        self.sperren = KontoSperren(anzahl_streifen=8, timeout=5)
+
+    def test_gleicher_name_gleicher_streifen(self):
+        """Prüft, ob Schreibweisen desselben Namens auf denselben Lock abgebildet werden."""
+        self.assertEqual(self.sperren.streifen(" Tom "), self.sperren.streifen("tom"))
+
+    def test_keine_verlorenen_updates(self):
+        """Prüft, ob parallele Abhebungen das Dispo-Limit nicht gemeinsam überschreiten."""
+        gespeichert = {"tom": Girokonto("Tom", 100, 0)}
+        erfolgreich = []
+
+        def abheben():
+            with self.sperren.sperre("Tom"):
+                k = Girokonto("Tom", gespeichert["tom"].kontostand, 0)  # konto_holen
+                time.sleep(0.001)
+                try:
+                    k.abheben(10)
+                except ValueError:
+                    return
+                gespeichert["tom"] = k  # update_kontostand
+                erfolgreich.append(1)
+
+        threads = [threading.Thread(target=abheben) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(erfolgreich), 10)
+        self.assertEqual(gespeichert["tom"].kontostand, 0)
+
+    def test_sperre_mehrere_ohne_deadlock(self):
+        """Prüft, ob gegenläufige Mehrfach-Sperren (A->B, B->A) nicht verklemmen."""
+        zaehler = []
+
+        def ueberweisen(von, an):
+            for _ in range(200):
+                with self.sperren.sperre_mehrere([von, an]):
+                    zaehler.append(1)
+
+        t1 = threading.Thread(target=ueberweisen, args=("Tom", "Jim"))
+        t2 = threading.Thread(target=ueberweisen, args=("Jim", "Tom"))
+        t1.start(); t2.start()
+        t1.join(5); t2.join(5)
+        self.assertEqual(len(zaehler), 400)
+
+    def test_timeout(self):
+        """Prüft, ob eine zu lange belegte Sperre mit TimeoutError abbricht."""
+        sperren = KontoSperren(anzahl_streifen=1, timeout=0.05)
+        with sperren.sperre("Tom"):
+            ergebnis = []
+            t = threading.Thread(target=lambda: ergebnis.append(self._versuchen(sperren)))
+            t.start(); t.join()
+        self.assertEqual(ergebnis, ["timeout"])
+
+    @staticmethod
+    def _versuchen(sperren):
+        try:
+            with sperren.sperre("Jim"):
+                return "ok"
+        except TimeoutError:
+            return "timeout"
+
+
+if __name__ == "__main__":
+    unittest.main()
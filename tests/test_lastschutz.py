@@ -0,0 +1,57 @@
+import unittest
+from lastschutz import Lastschutz, Gruppe, ABGEWIESEN
+
+REGELN = [
+    ("*", "/metrics", None, 0),
+    ("GET", "/konten/export", "scan", 5),
+    ("GET", "/konten", "scan", 1),
+    ("GET", "/suche", "scan", 1),
+]
+
+
+class TestLastschutz(unittest.TestCase):
+    """Test-Suite für Rate-Limit je Routen-Gruppe und den globalen Lastabwurf."""
+
+    def schutz(self, max_laufend: int = 0):
+        return Lastschutz(
+            [Gruppe("standard", 0.001, 3), Gruppe("scan", 0.001, 5, anteil=0.5)],
+            REGELN, max_laufend=max_laufend,
+        )
+
+    def test_regeln(self):
+        schutz = self.schutz()
+        self.assertEqual(schutz.regel("GET", "/konten/export"), ("scan", 5))
+        self.assertEqual(schutz.regel("GET", "/konten"), ("scan", 1))
+        self.assertEqual(schutz.regel("POST", "/konten/erstellen"), ("standard", 1))
+        self.assertEqual(schutz.regel("GET", "/kontenxyz"), ("standard", 1))
+        self.assertEqual(schutz.regel("GET", "/metrics"), (None, 0))
+
+    def test_kontingent_je_gruppe_und_client(self):
+        """Prüft, dass erschöpfte Scans weder andere Gruppen noch andere Clients bremsen."""
+        schutz = self.schutz()
+        self.assertEqual(schutz.zulassen("ip:1", "scan", 5), (None, 0.0))
+        status, wartezeit = schutz.zulassen("ip:1", "scan", 1)
+        self.assertEqual(status, 429)
+        self.assertGreater(wartezeit, 0)
+        self.assertEqual(schutz.zulassen("ip:1", "standard", 1), (None, 0.0))
+        self.assertEqual(schutz.zulassen("ip:2", "scan", 1), (None, 0.0))
+
+    def test_lastabwurf_scans_zuerst(self):
+        """Prüft 503 ab dem Anteil der Gruppe an der globalen Obergrenze und die Freigabe."""
+        schutz = self.schutz(max_laufend=4)
+        vorher = ABGEWIESEN._kind({"grund": "ueberlast", "gruppe": "scan"}).wert
+        for i in range(2):
+            self.assertEqual(schutz.zulassen(f"ip:{i}", "standard", 1), (None, 0.0))
+        self.assertEqual(schutz.zulassen("ip:9", "scan", 1), (503, 1.0))
+        self.assertEqual(ABGEWIESEN._kind({"grund": "ueberlast", "gruppe": "scan"}).wert, vorher + 1)
+        for i in range(2, 4):
+            self.assertEqual(schutz.zulassen(f"ip:{i}", "standard", 1), (None, 0.0))
+        self.assertEqual(schutz.zulassen("ip:5", "standard", 1)[0], 503)
+        for _ in range(3):
+            schutz.beenden()
+        self.assertEqual(schutz.laufend, 1)
+        self.assertEqual(schutz.zulassen("ip:9", "scan", 1), (None, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
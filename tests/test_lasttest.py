@@ -0,0 +1,36 @@
+import asyncio
+import unittest
+import httpx
+from benchmarks.lasttest import Lasttest, mix_parsen
+
+
+class TestLasttest(unittest.TestCase):
+    """Test-Suite für den Lasttest (in-process gegen die ASGI-App)."""
+
+    def test_mix_parsen(self):
+        """Prüft das Einlesen des Anfrage-Mix und die Ablehnung unbekannter Endpunkte."""
+        self.assertEqual(mix_parsen("konten=4, einzahlen=2"), {"konten": 4.0, "einzahlen": 2.0})
+        with self.assertRaises(ValueError):
+            mix_parsen("ueberweisen=1")
+        with self.assertRaises(ValueError):
+            mix_parsen("konten=0")
+
+    def test_kurzer_lauf_konsistent(self):
+        """Prüft, ob ein kurzer Lauf ohne Serverfehler und mit konsistenten Kontoständen endet."""
+        from api import app, stelle_datenbank_sicher
+        stelle_datenbank_sicher()
+
+        async def ausfuehren():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://lasttest") as client:
+                test = Lasttest(client, mix_parsen("konten=1,einzahlen=2,abheben=2"), ["Tom"],
+                                "DEMO_USER", "Demo_Softmaster_API_2026")
+                return await test.ausfuehren(parallel=5, rampe=0.1, dauer=1.0)
+
+        ergebnis = asyncio.run(ausfuehren())
+        self.assertTrue(all(k["ok"] for k in ergebnis["konsistenz"]))
+        self.assertTrue(all(e["fehler"] == 0 for e in ergebnis["endpunkte"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
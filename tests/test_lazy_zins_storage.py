@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from girokonto import Girokonto
+from json_storage import JSONStorage
+from lazy_zins_storage import LazyZinsStorage
+from sparkonto import Sparkonto
+from sqlite_storage import SQLiteStorage
+
+PERIODE = 3600
+
+
+class TestZinsenNachholen(unittest.TestCase):
+    """Test-Suite für die analytische Verzinsung eines Sparkontos."""
+
+    def test_entspricht_periodischer_buchung(self):
+        """Prüft, dass n nachgeholte Perioden n einzelnen Zinsbuchungen entsprechen."""
+        periodisch = Sparkonto("A", 100, 2.5)
+        for _ in range(12):
+            periodisch.zinsen_berechnen()
+        lazy = Sparkonto("B", 100, 2.5)
+        lazy.letzte_verzinsung = 10 * PERIODE
+        self.assertEqual(lazy.zinsen_nachholen(PERIODE, 22 * PERIODE + 5), 12)
+        self.assertAlmostEqual(lazy.kontostand, periodisch.kontostand, places=9)
+        self.assertEqual(lazy.letzte_verzinsung, 22 * PERIODE)
+        self.assertEqual(lazy.zinsen_nachholen(PERIODE, 22 * PERIODE + 999), 0)
+
+    def test_ohne_zeitstempel_beginnt_aktuelle_periode(self):
+        konto = Sparkonto("A", 100, 10)
+        self.assertEqual(konto.zinsen_nachholen(PERIODE, 5 * PERIODE + 1), 0)
+        self.assertEqual(konto.kontostand, 100)
+        self.assertEqual(konto.letzte_verzinsung, 5 * PERIODE)
+
+
+class TestLazyZinsStorage(unittest.TestCase):
+    """Test-Suite für die Verzinsung beim Lesen und das Zurückschreiben beim nächsten Schreibvorgang."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.backend = SQLiteStorage(os.path.join(self.verzeichnis.name, "bank.db"))
+        self.jetzt = 100 * PERIODE
+        self.storage = LazyZinsStorage(self.backend, PERIODE, uhr=lambda: self.jetzt)
+        self.storage.mehrere_konten_hinzufuegen([Sparkonto("Spar", 100, 10), Girokonto("Giro", 100, 0)])
+
+    def tearDown(self):
+        self.backend.schliessen()
+        self.verzeichnis.cleanup()
+
+    def test_lesen_verzinst_ohne_zu_schreiben(self):
+        self.jetzt += 2 * PERIODE
+        self.assertAlmostEqual(self.storage.konto_holen("spar").kontostand, 121)
+        self.assertAlmostEqual(self.storage.konten_holen(["Spar"])["spar"].kontostand, 121)
+        _, seite = self.storage.konten_seite(0, 10)
+        self.assertAlmostEqual({k.inhaber: k.kontostand for k in seite}["Spar"], 121)
+        zeilen = [z for block in self.storage.konten_iterieren(10) for z in block]
+        self.assertAlmostEqual({z["inhaber"]: z["kontostand"] for z in zeilen}["Spar"], 121)
+        self.assertEqual(self.storage.konto_holen("Giro").kontostand, 100)
+        # Gespeichert ist weiterhin der alte Stand
+        self.assertEqual(self.backend.konto_holen("Spar").kontostand, 100)
+
+    def test_transaktion_schreibt_verzinsten_stand_zurueck(self):
+        self.jetzt += 2 * PERIODE
+        with self.storage.transaktion("Spar") as konten:
+            konten["Spar"].einzahlen(9)
+        gespeichert = self.backend.konto_holen("Spar")
+        self.assertAlmostEqual(gespeichert.kontostand, 130)
+        self.assertEqual(gespeichert.letzte_verzinsung, self.jetzt)
+        # Innerhalb derselben Periode wird nicht erneut verzinst
+        self.jetzt += PERIODE / 2
+        self.assertAlmostEqual(self.storage.konto_holen("Spar").kontostand, 130)
+        self.jetzt += PERIODE
+        self.assertAlmostEqual(self.storage.konto_holen("Spar").kontostand, 143)
+
+    def test_bestand_ohne_zeitstempel_wird_beim_lesen_verzinst(self):
+        """Prüft, dass ein vor dem Lazy-Modus angelegtes, nur gelesenes Konto nach dem Nachtragen verzinst wird."""
+        self.backend.konten_schreiben([Sparkonto("Alt", 100, 10), Sparkonto("Neu", 100, 10)])
+        self.assertIsNone(self.backend.konto_holen("Alt").letzte_verzinsung)
+        self.assertEqual(self.storage.zeitstempel_nachtragen(chunk_groesse=2), 2)
+        self.assertEqual(self.backend.konto_holen("Alt").letzte_verzinsung, self.jetzt)
+        for _ in range(5):
+            self.jetzt += PERIODE
+            self.storage.konto_holen("Alt")
+        self.assertAlmostEqual(self.storage.konto_holen("Alt").kontostand, 161.051)
+        self.assertEqual(self.storage.zeitstempel_nachtragen(), 0)
+
+    def test_json_backend_speichert_zeitstempel(self):
+        pfad = os.path.join(self.verzeichnis.name, "konten.json")
+        storage = LazyZinsStorage(JSONStorage(pfad), PERIODE, uhr=lambda: self.jetzt)
+        storage.speichern([Sparkonto("Spar", 100, 10)])
+        self.jetzt += 3 * PERIODE
+        self.assertAlmostEqual(JSONStorage(pfad).konto_holen("Spar").kontostand, 100)
+        self.assertAlmostEqual(storage.konto_holen("Spar").kontostand, 133.1)
+
+
+class TestSQLiteSchemaNachruesten(unittest.TestCase):
+    """Test-Suite für Datenbanken, die vor dem Lazy-Zinsmodus angelegt wurden."""
+
+    def test_spalte_wird_ergaenzt(self):
+        with tempfile.TemporaryDirectory() as verzeichnis:
+            pfad = os.path.join(verzeichnis, "alt.db")
+            conn = sqlite3.connect(pfad)
+            conn.execute(
+                "CREATE TABLE konten (id INTEGER PRIMARY KEY AUTOINCREMENT, inhaber TEXT NOT NULL UNIQUE, "
+                "kontostand REAL NOT NULL, typ TEXT NOT NULL, extra_wert REAL)"
+            )
+            conn.execute("INSERT INTO konten (inhaber, kontostand, typ, extra_wert) VALUES ('Alt', 50, 'Sparkonto', 1)")
+            conn.commit()
+            conn.close()
+            storage = SQLiteStorage(pfad)
+            try:
+                konto = storage.konto_holen("Alt")
+                self.assertIsNone(konto.letzte_verzinsung)
+                konto.letzte_verzinsung = 7200.0
+                storage.update_kontostand(konto)
+                self.assertEqual(storage.konto_holen("Alt").letzte_verzinsung, 7200.0)
+            finally:
+                storage.schliessen()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import json
+import logging
+import unittest
+from logger_config import JsonLinesFormatter, ZugriffsLogSampler
+
+
+class TestLoggerConfig(unittest.TestCase):
+    """Test-Suite für JSON-Format und Sampling des Zugriffs-Logs."""
+
+    def _record(self, level=logging.INFO, msg="Inbound: %s", args=("GET /konten",)):
+        return logging.LogRecord("Softmaster_Bank.access", level, __file__, 1, msg, args, None)
+
+    def test_json_lines_format(self):
+        """Prüft, ob ein Eintrag als gültige JSON-Zeile inkl. Zusatzfeldern ausgegeben wird."""
+        record = self._record()
+        record.felder = {"status": 200}
+        zeile = JsonLinesFormatter().format(record)
+        daten = json.loads(zeile)
+        self.assertEqual(daten["nachricht"], "Inbound: GET /konten")
+        self.assertEqual(daten["status"], 200)
+
+    def test_sampling_oberhalb_schwelle(self):
+        """Prüft, ob oberhalb der Schwelle nur jeder n-te Eintrag durchkommt."""
+        sampler = ZugriffsLogSampler(schwelle=10, rate=5)
+        durchgelassen = sum(sampler.filter(self._record()) for _ in range(60))
+        # 10 vollständig + jeder 5. der restlichen 50 (bei Sekundenwechsel ggf. mehr)
+        self.assertLess(durchgelassen, 60)
+        self.assertGreaterEqual(durchgelassen, 20)
+        self.assertEqual(sampler.verworfen, 60 - durchgelassen)
+
+    def test_warnungen_werden_nie_verworfen(self):
+        """Prüft, ob Warnungen trotz Sampling immer geloggt werden."""
+        sampler = ZugriffsLogSampler(schwelle=1, rate=1000)
+        ergebnisse = [sampler.filter(self._record(level=logging.WARNING)) for _ in range(20)]
+        self.assertTrue(all(ergebnisse))
+
+
+if __name__ == "__main__":
+    unittest.main()
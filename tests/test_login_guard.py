@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import unittest
+from login_guard import PasswortPruefer, LoginUeberlastet
+from rate_limit import TokenBucket, TokenBucketLimiter
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test-Suite für Token-Bucket und Limiter."""
+
+    def test_burst_und_nachfuellen(self):
+        """Prüft, ob nach dem Burst gedrosselt und später wieder nachgefüllt wird."""
+        bucket = TokenBucket(rate=1.0, kapazitaet=2, jetzt=0.0)
+        self.assertEqual(bucket.entnehmen(jetzt=0.0), 0.0)
+        self.assertEqual(bucket.entnehmen(jetzt=0.0), 0.0)
+        self.assertAlmostEqual(bucket.entnehmen(jetzt=0.0), 1.0)
+        self.assertEqual(bucket.entnehmen(jetzt=1.0), 0.0)
+
+    def test_limiter_trennt_schluessel(self):
+        """Prüft, ob verschiedene Schlüssel unabhängige Kontingente haben."""
+        limiter = TokenBucketLimiter(rate=0.1, kapazitaet=1)
+        self.assertEqual(limiter.pruefen("ip:a", jetzt=0.0), 0.0)
+        self.assertGreater(limiter.pruefen("ip:a", jetzt=0.0), 0.0)
+        self.assertEqual(limiter.pruefen("ip:b", jetzt=0.0), 0.0)
+        self.assertEqual(limiter.abgelehnt, 1)
+
+    def test_limiter_begrenzt_schluessel(self):
+        """Prüft, ob die Anzahl der Buckets begrenzt bleibt."""
+        limiter = TokenBucketLimiter(rate=1, kapazitaet=1, max_schluessel=3)
+        for i in range(10):
+            limiter.pruefen(f"user:{i}")
+        self.assertEqual(len(limiter._buckets), 3)
+
+
+class TestPasswortPruefer(unittest.TestCase):
+    """Test-Suite für die Passwortprüfung außerhalb des Event-Loops."""
+
+    def test_pruefung_im_thread(self):
+        """Prüft, ob die Prüffunktion nicht im Event-Loop-Thread läuft."""
+        threads = []
+
+        def pruefen(passwort, passwort_hash):
+            threads.append(threading.current_thread().name)
+            return passwort == passwort_hash
+
+        pruefer = PasswortPruefer(pruefen, max_parallel=1)
+        self.assertTrue(asyncio.run(pruefer.pruefen("geheim", "geheim")))
+        self.assertFalse(asyncio.run(pruefer.pruefen("geheim", "falsch")))
+        self.assertTrue(all(name.startswith("passwort") for name in threads))
+
+    def test_warteschlange_voll(self):
+        """Prüft, ob bei voller Warteschlange LoginUeberlastet ausgelöst wird."""
+        freigabe = threading.Event()
+
+        def langsam(passwort, passwort_hash):
+            freigabe.wait(5)
+            return True
+
+        pruefer = PasswortPruefer(langsam, max_parallel=1, max_warteschlange=0, timeout=5)
+
+        async def szenario():
+            erster = asyncio.ensure_future(pruefer.pruefen("a", "a"))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(LoginUeberlastet):
+                await pruefer.pruefen("b", "b")
+            freigabe.set()
+            return await erster
+
+        self.assertTrue(asyncio.run(szenario()))
+
+    def test_timeout(self):
+        """Prüft, ob eine zu lange Prüfung mit LoginUeberlastet abbricht."""
+        freigabe = threading.Event()
+        pruefer = PasswortPruefer(lambda p, h: freigabe.wait(5), max_parallel=1, timeout=0.05)
+        with self.assertRaises(LoginUeberlastet):
+            asyncio.run(pruefer.pruefen("a", "a"))
+        freigabe.set()
+
+
+if __name__ == "__main__":
+    unittest.main()
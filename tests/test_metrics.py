@@ -0,0 +1,56 @@
+import unittest
+from metrics import MetricsRegistry, storage_zeitmessung, STORAGE_DAUER
+
+
+class TestMetrics(unittest.TestCase):
+    """Test-Suite für die Metrik-Registry und das Prometheus-Textformat."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_exposition(self):
+        """Prüft, ob Counter mit Labels korrekt ausgegeben werden."""
+        zaehler = self.registry.counter("test_total", "Testzähler.", ("route", "status"))
+        zaehler.inc(route="/konten", status=200)
+        zaehler.inc(2, route="/konten", status=200)
+        text = self.registry.exposition()
+        self.assertIn("# TYPE test_total counter", text)
+        self.assertIn('test_total{route="/konten",status="200"} 3', text)
+
+    def test_histogram_kumulativ(self):
+        """Prüft, ob Histogramm-Buckets kumulativ inkl. +Inf, Summe und Anzahl ausgegeben werden."""
+        histogramm = self.registry.histogram("dauer_seconds", "Dauer.", ("route",), buckets=(0.1, 1.0))
+        histogramm.observe(0.05, route="/a")
+        histogramm.observe(0.5, route="/a")
+        histogramm.observe(5, route="/a")
+        text = self.registry.exposition()
+        self.assertIn('dauer_seconds_bucket{route="/a",le="0.1"} 1', text)
+        self.assertIn('dauer_seconds_bucket{route="/a",le="1"} 2', text)
+        self.assertIn('dauer_seconds_bucket{route="/a",le="+Inf"} 3', text)
+        self.assertIn('dauer_seconds_count{route="/a"} 3', text)
+
+    def test_label_maskierung(self):
+        """Prüft, ob Anführungszeichen in Label-Werten maskiert werden."""
+        zaehler = self.registry.counter("maskiert_total", "Maskierung.", ("name",))
+        zaehler.inc(name='a"b')
+        self.assertIn('maskiert_total{name="a\\"b"} 1', self.registry.exposition())
+
+    def test_sammler(self):
+        """Prüft, ob Sammler-Funktionen beim Abruf ausgewertet werden."""
+        self.registry.sammler_hinzufuegen(lambda: [("cache_hits_total", "counter", "Treffer.", 7)])
+        self.assertIn("cache_hits_total 7", self.registry.exposition())
+
+    def test_storage_zeitmessung(self):
+        """Prüft, ob der Decorator die Dauer je Backend und Methode erfasst."""
+        class DummyStorage:
+            @storage_zeitmessung
+            def laden(self):
+                return []
+
+        DummyStorage().laden()
+        kind = STORAGE_DAUER._kind({"backend": "DummyStorage", "method": "laden"})
+        self.assertEqual(kind.anzahl, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from json_storage import JSONStorage
+from sqlite_storage import SQLiteStorage
+from write_behind_storage import WriteBehindStorage
+from migration import Migration, pruefsumme
+
+
+class TestMigration(unittest.TestCase):
+    """Test-Suite für die blockweise Migration zwischen den Backends."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.quelle = JSONStorage(os.path.join(self.verzeichnis.name, "konten.json"))
+        self.ziel = SQLiteStorage(os.path.join(self.verzeichnis.name, "bank.db"))
+        self.quelle.konten_schreiben(
+            [Girokonto(f"Kunde{i}", i, 500) if i % 2 else Sparkonto(f"Kunde{i}", i, 0.02) for i in range(25)]
+        )
+
+    def tearDown(self):
+        self.verzeichnis.cleanup()
+
+    def test_pruefsumme_unabhaengig_von_reihenfolge(self):
+        """Prüft, ob die Prüfsumme Reihenfolge und int/float-Darstellung ignoriert, Werte aber nicht."""
+        a = {"inhaber": "Tom", "kontostand": 1, "typ": "Girokonto", "extra": 0}
+        b = {"inhaber": "Jim", "kontostand": 2.0, "typ": "Sparkonto", "extra": 0.01}
+        self.assertEqual(pruefsumme([a, b]), pruefsumme([b, {**a, "kontostand": 1.0}]))
+        self.assertNotEqual(pruefsumme([a, b]), pruefsumme([a, {**b, "kontostand": 2.5}]))
+
+    def test_migration_und_erneuter_lauf_kopiert_nur_unterschiede(self):
+        """Prüft die vollständige Kopie und den Delta-Lauf nach Änderungen in der Quelle."""
+        ergebnis = Migration(self.quelle, self.ziel, chunk_groesse=10).ausfuehren()
+        self.assertEqual((ergebnis["zustand"], ergebnis["bloecke"], ergebnis["kopiert"]), ("fertig", 3, 25))
+        self.assertEqual(sorted(k.inhaber for k in self.ziel.laden()), sorted(k.inhaber for k in self.quelle.laden()))
+
+        self.quelle.konten_schreiben([Girokonto("Kunde1", 99, 500), Girokonto("Neu", 5, 0)])
+        ergebnis = Migration(self.quelle, self.ziel, chunk_groesse=10).ausfuehren()
+        self.assertEqual((ergebnis["kopiert"], ergebnis["unveraendert"]), (2, 24))
+        self.assertEqual(self.ziel.konto_holen("Kunde1").kontostand, 99)
+        self.assertEqual(ergebnis["fehlerhafte_bloecke"], [])
+
+    def test_write_behind_quelle_liefert_ungeflushte_aenderungen(self):
+        """Prüft, dass aus dem Write-Behind-Cache gelesene Änderungen vor dem Flush mitkopiert werden."""
+        quelle = WriteBehindStorage(self.quelle, os.path.join(self.verzeichnis.name, "redo.log"),
+                                    fsync_intervall=0, flush_intervall=3600)
+        quelle.update_kontostand(Girokonto("Kunde1", 99, 500))
+        ergebnis = Migration(quelle, self.ziel, chunk_groesse=10).ausfuehren()
+        self.assertEqual((ergebnis["zustand"], ergebnis["kopiert"]), ("fertig", 25))
+        self.assertEqual(self.ziel.konto_holen("Kunde1").kontostand, 99)
+        quelle.schliessen()
+
+    def test_fehler_im_ziel(self):
+        """Prüft, ob ein Schreibfehler als Zustand 'fehler' gemeldet wird."""
+        def kaputt(konten):
+            raise IOError("Platte voll")
+        self.ziel.konten_schreiben = kaputt
+        ergebnis = Migration(self.quelle, self.ziel).ausfuehren()
+        self.assertEqual(ergebnis["zustand"], "fehler")
+        self.assertIn("Platte voll", ergebnis["fehler"])
+
+
+if __name__ == "__main__":
+    unittest.main()
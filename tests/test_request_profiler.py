@@ -0,0 +1,93 @@
+import tempfile
+import threading
+import unittest
+from request_profiler import RequestProfiler
+
+
+def _rechenlast():
+    return sum(i * i for i in range(20000))
+
+
+class TestRequestProfiler(unittest.TestCase):
+    """Test-Suite für das On-Demand-Profiling einzelner Requests."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.profiler = RequestProfiler(self.verzeichnis.name, sample_rate=3, max_dateien=2)
+
+    def tearDown(self):
+        self.verzeichnis.cleanup()
+
+    def profilieren(self, *funktionen, art: str = "manuell") -> str:
+        token = self.profiler.starten()
+        for funktion in funktionen:
+            self.profiler.ausfuehren(funktion)
+        return self.profiler.speichern(self.profiler.anhalten(token), art)
+
+    def test_profil_speichern_und_auswerten(self):
+        """Prüft, ob mehrere Abschnitte zu einem Profil mit den Top-Funktionen zusammengeführt werden."""
+        profil_id = self.profilieren(_rechenlast, _rechenlast)
+        ergebnis = self.profiler.top_funktionen(profil_id, anzahl=50)
+        self.assertEqual(ergebnis["id"], profil_id)
+        rechenlast = [f for f in ergebnis["funktionen"] if "_rechenlast" in f["funktion"]]
+        self.assertEqual(rechenlast[0]["aufrufe"], 2)
+
+    def test_nur_ausgefuehrter_code_und_thread(self):
+        """Prüft, dass weder Code außerhalb von `ausfuehren` noch andere Threads erfasst werden."""
+        def fremde_last():
+            return sum(i for i in range(20000))
+
+        token = self.profiler.starten()
+        fremd = threading.Thread(target=lambda: [fremde_last() for _ in range(20)])
+        fremd.start()
+        _rechenlast()
+        self.profiler.ausfuehren(len, [])
+        fremd.join()
+        profil_id = self.profiler.speichern(self.profiler.anhalten(token))
+        funktionen = [f["funktion"] for f in self.profiler.top_funktionen(profil_id, anzahl=100)["funktionen"]]
+        self.assertFalse(any("_rechenlast" in f or "fremde_last" in f for f in funktionen))
+
+    def test_ohne_profilierung_direkt(self):
+        """Prüft, ob ohne aktives Profil die Funktion unverändert ausgeführt wird."""
+        self.assertEqual(self.profiler.ausfuehren(_rechenlast), _rechenlast())
+
+    def test_umschliessen_behaelt_signatur(self):
+        """Prüft, ob umschlossene Endpunkte Signatur und Doku behalten und async-Endpunkte unverändert bleiben."""
+        def endpunkt(name: str, betrag: float = 1.0):
+            """Doku."""
+            return name, betrag
+
+        async def async_endpunkt():
+            pass
+
+        umschlossen = self.profiler.umschliessen(endpunkt)
+        self.assertEqual(umschlossen("Tom", betrag=2.0), ("Tom", 2.0))
+        self.assertEqual((umschlossen.__name__, umschlossen.__doc__), ("endpunkt", "Doku."))
+        self.assertIs(self.profiler.umschliessen(async_endpunkt), async_endpunkt)
+
+    def test_nur_ein_profiler_gleichzeitig(self):
+        """Prüft, ob ein zweiter Request abgelehnt wird, solange einer profiliert wird."""
+        token = self.profiler.starten()
+        self.assertIsNone(self.profiler.starten())
+        self.profiler.speichern(self.profiler.anhalten(token))
+        self.profilieren()
+
+    def test_rotation(self):
+        """Prüft, ob nur die konfigurierte Anzahl an Profilen aufbewahrt wird."""
+        for _ in range(4):
+            self.profilieren(_rechenlast, art="sample")
+        self.assertEqual(len(self.profiler.auflisten()), 2)
+
+    def test_sampling_rate(self):
+        """Prüft, ob genau jeder n-te Request für das Sampling ausgewählt wird."""
+        faellig = [self.profiler.sampling_faellig() for _ in range(9)]
+        self.assertEqual(faellig.count(True), 3)
+
+    def test_ungueltige_id(self):
+        """Prüft, ob Pfadangaben als Profil-ID abgelehnt werden."""
+        with self.assertRaises(ValueError):
+            self.profiler.top_funktionen("../geheim")
+
+
+if __name__ == "__main__":
+    unittest.main()
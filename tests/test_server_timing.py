@@ -0,0 +1,41 @@
+import threading
+import unittest
+from contextvars import copy_context
+from server_timing import span, messung_starten, messung_beenden, header_wert, span_erfassen
+
+
+class TestServerTiming(unittest.TestCase):
+    """Test-Suite für die request-lokale Zeitmessung (Server-Timing)."""
+
+    def test_spans_werden_summiert(self):
+        """Prüft, ob gleichnamige Abschnitte im Header summiert werden."""
+        token = messung_starten()
+        span_erfassen("storage.konto_holen", 0.001)
+        span_erfassen("storage.konto_holen", 0.002)
+        with span("domain"):
+            pass
+        spans = messung_beenden(token)
+        header = header_wert(spans, 0.005)
+        self.assertIn("storage.konto_holen;dur=3.000", header)
+        self.assertIn("domain;dur=", header)
+        self.assertTrue(header.endswith("total;dur=5.000"))
+
+    def test_ohne_messung_keine_wirkung(self):
+        """Prüft, ob Spans außerhalb eines Requests ignoriert werden."""
+        with span("auth"):
+            pass
+        token = messung_starten()
+        self.assertEqual(messung_beenden(token), [])
+
+    def test_thread_mit_kopiertem_kontext(self):
+        """Prüft, ob Spans aus einem Worker-Thread (kopierter Kontext) im Request landen."""
+        token = messung_starten()
+        kontext = copy_context()
+        worker = threading.Thread(target=kontext.run, args=(span_erfassen, "storage.laden", 0.01))
+        worker.start()
+        worker.join()
+        self.assertEqual(messung_beenden(token), [("storage.laden", 0.01)])
+
+
+if __name__ == "__main__":
+    unittest.main()
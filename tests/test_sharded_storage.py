@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import unittest
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from sharded_storage import ShardedStorage, umverteilen
+
+
+class TestShardedStorage(unittest.TestCase):
+    """Test-Suite für die Verteilung der Konten auf mehrere SQLite-Dateien."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.pfad = os.path.join(self.verzeichnis.name, "shards")
+        self.storage = ShardedStorage(self.pfad, 4)
+        self.storage.konten_schreiben([Girokonto(f"Kunde{i}", 100, 500) for i in range(40)])
+
+    def tearDown(self):
+        self.storage.schliessen()
+        self.verzeichnis.cleanup()
+
+    def test_verteilung_und_zusammenfuehrung(self):
+        """Prüft, ob die Konten auf alle Shards verteilt und beim Laden zusammengeführt werden."""
+        self.assertTrue(all(not shard.ist_leer() for shard in self.storage.shards))
+        self.assertEqual(len(self.storage.laden()), 40)
+        konto = self.storage.konto_holen("KUNDE7")
+        self.assertEqual(konto.inhaber, "Kunde7")
+        self.assertTrue(self.storage.shards[self.storage.shard_index("kunde7")].name_existiert("Kunde7"))
+        self.assertEqual(len(self.storage.konten_holen([f"kunde{i}" for i in range(45)])), 40)
+        self.assertEqual(sum(len(b) for b in self.storage.konten_iterieren(7)), 40)
+
+    def test_konten_block_ueber_shardgrenzen(self):
+        """Prüft, ob Fortsetzungsmarken lückenlos über alle Shards laufen."""
+        namen, marke = [], None
+        while True:
+            zeilen, marke = self.storage.konten_block(marke, 7)
+            namen += [z["inhaber"] for z in zeilen]
+            if len(zeilen) < 7:
+                break
+        self.assertEqual(namen, [z["inhaber"] for b in self.storage.konten_iterieren(7) for z in b])
+
+    def test_konto_hinzufuegen_duplikat(self):
+        """Prüft Duplikat-Erkennung mit Vorschlägen über alle Shards."""
+        with self.assertRaises(ValueError) as kontext:
+            self.storage.konto_hinzufuegen(Sparkonto("kunde3", 1, 0.01))
+        self.assertIn("Vorschläge", str(kontext.exception))
+        abgelehnt = self.storage.mehrere_konten_hinzufuegen([Girokonto("Kunde1", 1, 0), Girokonto("Neu", 1, 0)])
+        self.assertEqual([k.inhaber for k in abgelehnt], ["Kunde1"])
+
+    def test_transaktion_ueber_shards(self):
+        """Prüft Überweisungen zwischen Shards: gemeinsam geschrieben oder vollständig verworfen."""
+        von, an = "Kunde0", next(f"Kunde{i}" for i in range(1, 40)
+                                 if self.storage.shard_index(f"Kunde{i}") != self.storage.shard_index("Kunde0"))
+        with self.storage.transaktion(von, an) as konten:
+            konten[von].abheben(50)
+            konten[an].einzahlen(50)
+        with self.assertRaises(ValueError):
+            with self.storage.transaktion(von, an) as konten:
+                konten[an].einzahlen(1000)
+                konten[von].abheben(1000)  # Dispo 500 -> ValueError
+        self.assertEqual((self.storage.konto_holen(von).kontostand, self.storage.konto_holen(an).kontostand), (50, 150))
+
+    def test_parallele_ueberweisungen_erhalten_summe(self):
+        """Prüft gegenläufige Überweisungen aus mehreren Threads (keine Verklemmung, kein Geldverlust)."""
+        def lauf(richtung):
+            for i in range(20):
+                a, b = f"Kunde{i}", f"Kunde{39 - i}"
+                von, an = (a, b) if richtung else (b, a)
+                with self.storage.transaktion(von, an) as konten:
+                    konten[von].abheben(10)
+                    konten[an].einzahlen(10)
+        threads = [threading.Thread(target=lauf, args=(r,)) for r in (True, False, True, False)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sum(k.kontostand for k in self.storage.laden()), 4000)
+
+    def test_shard_anzahl_geschuetzt_und_umverteilen(self):
+        """Prüft, ob eine abweichende Shard-Anzahl abgelehnt und per Umverteilen migriert wird."""
+        with self.assertRaises(ValueError):
+            ShardedStorage(self.pfad, 8)
+        ziel = os.path.join(self.verzeichnis.name, "shards8")
+        ergebnis = umverteilen(self.pfad, ziel, 8, chunk_groesse=16)
+        self.assertEqual((ergebnis["zustand"], ergebnis["kopiert"]), ("fertig", 40))
+        neu = ShardedStorage(ziel, 8)
+        try:
+            self.assertEqual(sorted(k.inhaber for k in neu.laden()), sorted(k.inhaber for k in self.storage.laden()))
+        finally:
+            neu.schliessen()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+from single_flight import SingleFlight, SINGLE_FLIGHT
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test-Suite für das Bündeln gleichzeitiger identischer Leseanfragen."""
+
+    def setUp(self):
+        self.aufrufe = 0
+        self.generation = 0
+
+    async def langsam(self, ergebnis=b"[]", fehler=None):
+        self.aufrufe += 1
+        await asyncio.sleep(0.02)
+        if fehler is not None:
+            raise fehler
+        return ergebnis
+
+    def flight(self, routen=("konten",)):
+        return SingleFlight(routen, generation=lambda: self.generation)
+
+    def test_gleichzeitige_anfragen_teilen_eine_berechnung(self):
+        flight = self.flight()
+        geteilt = SINGLE_FLIGHT._kind({"route": "konten", "ergebnis": "geteilt"}).wert
+
+        async def lauf():
+            return await asyncio.gather(*(
+                flight.ausfuehren("konten", (0, None), lambda: self.langsam(b"[1]")) for _ in range(5)
+            ))
+
+        self.assertEqual(asyncio.run(lauf()), [b"[1]"] * 5)
+        self.assertEqual(self.aufrufe, 1)
+        self.assertEqual(SINGLE_FLIGHT._kind({"route": "konten", "ergebnis": "geteilt"}).wert, geteilt + 4)
+        self.assertEqual(flight.laufend(), 0)
+
+    def test_andere_parameter_route_und_generation_getrennt(self):
+        """Prüft, dass Anfragen nach einem Schreibvorgang nicht an ältere Läufe angehängt werden."""
+        flight = self.flight()
+
+        async def lauf():
+            erste = asyncio.ensure_future(flight.ausfuehren("konten", (0, None), self.langsam))
+            await asyncio.sleep(0)
+            self.generation += 1
+            await asyncio.gather(
+                erste,
+                flight.ausfuehren("konten", (0, None), self.langsam),
+                flight.ausfuehren("konten", (0, 10), self.langsam),
+                flight.ausfuehren("suche", "tom", self.langsam),
+                flight.ausfuehren("suche", "tom", self.langsam),
+            )
+
+        asyncio.run(lauf())
+        self.assertEqual(self.aufrufe, 5)
+
+    def test_fehler_an_alle_wartenden(self):
+        flight = self.flight()
+
+        async def lauf():
+            return await asyncio.gather(*(
+                flight.ausfuehren("konten", (0, None), lambda: self.langsam(fehler=ValueError("kaputt")))
+                for _ in range(3)
+            ), return_exceptions=True)
+
+        ergebnisse = asyncio.run(lauf())
+        self.assertTrue(all(isinstance(e, ValueError) for e in ergebnisse))
+        self.assertEqual(self.aufrufe, 1)
+        self.assertEqual(flight.laufend(), 0)
+
+    def test_abbruch_des_ersten_wartenden(self):
+        """Prüft, dass die geteilte Berechnung weiterläuft, wenn der erste Client abbricht."""
+        flight = self.flight()
+
+        async def lauf():
+            erste = asyncio.ensure_future(flight.ausfuehren("konten", (0, None), self.langsam))
+            zweite = asyncio.ensure_future(flight.ausfuehren("konten", (0, None), self.langsam))
+            await asyncio.sleep(0)
+            erste.cancel()
+            return await zweite
+
+        self.assertEqual(asyncio.run(lauf()), b"[]")
+        self.assertEqual(self.aufrufe, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
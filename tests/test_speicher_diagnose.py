@@ -0,0 +1,44 @@
+import unittest
+from speicher_diagnose import SpeicherDiagnose
+from girokonto import Girokonto
+
+
+class TestSpeicherDiagnose(unittest.TestCase):
+    """Test-Suite für tracemalloc-Snapshots und deren Vergleich."""
+
+    def setUp(self):
+        self.diagnose = SpeicherDiagnose(max_snapshots=3)
+        self.diagnose.starten()
+
+    def tearDown(self):
+        self.diagnose.stoppen()
+
+    def test_snapshot_ohne_aufzeichnung(self):
+        """Prüft, ob ein Snapshot ohne aktive Aufzeichnung abgelehnt wird."""
+        self.diagnose.stoppen()
+        with self.assertRaises(RuntimeError):
+            self.diagnose.snapshot_erstellen()
+
+    def test_differenz_zeigt_neue_allokationen(self):
+        """Prüft, ob die Differenz den Zuwachs durch neu erstellte Konten enthält."""
+        vorher = self.diagnose.snapshot_erstellen()
+        konten = [Girokonto(f"Kunde{i}", 100, 50) for i in range(2000)]
+        nachher = self.diagnose.snapshot_erstellen()
+        differenz = self.diagnose.differenz(vorher, nachher, anzahl=10)
+        self.assertGreater(sum(e["differenz_bytes"] for e in differenz), 0)
+        self.assertEqual(len(konten), 2000)
+
+    def test_snapshot_begrenzung(self):
+        """Prüft, ob nur die letzten Snapshots aufbewahrt werden."""
+        ids = [self.diagnose.snapshot_erstellen() for _ in range(5)]
+        self.assertEqual(self.diagnose.status()["snapshots"], ids[-3:])
+        with self.assertRaises(ValueError):
+            self.diagnose.top_allokationen(ids[0])
+
+    def test_bericht(self):
+        """Prüft, ob der Textbericht für das Programmende erzeugt wird."""
+        self.assertIn("Top 5 Allokationsstellen", self.diagnose.bericht(5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from girokonto import Girokonto
+from json_storage import JSONStorage
+from sqlite_storage import SQLiteStorage
+
+
+class TestStorageBackends(unittest.TestCase):
+    """Test-Suite für backend-übergreifende Storage-Funktionen (JSON und SQLite)."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.json_pfad = os.path.join(self.verzeichnis.name, "konten.json")
+        self.backends = [
+            JSONStorage(self.json_pfad),
+            SQLiteStorage(os.path.join(self.verzeichnis.name, "bank.db")),
+        ]
+
+    def tearDown(self):
+        self.verzeichnis.cleanup()
+
+    def test_ist_leer(self):
+        """Prüft den Existenz-Check vor und nach dem Anlegen eines Kontos."""
+        for storage in self.backends:
+            with self.subTest(backend=type(storage).__name__):
+                self.assertTrue(storage.ist_leer())
+                storage.konto_hinzufuegen(Girokonto("Tom", 100, 0))
+                self.assertFalse(storage.ist_leer())
+
+    def test_transaktion_schreibt_gemeinsam_oder_gar_nicht(self):
+        """Prüft, ob eine Überweisung atomar geschrieben und bei Fehlern verworfen wird."""
+        for storage in self.backends:
+            with self.subTest(backend=type(storage).__name__):
+                storage.konten_schreiben([Girokonto("Tom", 100, 0), Girokonto("Jim", 0, 0)])
+                with storage.transaktion("Tom", "jim") as konten:
+                    konten["Tom"].abheben(60)
+                    konten["jim"].einzahlen(60)
+                with self.assertRaises(ValueError):
+                    with storage.transaktion("Tom", "Jim") as konten:
+                        konten["Jim"].einzahlen(100)
+                        konten["Tom"].abheben(100)  # Dispo 0 -> ValueError
+                self.assertEqual(storage.konto_holen("Tom").kontostand, 40)
+                self.assertEqual(storage.konto_holen("Jim").kontostand, 60)
+
+    def test_konten_holen(self):
+        """Prüft das Holen mehrerer Konten (case-insensitive, fehlende Namen ausgelassen)."""
+        for storage in self.backends:
+            with self.subTest(backend=type(storage).__name__):
+                storage.konten_schreiben([Girokonto("Tom", 1, 0), Girokonto("Jim", 2, 0)])
+                gefunden = storage.konten_holen(["TOM", "jim", "Anna"])
+                self.assertEqual({n: k.kontostand for n, k in gefunden.items()}, {"tom": 1, "jim": 2})
+
+    def test_konten_holen_viele_namen(self):
+        """Prüft das Holen von mehr Namen, als SQLite in einer IN-Abfrage binden kann."""
+        for storage in self.backends:
+            with self.subTest(backend=type(storage).__name__):
+                storage.konten_schreiben([Girokonto(f"Kunde{i}", i, 0) for i in range(0, 2000, 2)])
+                gefunden = storage.konten_holen([f"kunde{i}" for i in range(2000)])
+                self.assertEqual(len(gefunden), 1000)
+                self.assertEqual(gefunden["kunde1998"].kontostand, 1998)
+
+    def test_namen_existieren(self):
+        """Prüft die mengenweise Duplikat-Prüfung (case-insensitive, normalisiert)."""
+        for storage in self.backends:
+            with self.subTest(backend=type(storage).__name__):
+                storage.konten_schreiben([Girokonto("Tom", 1, 0), Girokonto("Jim", 1, 0)])
+                self.assertEqual(storage.namen_existieren(["tom", " JIM ", "Anna"]), {"tom", "jim"})
+                self.assertEqual(storage.namen_existieren([]), set())
+
+    def test_mehrere_konten_hinzufuegen(self):
+        """Prüft, ob nur neue Namen angelegt und Duplikate (auch innerhalb der Liste) zurückgegeben werden."""
+        for storage in self.backends:
+            with self.subTest(backend=type(storage).__name__):
+                storage.konten_schreiben([Girokonto("Tom", 1, 0)])
+                neu = [Girokonto("TOM", 2, 0), Girokonto("Anna", 3, 0), Girokonto("anna", 4, 0)]
+                abgelehnt = storage.mehrere_konten_hinzufuegen(neu)
+                self.assertEqual([k.kontostand for k in abgelehnt], [2, 4])
+                self.assertEqual(sorted(k.inhaber for k in storage.laden()), ["Anna", "Tom"])
+
+    def test_konten_iterieren(self):
+        """Prüft, ob die blockweise Iteration alle Konten in Blöcken liefert."""
+        konten = [Girokonto(f"Kunde{i}", i, 0) for i in range(25)]
+        for storage in self.backends:
+            with self.subTest(backend=type(storage).__name__):
+                storage.konten_schreiben(konten)
+                bloecke = list(storage.konten_iterieren(10))
+                self.assertEqual([len(b) for b in bloecke], [10, 10, 5])
+                self.assertEqual(bloecke[2][-1]["inhaber"], "Kunde24")
+
+    def test_konten_block_fortsetzen(self):
+        """Prüft das blockweise Lesen über Fortsetzungsmarken inkl. später angelegter Konten."""
+        for storage in self.backends:
+            with self.subTest(backend=type(storage).__name__):
+                storage.konten_schreiben([Girokonto(f"Kunde{i}", i, 0) for i in range(12)])
+                namen, marke = [], None
+                while True:
+                    zeilen, marke = storage.konten_block(marke, 5)
+                    namen += [z["inhaber"] for z in zeilen]
+                    if len(namen) == 5:
+                        storage.konto_hinzufuegen(Girokonto("Neu", 1, 0))
+                    if len(zeilen) < 5:
+                        break
+                self.assertEqual(namen, [f"Kunde{i}" for i in range(12)] + ["Neu"])
+                self.assertEqual(storage.konten_block(marke, 5)[0], [])
+
+    def test_konten_iterieren_json_kleine_chunks(self):
+        """Prüft den inkrementellen JSON-Parser, wenn Objekte über Chunk-Grenzen reichen."""
+        storage = JSONStorage(self.json_pfad)
+        storage.konten_schreiben([Girokonto(f"Kunde{i}", i, 0) for i in range(7)])
+        zeilen = [z for b in storage.konten_iterieren(3, chunk_groesse=5) for z in b]
+        self.assertEqual([z["inhaber"] for z in zeilen], [f"Kunde{i}" for i in range(7)])
+
+    def test_ist_leer_json_leere_liste(self):
+        """Prüft, ob eine JSON-Datei mit leerer Liste (auch mit Leerraum) als leer gilt."""
+        with open(self.json_pfad, "w", encoding="utf-8") as f:
+            f.write("[\n  \n]")
+        self.assertTrue(JSONStorage(self.json_pfad).ist_leer())
+        with open(self.json_pfad, "w", encoding="utf-8") as f:
+            json.dump([{"inhaber": "Tom", "kontostand": 1, "typ": "Girokonto", "extra": 0}], f, indent=4)
+        self.assertFalse(JSONStorage(self.json_pfad).ist_leer())
+
+
+class TestSQLiteVerbindungen(unittest.TestCase):
+    """Test-Suite für die Trennung von Lese- und Schreib-Verbindungen (WAL)."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.storage = SQLiteStorage(os.path.join(self.verzeichnis.name, "bank.db"), lese_verbindungen=2)
+        self.storage.konten_schreiben([Girokonto(f"Kunde{i}", i, 0) for i in range(5)])
+
+    def tearDown(self):
+        self.storage.schliessen()
+        self.verzeichnis.cleanup()
+
+    def test_wal_modus(self):
+        """Prüft, ob die Datenbank im WAL-Modus läuft."""
+        with self.storage._lesen() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_lese_verbindung_schreibgeschuetzt(self):
+        """Prüft, ob Lese-Verbindungen keine Änderungen zulassen."""
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.storage._lesen() as conn:
+                conn.execute("DELETE FROM konten")
+        self.assertEqual(len(self.storage.laden()), 5)
+
+    def test_snapshot_waehrend_schreibvorgang(self):
+        """Prüft, ob eine Lese-Transaktion parallele Schreibvorgänge nicht sieht und nicht blockiert."""
+        with self.storage._lesen() as conn:
+            vorher = conn.execute("SELECT COUNT(*) FROM konten").fetchone()[0]
+            self.storage.konten_schreiben([Girokonto("Neu", 1, 0)])
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM konten").fetchone()[0], vorher)
+        self.assertEqual(len(self.storage.laden()), vorher + 1)
+
+    def test_konten_seite(self):
+        """Prüft die seitenweise Auflistung inkl. Gesamtanzahl."""
+        gesamt, seite = self.storage.konten_seite(3, 10)
+        self.assertEqual((gesamt, [k.inhaber for k in seite]), (5, ["Kunde3", "Kunde4"]))
+
+    def test_pool_verwendet_verbindungen_wieder(self):
+        """Prüft, ob Lese-Verbindungen (auch nach Fehlern) in den Pool zurückkehren."""
+        self.storage.konto_holen("Kunde1")
+        with self.assertRaises(ValueError):
+            self.storage.konto_holen("Niemand")
+        self.assertEqual(self.storage._lesepool.qsize(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
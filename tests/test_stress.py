@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+from benchmarks.stress import stresstest
+
+
+class TestNebenlaeufigkeit(unittest.TestCase):
+    """
+    Stresstest: Parallele Einzahlungen, Abhebungen und Überweisungen dürfen kein Geld
+    erzeugen oder vernichten und keine Dispo-Grenze verletzen.
+    """
+
+    def _pruefen(self, backend, **parameter):
+        with tempfile.TemporaryDirectory() as verzeichnis:
+            ergebnis = stresstest(backend, verzeichnis, **parameter)
+        self.assertEqual(ergebnis["verstoesse"], [])
+        self.assertGreater(ergebnis["ops_pro_s"], 0)
+        return ergebnis
+
+    def test_threads_json(self):
+        """Prüft JSON-Storage mit vielen Threads auf einer Instanz."""
+        self._pruefen("json", threads=8, operationen=50)
+
+    def test_threads_sqlite(self):
+        """Prüft SQLite-Storage mit vielen Threads auf einer Instanz."""
+        self._pruefen("sql", threads=8, operationen=50)
+
+    def test_prozesse_json(self):
+        """Prüft JSON-Storage mit mehreren Prozessen (Datei-Sperre)."""
+        self._pruefen("json", threads=2, prozesse=2, operationen=30)
+
+    def test_prozesse_sqlite(self):
+        """Prüft SQLite-Storage mit mehreren Prozessen (BEGIN IMMEDIATE)."""
+        self._pruefen("sql", threads=2, prozesse=2, operationen=30)
+
+    def test_ablehnungen_schreiben_nichts(self):
+        """Prüft, ob abgelehnte Abhebungen (Dispo überschritten) zurückgerollt werden."""
+        ergebnis = self._pruefen("sql", threads=4, operationen=50, anzahl_konten=2)
+        self.assertGreater(ergebnis["abgelehnt"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from token_cache import TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+    """Test-Suite für den LRU-Cache validierter JWT-Tokens."""
+
+    def setUp(self):
+        self.cache = TokenCache(max_eintraege=2)
+        self.claims = {"sub": "admin", "role": "admin", "exp": 2000}
+
+    def test_treffer_nach_speichern(self):
+        """Prüft, ob ein gespeicherter Token als Treffer gezählt wird."""
+        self.assertIsNone(self.cache.holen("token-a", jetzt=1000))
+        self.cache.speichern("token-a", self.claims, jetzt=1000)
+        self.assertEqual(self.cache.holen("token-a", jetzt=1000), self.claims)
+        statistik = self.cache.statistik()
+        self.assertEqual(statistik["treffer"], 1)
+        self.assertEqual(statistik["fehlschlaege"], 1)
+
+    def test_ablauf_entfernt_eintrag(self):
+        """Prüft, ob ein Token nach seinem 'exp' nicht mehr geliefert wird."""
+        self.cache.speichern("token-a", self.claims, jetzt=1000)
+        self.assertIsNone(self.cache.holen("token-a", jetzt=2000))
+        self.assertEqual(self.cache.statistik()["groesse"], 0)
+
+    def test_lru_verdraengung(self):
+        """Prüft, ob bei voller Kapazität der am längsten ungenutzte Token verdrängt wird."""
+        self.cache.speichern("token-a", self.claims, jetzt=1000)
+        self.cache.speichern("token-b", self.claims, jetzt=1000)
+        self.cache.holen("token-a", jetzt=1000)  # 'a' wird zuletzt genutzt
+        self.cache.speichern("token-c", self.claims, jetzt=1000)
+        self.assertIsNone(self.cache.holen("token-b", jetzt=1000))
+        self.assertIsNotNone(self.cache.holen("token-a", jetzt=1000))
+        self.assertEqual(self.cache.statistik()["verdraengt"], 1)
+
+    def test_token_ohne_exp_nicht_gecacht(self):
+        """Prüft, ob Tokens ohne Ablaufdatum nicht im Cache landen."""
+        self.cache.speichern("token-a", {"sub": "admin", "role": "admin"}, jetzt=1000)
+        self.assertIsNone(self.cache.holen("token-a", jetzt=1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
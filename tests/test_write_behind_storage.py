@@ -0,0 +1,136 @@
+import os
+import tempfile
+import threading
+import unittest
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from json_storage import JSONStorage
+from write_behind_storage import WriteBehindStorage
+
+
+class TestWriteBehindStorage(unittest.TestCase):
+    """Test-Suite für den Write-Behind-Cache mit Redo-Log (JSON-Backend)."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.json_pfad = os.path.join(self.verzeichnis.name, "konten.json")
+        self.log_pfad = os.path.join(self.verzeichnis.name, "redo.log")
+
+    def tearDown(self):
+        self.verzeichnis.cleanup()
+
+    def _storage(self, flush_intervall=3600):
+        return WriteBehindStorage(JSONStorage(self.json_pfad), self.log_pfad,
+                                  fsync_intervall=0, flush_intervall=flush_intervall)
+
+    def test_aenderungen_erst_nach_flush_im_backend(self):
+        """Prüft, ob Updates sofort lesbar sind, das Backend aber erst beim Flush schreibt."""
+        storage = self._storage()
+        storage.konto_hinzufuegen(Girokonto("Tom", 100, 50))
+        konto = storage.konto_holen("tom")
+        konto.einzahlen(50)
+        storage.update_kontostand(konto)
+
+        self.assertEqual(storage.konto_holen("Tom").kontostand, 150)
+        self.assertEqual(JSONStorage(self.json_pfad).laden(), [])
+
+        self.assertEqual(storage.flush(), 1)
+        self.assertEqual(JSONStorage(self.json_pfad).konto_holen("Tom").kontostand, 150)
+        storage.schliessen()
+
+    def test_wiederherstellung_nach_absturz(self):
+        """Prüft, ob nicht geflushte Änderungen beim Neustart aus dem Redo-Log eingespielt werden."""
+        storage = self._storage()
+        storage.konto_hinzufuegen(Sparkonto("Jim", 200, 0.02))
+        konto = storage.konto_holen("Jim")
+        konto.abheben(50)
+        storage.update_kontostand(konto)
+        # Absturz simulieren: kein schliessen(), zusätzlich eine abgeschnittene Zeile
+        storage._stopp.set()
+        storage._log.write('{"inhaber": "Jim", "kontost')
+        storage._log.flush()
+
+        neu = self._storage()
+        self.assertEqual(neu.konto_holen("Jim").kontostand, 150)
+        self.assertEqual(JSONStorage(self.json_pfad).konto_holen("Jim").kontostand, 150)
+        self.assertEqual(neu.ausstehend(), 0)
+        neu.schliessen()
+
+    def test_fehlgeschlagener_flush_bleibt_ausstehend(self):
+        """Prüft, ob Änderungen nach einem Backend-Fehler erneut übertragen werden."""
+        storage = self._storage()
+        storage.konto_hinzufuegen(Girokonto("Tom", 100, 0))
+        original = storage.backend.konten_schreiben
+
+        def fehler(konten):
+            raise IOError("Backend nicht erreichbar")
+
+        storage.backend.konten_schreiben = fehler
+        with self.assertRaises(IOError):
+            storage.flush()
+        self.assertEqual(storage.ausstehend(), 1)
+
+        storage.backend.konten_schreiben = original
+        storage.schliessen()
+        self.assertEqual(JSONStorage(self.json_pfad).konto_holen("Tom").kontostand, 100)
+
+    def test_update_uebernimmt_letzte_verzinsung(self):
+        """Prüft, ob update_kontostand auch den Zeitstempel der letzten Verzinsung übernimmt."""
+        storage = self._storage()
+        storage.konto_hinzufuegen(Sparkonto("Jim", 100, 10))
+        konto = storage.konto_holen("Jim")
+        konto.kontostand, konto.letzte_verzinsung = 110, 3600.0
+        storage.update_kontostand(konto)
+        self.assertEqual(storage.konto_holen("Jim").letzte_verzinsung, 3600.0)
+        storage.schliessen()
+
+    def test_konten_block_setzt_nach_letztem_schluessel_fort(self):
+        """Prüft, dass neue Konten die Marke nicht verschieben (keine doppelten oder fehlenden Zeilen)."""
+        storage = self._storage()
+        storage.konten_schreiben([Girokonto(f"Kunde{i:02d}", i, 0) for i in range(12)])
+        namen, marke = [], None
+        while True:
+            zeilen, marke = storage.konten_block(marke, 5)
+            namen += [z["inhaber"] for z in zeilen]
+            if len(namen) == 5:
+                storage.konto_hinzufuegen(Girokonto("Anton", 1, 0))
+                storage.konto_hinzufuegen(Girokonto("Zora", 1, 0))
+            if len(zeilen) < 5:
+                break
+        self.assertEqual(namen, [f"Kunde{i:02d}" for i in range(12)] + ["Zora"])
+        self.assertEqual(storage.konten_block(marke, 5), ([], marke))
+        storage.schliessen()
+
+    def test_transaktion_blockiert_andere_konten_nicht(self):
+        """Prüft, dass während eines Transaktionsblocks andere Konten gelesen und gebucht werden."""
+        storage = self._storage()
+        storage.konten_schreiben([Girokonto("Tom", 100, 0), Girokonto("Ana", 100, 0)])
+        fertig = threading.Event()
+
+        def andere_konten():
+            with storage.transaktion("Ana") as konten:
+                konten["Ana"].einzahlen(5)
+            storage.laden()
+            fertig.set()
+
+        with storage.transaktion("Tom") as konten:
+            konten["Tom"].einzahlen(10)
+            thread = threading.Thread(target=andere_konten)
+            thread.start()
+            self.assertTrue(fertig.wait(5))
+        thread.join()
+        self.assertEqual(storage.konto_holen("Tom").kontostand, 110)
+        self.assertEqual(storage.konto_holen("Ana").kontostand, 105)
+        storage.schliessen()
+
+    def test_duplikat_wird_abgelehnt(self):
+        """Prüft, ob doppelte Namen (case-insensitive) weiterhin abgelehnt werden."""
+        storage = self._storage()
+        storage.konto_hinzufuegen(Girokonto("Tom", 100, 0))
+        with self.assertRaises(ValueError):
+            storage.konto_hinzufuegen(Girokonto("tom", 10, 0))
+        storage.schliessen()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from girokonto import Girokonto
+from sparkonto import Sparkonto
+from sqlite_storage import SQLiteStorage
+from zins_planer import ZinsPlaner
+
+
+class TestZinsPlaner(unittest.TestCase):
+    """Test-Suite für die zeitgesteuerte, blockweise Zinsgutschrift."""
+
+    def setUp(self):
+        self.verzeichnis = tempfile.TemporaryDirectory()
+        self.storage = SQLiteStorage(os.path.join(self.verzeichnis.name, "bank.db"))
+        self.storage.konten_schreiben(
+            [Sparkonto(f"Spar{i}", 100, 10) if i % 2 else Girokonto(f"Giro{i}", 100, 0) for i in range(10)]
+        )
+        self.checkpoint = os.path.join(self.verzeichnis.name, "zins.json")
+
+    def tearDown(self):
+        self.storage.schliessen()
+        self.verzeichnis.cleanup()
+
+    def planer(self):
+        return ZinsPlaner(lambda: self.storage, self.checkpoint, intervall=3600, chunk_groesse=3, pause=0)
+
+    def staende(self):
+        return {k.inhaber: round(k.kontostand, 2) for k in self.storage.laden()}
+
+    def test_lauf_verzinst_nur_sparkonten_einmal_je_periode(self):
+        """Prüft den Lauf, den Checkpoint und dass eine abgeschlossene Periode nicht erneut läuft."""
+        planer = self.planer()
+        asyncio.run(planer.lauf_ausfuehren(7))
+        staende = self.staende()
+        self.assertEqual(staende["Spar1"], 110)
+        self.assertEqual(staende["Giro0"], 100)
+        status = planer.status()
+        self.assertEqual((status["periode"], status["fertig"], status["verbucht"], status["position"]), (7, True, 5, 10))
+        # Neuer Planer (Neustart): Periode 7 ist abgeschlossen -> keine Änderung durch die Schleife
+        neu = self.planer()
+        self.assertTrue(neu.status()["fertig"])
+
+    def test_fortsetzen_nach_unterbrechung(self):
+        """Prüft, ob ein unterbrochener Lauf ab der Checkpoint-Position fortgesetzt wird."""
+        with open(self.checkpoint, "w", encoding="utf-8") as f:
+            json.dump({"periode": 7, "position": 6, "verbucht": 3, "fertig": False,
+                       "offen": None, "offen_bis": 0, "pruefen": []}, f)
+        asyncio.run(self.planer().lauf_ausfuehren(7))
+        staende = self.staende()
+        self.assertEqual([staende[f"Spar{i}"] for i in (1, 3, 5, 7, 9)], [100, 100, 100, 110, 110])
+
+    def test_liest_jeden_block_neu(self):
+        """Prüft, dass kein Snapshot über den Lauf offen bleibt: später angelegte Konten werden erfasst."""
+        planer = self.planer()
+        lesen = self.storage.konten_block
+
+        def block_mit_neuanlage(marke, anzahl):
+            if marke is not None and not self.storage.name_existiert("Spar99"):
+                self.storage.konto_hinzufuegen(Sparkonto("Spar99", 100, 10))
+            return lesen(marke, anzahl)
+
+        self.storage.konten_block = block_mit_neuanlage
+        asyncio.run(planer.lauf_ausfuehren(7))
+        self.assertEqual(self.staende()["Spar99"], 110)
+        self.assertEqual(planer.status()["verbucht"], 6)
+
+    def test_offener_block_nach_absturz(self):
+        """Prüft die Klärung eines offenen Blocks: verzinst -> überspringen, unverändert -> nachholen."""
+        self.storage.konten_schreiben([Sparkonto("Spar1", 110, 10)])  # Commit erfolgt, Checkpoint nicht
+        with open(self.checkpoint, "w", encoding="utf-8") as f:
+            json.dump({"periode": 7, "position": 0, "verbucht": 0, "fertig": False,
+                       "offen": {"Spar1": [100, 110], "Spar3": [100, 110]}, "offen_bis": 4, "pruefen": []}, f)
+        planer = self.planer()
+        asyncio.run(planer.lauf_ausfuehren(7))
+        staende = self.staende()
+        self.assertEqual([staende[f"Spar{i}"] for i in (1, 3, 5, 7, 9)], [110] * 5)
+        self.assertEqual(planer.status()["verbucht"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """
+    Begrenzter LRU-Cache für bereits validierte JWT-Tokens.
+
+    Der Schlüssel ist der SHA-256-Hash des Tokens (der Token selbst wird nicht
+    im Speicher gehalten). Gespeichert werden die dekodierten Claims bis zum
+    Ablaufzeitpunkt (`exp`) des Tokens. Abgelaufene Einträge werden beim Zugriff
+    und beim Einfügen entfernt.
+
+    Attributes:
+        max_eintraege (int): Maximale Anzahl gecachter Tokens (0 deaktiviert den Cache).
+        treffer (int): Anzahl der Cache-Treffer.
+        fehlschlaege (int): Anzahl der Cache-Fehlschläge (Token musste dekodiert werden).
+        verdraengt (int): Anzahl der wegen Platzmangel entfernten Einträge.
+        abgelaufen (int): Anzahl der wegen Ablauf entfernten Einträge.
+    """
+
+    def __init__(self, max_eintraege: int = 1024):
+        self.max_eintraege = max_eintraege
+        self._eintraege = OrderedDict()
+        self._lock = threading.Lock()
+        self.treffer = 0
+        self.fehlschlaege = 0
+        self.verdraengt = 0
+        self.abgelaufen = 0
+
+    @staticmethod
+    def _schluessel(token: str) -> bytes:
+        """Berechnet den Cache-Schlüssel (SHA-256-Digest) eines Tokens."""
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def holen(self, token: str, jetzt: float = None):
+        """
+        Liefert die gecachten Claims eines Tokens, sofern vorhanden und nicht abgelaufen.
+
+        Args:
+            token (str): Der JWT-Token aus dem Authorization-Header.
+            jetzt (float): Optionaler Zeitpunkt (Unix-Zeit), Standard ist `time.time()`.
+
+        Returns:
+            dict | None: Die dekodierten Claims oder None bei einem Cache-Fehlschlag.
+        """
+        if self.max_eintraege <= 0:
+            return None
+        schluessel = self._schluessel(token)
+        jetzt = time.time() if jetzt is None else jetzt
+        with self._lock:
+            eintrag = self._eintraege.get(schluessel)
+            if eintrag is None:
+                self.fehlschlaege += 1
+                return None
+            claims, ablauf = eintrag
+            if ablauf <= jetzt:
+                del self._eintraege[schluessel]
+                self.abgelaufen += 1
+                self.fehlschlaege += 1
+                return None
+            self._eintraege.move_to_end(schluessel)
+            self.treffer += 1
+            return claims
+
+    def speichern(self, token: str, claims: dict, jetzt: float = None):
+        """
+        Legt die Claims eines erfolgreich validierten Tokens im Cache ab.
+
+        Tokens ohne `exp`-Claim werden nicht gecacht, da ihre Gültigkeit nicht
+        begrenzt ist.
+
+        Args:
+            token (str): Der validierte JWT-Token.
+            claims (dict): Die von `jwt.decode` gelieferten Claims.
+            jetzt (float): Optionaler Zeitpunkt (Unix-Zeit), Standard ist `time.time()`.
+        """
+        ablauf = claims.get("exp")
+        if self.max_eintraege <= 0 or ablauf is None:
+            return
+        jetzt = time.time() if jetzt is None else jetzt
+        if float(ablauf) <= jetzt:
+            return
+        schluessel = self._schluessel(token)
+        with self._lock:
+            self._eintraege[schluessel] = (claims, float(ablauf))
+            self._eintraege.move_to_end(schluessel)
+            self._abgelaufene_entfernen(jetzt)
+            while len(self._eintraege) > self.max_eintraege:
+                self._eintraege.popitem(last=False)
+                self.verdraengt += 1
+
+    def _abgelaufene_entfernen(self, jetzt: float):
+        """Entfernt abgelaufene Einträge vom Anfang der LRU-Liste (Aufruf nur unter Lock)."""
+        while self._eintraege:
+            schluessel, (_, ablauf) = next(iter(self._eintraege.items()))
+            if ablauf > jetzt:
+                break
+            del self._eintraege[schluessel]
+            self.abgelaufen += 1
+
+    def leeren(self):
+        """Entfernt alle Einträge (z. B. nach einem Wechsel des SECRET_KEY)."""
+        with self._lock:
+            self._eintraege.clear()
+
+    def statistik(self) -> dict:
+        """
+        Gibt die Zähler des Caches zurück.
+
+        Returns:
+            dict: Treffer, Fehlschläge, Trefferquote und aktuelle Größe.
+        """
+        with self._lock:
+            anfragen = self.treffer + self.fehlschlaege
+            return {
+                "treffer": self.treffer,
+                "fehlschlaege": self.fehlschlaege,
+                "trefferquote": round(self.treffer / anfragen, 4) if anfragen else 0.0,
+                "verdraengt": self.verdraengt,
+                "abgelaufen": self.abgelaufen,
+                "groesse": len(self._eintraege),
+                "max_eintraege": self.max_eintraege,
+            }
+
+
+# Zentrale Instanz für die API (Größe über TOKEN_CACHE_SIZE, 0 = deaktiviert)
+token_cache = TokenCache(int(os.getenv("TOKEN_CACHE_SIZE", "1024")))
@@ -0,0 +1,411 @@
+import bisect
+import glob
+import json
+import os
+import random
+import threading
+from contextlib import contextmanager
+from storage_interface import StorageInterface, konto_zu_zeile, konto_aus_zeile
+from konto_locks import konto_sperren
+from logger_config import logger
+from metrics import storage_zeitmessung
+
+
+class WriteBehindStorage(StorageInterface):
+    """
+    Write-Behind-Wrapper um ein beliebiges Storage-Backend (JSON oder SQLite).
+
+    Alle Konten werden beim Start einmal geladen und danach autoritativ im
+    Arbeitsspeicher gehalten. Jede Änderung wird sofort in ein lokales,
+    append-only Redo-Log geschrieben und erst im Hintergrund gebündelt an das
+    Backend übergeben (`konten_schreiben`). Nach einem Absturz wird das Redo-Log
+    beim Start erneut eingespielt.
+
+    Das Redo-Log enthält absolute Kontostände, das Wiedereinspielen ist daher
+    idempotent. Es besteht aus nummerierten Segmenten (`<pfad>.000001`, ...):
+    Vor jedem Flush wird ein neues Segment begonnen; ältere Segmente werden erst
+    gelöscht, wenn das Backend die Änderungen erfolgreich übernommen hat.
+
+    Maximaler Datenverlust:
+        - Prozessabsturz: keiner (jede Zeile wird sofort an das Betriebssystem übergeben).
+        - Stromausfall/OS-Absturz: höchstens `fsync_intervall` Sekunden
+          (0 = fsync bei jeder Änderung, synchron und langsamer).
+
+    Hinweis: Der Wrapper setzt voraus, dass nur dieser eine Prozess das Backend
+    beschreibt (z. B. uvicorn mit einem Worker).
+
+    Attributes:
+        backend (StorageInterface): Das eigentliche, dauerhafte Storage-Backend.
+        redo_log_pfad (str): Basis-Pfad der Redo-Log-Segmente.
+        fsync_intervall (float): Abstand der gebündelten fsync-Aufrufe in Sekunden.
+        flush_intervall (float): Abstand der Hintergrund-Flushes ins Backend in Sekunden.
+    """
+
+    def __init__(self, backend, redo_log_pfad="redo.log", fsync_intervall=0.05, flush_intervall=1.0):
+        self.backend = backend
+        self.redo_log_pfad = redo_log_pfad
+        self.fsync_intervall = fsync_intervall
+        self.flush_intervall = flush_intervall
+
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._konten = {}       # normalisierter Name -> Zeile (dict)
+        self._schluessel = []   # normalisierte Namen, sortiert (Keyset für konten_block)
+        self._dirty = {}        # normalisierter Name -> Zeile, noch nicht im Backend
+        self._segment_nr = 0
+        self._log = None
+        self._ungesynct = False
+        self._stopp = threading.Event()
+
+        self._wiederherstellen()
+        self._segment_oeffnen(self._segment_nr + 1)
+
+        self._threads = [threading.Thread(target=self._flush_schleife, name="write-behind-flush", daemon=True)]
+        if self.fsync_intervall > 0:
+            self._threads.append(threading.Thread(target=self._fsync_schleife, name="write-behind-fsync", daemon=True))
+        for t in self._threads:
+            t.start()
+
+    # --- Redo-Log ---
+
+    def _segmente(self) -> list:
+        """Liefert die vorhandenen Redo-Log-Segmente als Liste (nummer, pfad), aufsteigend sortiert."""
+        segmente = []
+        for pfad in glob.glob(glob.escape(self.redo_log_pfad) + ".*"):
+            endung = pfad.rsplit(".", 1)[-1]
+            if endung.isdigit():
+                segmente.append((int(endung), pfad))
+        return sorted(segmente)
+
+    def _segment_oeffnen(self, nummer: int):
+        """Schließt das aktive Segment und beginnt ein neues (Aufruf nur unter Lock)."""
+        if self._log is not None:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+        self._segment_nr = nummer
+        self._log = open(f"{self.redo_log_pfad}.{nummer:06d}", "a", encoding="utf-8")
+
+    def _protokollieren(self, zeilen):
+        """Hängt Änderungen an das aktive Segment an (Aufruf nur unter Lock)."""
+        self._log.write("".join(json.dumps(z, ensure_ascii=False) + "\n" for z in zeilen))
+        # An das Betriebssystem übergeben: übersteht einen Prozessabsturz
+        self._log.flush()
+        if self.fsync_intervall <= 0:
+            os.fsync(self._log.fileno())
+        else:
+            self._ungesynct = True
+
+    def _wiederherstellen(self):
+        """Lädt das Backend und spielt vorhandene Redo-Log-Segmente nach einem Absturz ein."""
+        for konto in self.backend.laden():
+            zeile = konto_zu_zeile(konto)
+            self._konten[zeile["inhaber"].lower()] = zeile
+        self._schluessel = sorted(self._konten)
+
+        segmente = self._segmente()
+        eingespielt = 0
+        for nummer, pfad in segmente:
+            with open(pfad, "r", encoding="utf-8") as f:
+                for zeilen_nr, text in enumerate(f, 1):
+                    try:
+                        zeile = json.loads(text)
+                    except json.JSONDecodeError:
+                        # Typischerweise eine beim Absturz abgeschnittene letzte Zeile
+                        logger.warning("Redo-Log %s: Zeile %s unvollständig, wird ignoriert.", pfad, zeilen_nr)
+                        continue
+                    schluessel = zeile["inhaber"].lower()
+                    self._zeile_setzen(schluessel, zeile)
+                    self._dirty[schluessel] = zeile
+                    eingespielt += 1
+            self._segment_nr = max(self._segment_nr, nummer)
+
+        if segmente:
+            logger.warning("Write-Behind: %s Änderungen aus %s Redo-Log-Segment(en) wiederhergestellt.",
+                           eingespielt, len(segmente))
+            if self._dirty:
+                self.backend.konten_schreiben([konto_aus_zeile(z) for z in self._dirty.values()])
+                self._dirty.clear()
+            for _, pfad in segmente:
+                os.remove(pfad)
+
+    # --- Hintergrund-Threads ---
+
+    def _fsync_schleife(self):
+        """Bündelt fsync-Aufrufe: höchstens einer pro `fsync_intervall`."""
+        while not self._stopp.wait(self.fsync_intervall):
+            with self._lock:
+                if self._ungesynct and self._log is not None:
+                    os.fsync(self._log.fileno())
+                    self._ungesynct = False
+
+    def _flush_schleife(self):
+        """Überträgt die gesammelten Änderungen periodisch an das Backend."""
+        while not self._stopp.wait(self.flush_intervall):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Write-Behind: Flush ins Backend fehlgeschlagen, neuer Versuch folgt: %s", e)
+
+    def flush(self) -> int:
+        """
+        Überträgt alle ausstehenden Änderungen an das Backend und räumt das Redo-Log auf.
+
+        Raises:
+            Exception: Fehler des Backends; die Änderungen bleiben dann ausstehend.
+
+        Returns:
+            int: Anzahl der übertragenen Konten.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                snapshot = self._dirty
+                self._dirty = {}
+                abgeschlossen_bis = self._segment_nr
+                self._segment_oeffnen(self._segment_nr + 1)
+
+            try:
+                self.backend.konten_schreiben([konto_aus_zeile(z) for z in snapshot.values()])
+            except Exception:
+                with self._lock:
+                    # Neuere Änderungen haben Vorrang vor dem fehlgeschlagenen Snapshot
+                    for schluessel, zeile in snapshot.items():
+                        self._dirty.setdefault(schluessel, zeile)
+                raise
+
+            for nummer, pfad in self._segmente():
+                if nummer <= abgeschlossen_bis:
+                    os.remove(pfad)
+            return len(snapshot)
+
+    def schliessen(self):
+        """Stoppt die Hintergrund-Threads, schreibt alles ins Backend und schließt das Redo-Log."""
+        self._stopp.set()
+        for t in self._threads:
+            t.join()
+        self.flush()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            for _, pfad in self._segmente():
+                if os.path.getsize(pfad) == 0:
+                    os.remove(pfad)
+
+    def ausstehend(self) -> int:
+        """int: Anzahl der Konten, deren Änderungen noch nicht im Backend sind."""
+        with self._lock:
+            return len(self._dirty)
+
+    # --- StorageInterface ---
+
+    def _zeile_setzen(self, schluessel, zeile):
+        """Setzt eine Zeile und pflegt die sortierte Schlüsselliste (Aufruf nur unter Lock)."""
+        if schluessel not in self._konten:
+            bisect.insort(self._schluessel, schluessel)
+        self._konten[schluessel] = zeile
+
+    def _schreiben(self, zeilen):
+        """Übernimmt Zeilen in den Speicher und das Redo-Log (Aufruf nur unter Lock)."""
+        self._protokollieren(zeilen)
+        for zeile in zeilen:
+            schluessel = zeile["inhaber"].lower()
+            self._zeile_setzen(schluessel, zeile)
+            self._dirty[schluessel] = zeile
+
+    @storage_zeitmessung
+    def laden(self):
+        """
+        Liefert alle Konten aus dem Arbeitsspeicher (als neue Objekte).
+
+        Returns:
+            list: Liste der Konto-Objekte.
+        """
+        with self._lock:
+            zeilen = list(self._konten.values())
+        return [konto_aus_zeile(z) for z in zeilen]
+
+    @storage_zeitmessung
+    def speichern(self, konten_liste):
+        """
+        Übernimmt die Konten (Upsert) in Speicher und Redo-Log.
+
+        Args:
+            konten_liste (list): Liste der Girokonto- oder Sparkonto-Objekte.
+        """
+        zeilen = [konto_zu_zeile(k) for k in konten_liste]
+        with self._lock:
+            self._schreiben(zeilen)
+
+    def ist_leer(self):
+        """bool: True, wenn der Arbeitsspeicher keine Konten enthält."""
+        return not self._konten
+
+    @storage_zeitmessung
+    def name_existiert(self, name):
+        """
+        Prüft im Arbeitsspeicher, ob der Inhabername bereits existiert.
+
+        Args:
+            name (str): Der Name des gesuchten Kontoinhabers.
+        """
+        return name.strip().lower() in self._konten
+
+    @storage_zeitmessung
+    def konto_holen(self, name):
+        """
+        Liefert eine Kopie des Kontos aus dem Arbeitsspeicher.
+
+        Args:
+            name (str): Der Name des gesuchten Kontoinhabers.
+
+        Raises:
+            ValueError: Wenn das Konto nicht existiert.
+
+        Returns:
+            object: Das Konto-Objekt.
+        """
+        zeile = self._konten.get(name.strip().lower())
+        if zeile is None:
+            raise ValueError(f"Konto für '{name}' wurde nicht gefunden.")
+        return konto_aus_zeile(zeile)
+
+    def generiere_vorschlaege(self, name):
+        """
+        Erzeugt 3 Namensvorschläge mit Zufallszahlen, die noch nicht vergeben sind.
+
+        Args:
+            name (str): Der Name des gesuchten Kontoinhabers.
+        """
+        vorschlaege = []
+        while len(vorschlaege) < 3:
+            neuer_name = f"{name}{random.randint(10, 99)}"
+            if neuer_name.lower() not in self._konten and neuer_name not in vorschlaege:
+                vorschlaege.append(neuer_name)
+        return vorschlaege
+
+    @storage_zeitmessung
+    def konto_hinzufuegen(self, konto):
+        """
+        Legt ein neues Konto an (Duplikatprüfung im Arbeitsspeicher).
+
+        Args:
+            konto (object): Das Konto-Objekt (Giro- oder Sparkonto).
+
+        Raises:
+            ValueError: Wenn der Name bereits existiert (inkl. Namensvorschlägen).
+        """
+        with self._lock:
+            if konto.inhaber.strip().lower() in self._konten:
+                vorschlaege = self.generiere_vorschlaege(konto.inhaber)
+                raise ValueError(f"Name existiert bereits. Vorschläge: {', '.join(vorschlaege)}")
+            self._schreiben([konto_zu_zeile(konto)])
+
+    @storage_zeitmessung
+    def update_kontostand(self, konto):
+        """
+        Aktualisiert den Kontostand (inkl. `letzte_verzinsung`) im Arbeitsspeicher und
+        protokolliert die Änderung.
+
+        Args:
+            konto (object): Das Konto-Objekt mit dem neuen Stand.
+
+        Raises:
+            ValueError: Wenn das Konto nicht existiert.
+        """
+        with self._lock:
+            zeile = self._konten.get(konto.inhaber.lower())
+            if zeile is None:
+                raise ValueError(f"Konto für '{konto.inhaber}' wurde nicht gefunden.")
+            self._schreiben([konto_zu_zeile(konto)])
+
+    @storage_zeitmessung
+    def konten_schreiben(self, konten):
+        """
+        Upsert mehrerer Konten in Speicher und Redo-Log.
+
+        Args:
+            konten (list): Die zu schreibenden Konto-Objekte.
+        """
+        self.speichern(konten)
+
+    def konten_holen(self, namen) -> dict:
+        """dict: Normalisierter Name -> Konto-Objekt, direkt aus dem Arbeitsspeicher."""
+        with self._lock:
+            zeilen = {n.strip().lower(): self._konten.get(n.strip().lower()) for n in namen}
+        return {name: konto_aus_zeile(zeile) for name, zeile in zeilen.items() if zeile is not None}
+
+    def namen_existieren(self, namen) -> set:
+        """set: Die bereits vergebenen Namen (normalisiert), geprüft im Arbeitsspeicher."""
+        return {n.strip().lower() for n in namen} & self._konten.keys()
+
+    @storage_zeitmessung
+    def mehrere_konten_hinzufuegen(self, konten) -> list:
+        """
+        Legt mehrere Konten mit einer Redo-Log-Schreiboperation an.
+
+        Returns:
+            list: Die abgelehnten Konto-Objekte (Name bereits vergeben).
+        """
+        with self._lock:
+            neu, abgelehnt = self._duplikate_trennen(konten, self._konten.keys())
+            if neu:
+                self._schreiben([konto_zu_zeile(k) for k in neu])
+        return abgelehnt
+
+    def konten_iterieren(self, batch_groesse: int = 1000):
+        """
+        Liefert die Konten blockweise aus dem Arbeitsspeicher (Stand zu Beginn der Iteration).
+
+        Yields:
+            list: Ein Block von Zeilen-Dictionaries.
+        """
+        with self._lock:
+            zeilen = list(self._konten.values())
+        for start in range(0, len(zeilen), batch_groesse):
+            yield [dict(z) for z in zeilen[start:start + batch_groesse]]
+
+    def konten_block(self, marke=None, anzahl: int = 1000) -> tuple:
+        """
+        Liefert einen Block aus dem Arbeitsspeicher, sortiert nach normalisiertem Namen.
+
+        Die Marke ist der letzte gelieferte Schlüssel; der nächste Block beginnt per
+        Binärsuche direkt dahinter. Der Lock wird nur für das Kopieren dieses einen
+        Blocks gehalten, neu angelegte Konten hinter der Marke werden mitgelesen.
+
+        Returns:
+            tuple: (Liste der Zeilen-Dictionaries, Marke für den nächsten Block)
+        """
+        with self._lock:
+            start = 0 if marke is None else bisect.bisect_right(self._schluessel, marke)
+            schluessel = self._schluessel[start:start + anzahl]
+            zeilen = [dict(self._konten[s]) for s in schluessel]
+        return zeilen, (schluessel[-1] if schluessel else marke)
+
+    @contextmanager
+    def transaktion(self, *namen):
+        """
+        Atomare Transaktion im Arbeitsspeicher: Alle Änderungen des Blocks werden
+        gemeinsam in einer Redo-Log-Schreiboperation protokolliert.
+
+        Die Konten sind über `konto_sperren` für die Dauer des Blocks gesperrt; der
+        globale Lock wird nur zum Lesen und zum Übernehmen der Zeilen gehalten, andere
+        Konten bleiben während des Blocks les- und schreibbar.
+
+        Args:
+            *namen (str): Die Inhabernamen.
+
+        Raises:
+            ValueError: Wenn eines der Konten nicht existiert (es wird nichts geschrieben).
+
+        Yields:
+            dict: Übergebener Name -> Konto-Objekt.
+        """
+        with konto_sperren.sperre_mehrere(namen):
+            with self._lock:
+                objekte, konten = self._transaktions_konten(namen, self.konto_holen)
+            yield konten
+            with self._lock:
+                self._schreiben([konto_zu_zeile(k) for k in objekte.values()])
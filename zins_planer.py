@@ -0,0 +1,239 @@
+"""
+Zeitgesteuerte Zinsgutschrift für alle Sparkonten (asyncio, läuft im API-Prozess).
+
+Je Periode (`intervall` Sekunden) wird jedes Sparkonto genau einmal verzinst.
+Die Konten werden in kleinen Blöcken über `StorageInterface.transaktion` verbucht,
+zwischen den Blöcken pausiert der Lauf, damit Vordergrund-Requests nicht warten.
+
+Die Konten werden Block für Block über `StorageInterface.konten_block` gelesen
+(bei SQLite Keyset-Paginierung über die id): Zwischen den Blöcken bleibt kein
+Lese-Snapshot offen, auch wenn der gedrosselte Lauf Minuten dauert.
+
+Ein Checkpoint (JSON-Datei) hält Periode, Position und die Fortsetzungsmarke des
+nächsten Blocks fest. Vor dem Commit eines
+Blocks werden alte und neue Kontostände als "offen" notiert: Stürzt der Prozess
+genau zwischen Commit und Checkpoint ab, erkennt der nächste Start anhand der
+Kontostände, welche Konten bereits verzinst sind, und verbucht keines doppelt.
+Perioden, in denen die API komplett aus war, werden nicht nachgeholt.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from logger_config import logger
+
+
+class ZinsPlaner:
+    """
+    Führt periodische Zinsläufe aus und setzt unterbrochene Läufe fort.
+
+    Attributes:
+        hole_storage (callable): Liefert den Storage-Provider.
+        checkpoint_pfad (str): Pfad der Checkpoint-Datei.
+        intervall (float): Länge einer Zinsperiode in Sekunden.
+        chunk_groesse (int): Konten je Transaktion.
+        pause (float): Pause in Sekunden nach jedem Block.
+    """
+
+    def __init__(self, hole_storage, checkpoint_pfad: str = "zins_checkpoint.json",
+                 intervall: float = 86400, chunk_groesse: int = 200, pause: float = 0.05):
+        self.hole_storage = hole_storage
+        self.checkpoint_pfad = checkpoint_pfad
+        self.intervall = intervall
+        self.chunk_groesse = chunk_groesse
+        self.pause = pause
+        self._lock = threading.Lock()
+        self._task = None
+        self._status = {"zustand": "wartet", "letzter_fehler": None, "naechster_lauf": None}
+        self._checkpoint = self._checkpoint_laden()
+
+    # --- Checkpoint ---
+
+    def _checkpoint_laden(self) -> dict:
+        if os.path.exists(self.checkpoint_pfad):
+            with open(self.checkpoint_pfad, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"periode": None, "position": 0, "marke": None, "verbucht": 0, "fertig": True,
+                "offen": None, "offen_bis": 0, "offen_marke": None, "pruefen": []}
+
+    def _checkpoint_schreiben(self, **werte):
+        """Aktualisiert den Checkpoint atomar (temporäre Datei + os.replace)."""
+        with self._lock:
+            self._checkpoint.update(werte)
+            daten = dict(self._checkpoint)
+        verzeichnis = os.path.dirname(os.path.abspath(self.checkpoint_pfad))
+        fd, tmp = tempfile.mkstemp(dir=verzeichnis, prefix=".zins_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(daten, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.checkpoint_pfad)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def status(self) -> dict:
+        """dict: Zustand des Planers und Fortschritt des aktuellen bzw. letzten Laufs."""
+        with self._lock:
+            return {
+                **self._status,
+                "intervall_s": self.intervall,
+                "periode": self._checkpoint["periode"],
+                "fertig": self._checkpoint["fertig"],
+                "position": self._checkpoint["position"],
+                "verbucht": self._checkpoint["verbucht"],
+                "pruefen": list(self._checkpoint["pruefen"]),
+            }
+
+    def _setzen(self, **werte):
+        with self._lock:
+            self._status.update(werte)
+
+    # --- Verbuchung ---
+
+    def _block_verbuchen(self, namen: list, bis: int, marke) -> int:
+        """
+        Verzinst die Konten eines Blocks in einer Transaktion. Die erwarteten Stände
+        werden vor dem Commit als "offen" im Checkpoint vermerkt.
+
+        Args:
+            namen (list): Die Sparkonten des Blocks.
+            bis (int): Position nach dem Block (wird mit den offenen Ständen vermerkt).
+            marke: Fortsetzungsmarke nach dem Block (ebenso).
+
+        Returns:
+            int: Anzahl der verzinsten Konten.
+        """
+        if not namen:
+            return 0
+        with self.hole_storage().transaktion(*namen) as konten:
+            offen = {}
+            for name in namen:
+                konto = konten[name]
+                alt = konto.kontostand
+                konto.zinsen_berechnen()
+                offen[konto.inhaber] = [alt, konto.kontostand]
+            self._checkpoint_schreiben(offen=offen, offen_bis=bis, offen_marke=marke)
+        return len(namen)
+
+    def _offene_pruefen(self):
+        """
+        Klärt einen beim Absturz offenen Block: bereits verzinste Konten werden
+        übersprungen, unveränderte nachgeholt, anderweitig geänderte zur Prüfung gemeldet.
+        """
+        offen = self._checkpoint.get("offen")
+        if not offen:
+            return
+        aktuell = self.hole_storage().konten_holen(list(offen))
+        nachholen, pruefen = [], []
+        for name, (alt, neu) in offen.items():
+            konto = aktuell.get(name.strip().lower())
+            if konto is None or abs(konto.kontostand - neu) < 1e-9:
+                continue
+            if abs(konto.kontostand - alt) < 1e-9:
+                nachholen.append(name)
+            else:
+                pruefen.append(name)
+        if pruefen:
+            logger.warning("Zinslauf: Konten nach Absturz manuell prüfen: %s", ", ".join(pruefen))
+        bis, marke = self._checkpoint["offen_bis"], self._checkpoint.get("offen_marke")
+        self._block_verbuchen(nachholen, bis, marke)
+        self._checkpoint_schreiben(
+            position=bis, marke=marke, verbucht=self._checkpoint["verbucht"] + len(offen) - len(pruefen),
+            offen=None, pruefen=self._checkpoint["pruefen"] + pruefen,
+        )
+
+    def _marke_suchen(self, storage, position: int):
+        """Ermittelt die Marke nach `position` Zeilen (Checkpoints ohne Marke, ältere Version)."""
+        marke, rest = None, position
+        while rest > 0:
+            zeilen, marke = storage.konten_block(marke, min(rest, self.chunk_groesse))
+            if not zeilen:
+                break
+            rest -= len(zeilen)
+        return marke
+
+    async def lauf_ausfuehren(self, periode: int):
+        """
+        Führt den Zinslauf einer Periode aus (bzw. setzt ihn ab dem Checkpoint fort).
+
+        Args:
+            periode (int): Nummer der Periode (Zeit / Intervall).
+        """
+        if self._checkpoint["periode"] != periode:
+            self._checkpoint_schreiben(periode=periode, position=0, marke=None, verbucht=0, fertig=False,
+                                       offen=None, pruefen=[])
+        if self._checkpoint.get("offen"):
+            await asyncio.to_thread(self._offene_pruefen)
+        storage = self.hole_storage()
+        position, marke = self._checkpoint["position"], self._checkpoint.get("marke")
+        if marke is None and position:
+            marke = await asyncio.to_thread(self._marke_suchen, storage, position)
+        self._setzen(zustand="laeuft", letzter_fehler=None)
+        logger.info("Zinslauf für Periode %s gestartet (ab Position %s).", periode, position)
+
+        while True:
+            # Jeder Block ist ein eigener, kurzer Lesezugriff (kein Snapshot über den ganzen Lauf)
+            zeilen, naechste = await asyncio.to_thread(storage.konten_block, marke, self.chunk_groesse)
+            if zeilen:
+                position += len(zeilen)
+                namen = [z["inhaber"] for z in zeilen if z["typ"] == "Sparkonto"]
+                anzahl = await asyncio.to_thread(self._block_verbuchen, namen, position, naechste)
+                self._checkpoint_schreiben(
+                    position=position, marke=naechste, verbucht=self._checkpoint["verbucht"] + anzahl, offen=None
+                )
+            marke = naechste
+            if len(zeilen) < self.chunk_groesse:
+                break
+            if self.pause:
+                await asyncio.sleep(self.pause)
+        self._checkpoint_schreiben(fertig=True)
+        self._setzen(zustand="wartet")
+        logger.info("Zinslauf für Periode %s beendet: %s Sparkonten verzinst.", periode, self._checkpoint["verbucht"])
+
+    # --- Planung ---
+
+    def aktuelle_periode(self) -> int:
+        """int: Nummer der aktuellen Zinsperiode."""
+        return int(time.time() // self.intervall)
+
+    async def _schleife(self):
+        while True:
+            periode = self.aktuelle_periode()
+            if self._checkpoint["periode"] != periode or not self._checkpoint["fertig"]:
+                try:
+                    # Unterbrochener Lauf: erst die alte Periode abschließen
+                    if not self._checkpoint["fertig"] and self._checkpoint["periode"] is not None:
+                        await self.lauf_ausfuehren(self._checkpoint["periode"])
+                    if self._checkpoint["periode"] != periode:
+                        await self.lauf_ausfuehren(periode)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("Zinslauf fehlgeschlagen: %s", e)
+                    self._setzen(zustand="fehler", letzter_fehler=str(e))
+                    await asyncio.sleep(min(self.intervall, 60))
+                    continue
+            naechster = (periode + 1) * self.intervall
+            self._setzen(naechster_lauf=naechster)
+            await asyncio.sleep(max(naechster - time.time(), 0))
+
+    def starten(self):
+        """Startet den Planer als Task im laufenden Event-Loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._schleife(), name="zins_planer")
+            logger.info("Zins-Planer gestartet (Intervall %s s).", self.intervall)
+
+    async def stoppen(self):
+        """Bricht den Planer ab; ein laufender Block wird noch zu Ende verbucht."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None